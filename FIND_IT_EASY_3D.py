@@ -23,7 +23,8 @@
 ##----- DEVELOPER OPTIONS -----##
 ID_Block = 1                            # type 1 to draw the Block_id in Rhino GUI, type 0 otherwise 
 ID_Face  = 0                            # type 1 to draw the Face_id in Rhino GUI, type 0 otherwise 
-MCP = 1000                              # maximum number of contact pairs for a single block
+FastExtraction = 1                      # type 1 to read the boxes in memory (no object added to the document), type 0 to explode them
+Report   = 0                            # type 1 to write FindItEasyReport.json/.csv (time and sizes of each section), type 0 otherwise
 
 ##----- 0. IMPORT LYBRARIES -----##
 # the script makes use of the 'rhinoscriptsyntax' library only
@@ -31,6 +32,12 @@ MCP = 1000                              # maximum number of contact pairs for a
 
 # import libraries
 import rhinoscriptsyntax as rs
+import time
+
+# time of each section (developer option Report)
+Sections = []                           # section, name, wall time, cpu time, sizes
+def section_done(section, name, start, sizes):
+    Sections.append([section, name, time.time() - start[0], time.clock() - start[1], sizes])
 
 
 ##----- USER OPTIONS -----##
@@ -56,6 +63,7 @@ tol = 10**(-RoundUnit)
 
 
 ##----- 1. EXRACT INFORMATION FROM THE RHINO DRAWING -----##
+t_section = [time.time(), time.clock()]
 
 # Select all the objects from Rhino sketch (hidden object are selected too)
 ALL_OGG = rs.AllObjects(select=True)
@@ -89,37 +97,56 @@ Volume =        [-1 for row in range(N_blocks)]                        # block v
 maxLength =     0                                                      # max block length (used for defining tolerance)
 
 # Extract block face dimensions, block face center, max block length
-for ii in range(N_blocks):
-    faces[ii] =rs.ExplodePolysurfaces(ALL_BLOCKS[ii])                  # explode blocks into surfaces represeting the block faces
-    for jj in range(Nfaces):
-        lines[ii][jj] = rs.DuplicateEdgeCurves(faces[ii][jj])          # sketch lines along face edges (!) dev. hint: this is time consuming and can be improved
-        curves[ii][jj] = rs.JoinCurves(lines[ii][jj])                  # join the lines to create polyline along face adges
-        for kk in range(3):
-            face_center[ii][jj][kk] = round(rs.CurveAreaCentroid(curves[ii][jj])[0][kk],RoundUnit) # read coordinates of face center
-        if jj == 1 or jj == 3:                                         # faces belonging to yz-plane  
-            Dimensions[ii][jj][0] = face_center[ii][jj][0]             # x-coordinate of face center
-            Dimensions[ii][jj][1] = round(rs.CurveLength(lines[ii][jj][1]),RoundUnit)   # face size in y-direction
-            Dimensions[ii][jj][2] = round(rs.CurveLength(lines[ii][jj][0]),RoundUnit)   # face size in z-direction
-            maxLength = max(maxLength,Dimensions[ii][jj][1],Dimensions[ii][jj][2])  # # max block length
-        if jj == 4 or jj == 5:                                         # faces belonging to xy-plane 
-            Dimensions[ii][jj][0] = round(rs.CurveLength(lines[ii][jj][0]),RoundUnit)   # face size in x-direction
-            Dimensions[ii][jj][1] = round(rs.CurveLength(lines[ii][jj][1]),RoundUnit)   # face size in y-direction
-            Dimensions[ii][jj][2] = face_center[ii][jj][2]             # z-coordinate of face center
-        if jj == 0 or jj == 2:                                         # faces belonging to xz-plane 
-            Dimensions[ii][jj][0] = round(rs.CurveLength(lines[ii][jj][1]),RoundUnit)   # face size in x-direction
-            Dimensions[ii][jj][1] = face_center[ii][jj][1]             # y-coordinate of face center
-            Dimensions[ii][jj][2] = round(rs.CurveLength(lines[ii][jj][0]),RoundUnit)   # face size in z-direction
-            maxLength = max(maxLength,Dimensions[ii][jj][0])           # # max block length
-        rs.DeleteObjects(faces[ii][jj])                                # delete object representing the face
-        rs.DeleteObjects(lines[ii][jj])                                # delete object representing the line
+if FastExtraction == 1:
+    # read the corners of each box from the geometry in memory and compute faces, volume and centroid arithmetically
+    FaceVert = [[4,0,1,5],[5,1,2,6],[6,2,3,7],[7,3,0,4],[0,1,2,3],[4,5,6,7]]   # box vertices of each face, in the order of the polyline of an exploded Rhino box
+    for ii in range(N_blocks):
+        box = rs.coercebrep(ALL_BLOCKS[ii]).GetBoundingBox(True)       # axis-aligned box of the block
+        lo, hi = box.Min, box.Max
+        x0,y0,z0 = round(lo.X,RoundUnit),round(lo.Y,RoundUnit),round(lo.Z,RoundUnit)
+        x1,y1,z1 = round(hi.X,RoundUnit),round(hi.Y,RoundUnit),round(hi.Z,RoundUnit)
+        cx,cy,cz = round((lo.X+hi.X)*0.5,RoundUnit),round((lo.Y+hi.Y)*0.5,RoundUnit),round((lo.Z+hi.Z)*0.5,RoundUnit)   # block center
+        dx,dy,dz = round(hi.X-lo.X,RoundUnit),round(hi.Y-lo.Y,RoundUnit),round(hi.Z-lo.Z,RoundUnit)                     # block size
+        face_center[ii] = [[cx,y0,cz],[x1,cy,cz],[cx,y1,cz],[x0,cy,cz],[cx,cy,z0],[cx,cy,z1]]
+        Dimensions[ii]  = [[dx,y0,dz],[x1,dy,dz],[dx,y1,dz],[x0,dy,dz],[dx,dy,z0],[dx,dy,z1]]
+        Vertex = [[x0,y0,z0],[x1,y0,z0],[x1,y1,z0],[x0,y1,z0],[x0,y0,z1],[x1,y0,z1],[x1,y1,z1],[x0,y1,z1]]
+        for jj in range(Nfaces):
+            curves[ii][jj] = [Vertex[kk] for kk in FaceVert[jj]]       # corners of the face polyline (no curve is drawn)
+        Block_center[ii] = [rs.CreatePoint(cx,cy,cz),0]                 # same format as rs.SurfaceVolumeCentroid
+        maxLength = max(maxLength,dx,dy,dz)                             # max block length
+else:
+    for ii in range(N_blocks):
+        faces[ii] =rs.ExplodePolysurfaces(ALL_BLOCKS[ii])                  # explode blocks into surfaces represeting the block faces
+        for jj in range(Nfaces):
+            lines[ii][jj] = rs.DuplicateEdgeCurves(faces[ii][jj])          # sketch lines along face edges (!) dev. hint: this is time consuming and can be improved
+            curves[ii][jj] = rs.JoinCurves(lines[ii][jj])                  # join the lines to create polyline along face adges
+            for kk in range(3):
+                face_center[ii][jj][kk] = round(rs.CurveAreaCentroid(curves[ii][jj])[0][kk],RoundUnit) # read coordinates of face center
+            if jj == 1 or jj == 3:                                         # faces belonging to yz-plane  
+                Dimensions[ii][jj][0] = face_center[ii][jj][0]             # x-coordinate of face center
+                Dimensions[ii][jj][1] = round(rs.CurveLength(lines[ii][jj][1]),RoundUnit)   # face size in y-direction
+                Dimensions[ii][jj][2] = round(rs.CurveLength(lines[ii][jj][0]),RoundUnit)   # face size in z-direction
+                maxLength = max(maxLength,Dimensions[ii][jj][1],Dimensions[ii][jj][2])  # # max block length
+            if jj == 4 or jj == 5:                                         # faces belonging to xy-plane 
+                Dimensions[ii][jj][0] = round(rs.CurveLength(lines[ii][jj][0]),RoundUnit)   # face size in x-direction
+                Dimensions[ii][jj][1] = round(rs.CurveLength(lines[ii][jj][1]),RoundUnit)   # face size in y-direction
+                Dimensions[ii][jj][2] = face_center[ii][jj][2]             # z-coordinate of face center
+            if jj == 0 or jj == 2:                                         # faces belonging to xz-plane 
+                Dimensions[ii][jj][0] = round(rs.CurveLength(lines[ii][jj][1]),RoundUnit)   # face size in x-direction
+                Dimensions[ii][jj][1] = face_center[ii][jj][1]             # y-coordinate of face center
+                Dimensions[ii][jj][2] = round(rs.CurveLength(lines[ii][jj][0]),RoundUnit)   # face size in z-direction
+                maxLength = max(maxLength,Dimensions[ii][jj][0])           # # max block length
+            rs.DeleteObjects(faces[ii][jj])                                # delete object representing the face
+            rs.DeleteObjects(lines[ii][jj])                                # delete object representing the line
 del faces, lines, t1                                                   # delete variables not used in what follows
 
 # Extract block volume and block centroid
 for ii in range(N_blocks):
     Volume[ii] = Dimensions[ii][1][1]*Dimensions[ii][1][2]*Dimensions[ii][4][0]
-    Block_center[ii] = rs.SurfaceVolumeCentroid(ALL_BLOCKS[ii])
-    for jj in range(3):                                               # approximate at the RoundUnit-th digit
-        Block_center[ii][0][jj] = round(Block_center[ii][0][jj],RoundUnit)     
+    if FastExtraction == 0:
+        Block_center[ii] = rs.SurfaceVolumeCentroid(ALL_BLOCKS[ii])
+        for jj in range(3):                                           # approximate at the RoundUnit-th digit
+            Block_center[ii][0][jj] = round(Block_center[ii][0][jj],RoundUnit)     
 
 # Write the id of the block in its centre
 if ID_Block == 1: 
@@ -132,7 +159,12 @@ if ID_Face == 1:
             b=rs.PointCoordinates(rs.AddPoint([face_center[ii][jj][0],face_center[ii][jj][1],face_center[ii][jj][2]]))
             rs.AddText(str(jj),b,maxLength/24)
 
+# Time of section 1
+if Report == 1:
+    section_done("1", "extraction", t_section, {"blocks": N_blocks, "faces": N_blocks*Nfaces})
+
 ##----- 2. FIND CONTACT PAIRS -----##
+t_section = [time.time(), time.clock()]
 
 # Initialize variables
 ContBlockID = [[[-1  for col in range(1)] for col in range(Nfaces)] for row in range(N_blocks)]  # contains, for each block face, the id of the block in contact with that face
@@ -180,14 +212,18 @@ for ii in range(N_blocks):
                                 ContSurfID [ii][pp].extend([tt])
 
 
+# Time of section 2
+if Report == 1:
+    section_done("2", "contact pairs", t_section, {"face_contacts": sum([len(ContBlockID[ii][jj]) for ii in range(N_blocks) for jj in range(Nfaces)])})
+
 ##----- 3. DEFINE BLOCK and FACE POINTS -----## 
+t_section = [time.time(), time.clock()]
 
 # Initialize variables
-FaceCorners = [[[[-1 for col in range(4)] for col in range(MCP)] for col in range(Nfaces)]for row in range(N_blocks)]    # face corner coordinates
-Index    	= [[[[-1 for col in range(4)] for col in range(MCP)] for col in range(Nfaces)]for row in range(N_blocks)]    # face corner coordinates index
+FaceCorners = [[[] for col in range(Nfaces)] for row in range(N_blocks)]                                          	 # face corner coordinates, 4 corners per contact (no limit on the number of contacts)
+Index    	= [[[] for col in range(Nfaces)] for row in range(N_blocks)]                                          	 # face corner coordinates index
 BlockVertex = [[-1 for col in range(8)] for row in range(N_blocks)]                                                 	 # block vertices coordinates
 VerTmp      = [[-1 for col in range(8)] for row in range(N_blocks)]                                                 	 # temp-array used to sort vertices
-t5       = [[MCP for col in range(Nfaces)] for row in range(N_blocks)]                                               	 # counter
 t9       = [-1 for row in range(N_blocks)]                                                                     			 # counter
 BI       = 0 
 SI       = 0 
@@ -201,16 +237,26 @@ for ii in range(N_blocks):
             for mm in range(dd):
                 BI = ContBlockID[ii][jj][mm]
                 SI = ContSurfID[ii][jj][mm]
+                FaceCorners[ii][jj].append([-1 for col in range(4)])
                 for ff in range(4):
-                    FaceCorners[ii][jj][mm][ff] = rs.EvaluateCurve(curves[BI][SI],ff)
+                    if FastExtraction == 1:
+                        FaceCorners[ii][jj][mm][ff] = rs.CreatePoint(curves[BI][SI][ff])
+                    else:
+                        FaceCorners[ii][jj][mm][ff] = rs.EvaluateCurve(curves[BI][SI],ff)
                     for kk in range(3):
                         FaceCorners[ii][jj][mm][ff][kk] = round(FaceCorners[ii][jj][mm][ff][kk],RoundUnit)
 
 # Extract and round block vertices 
 for ii in range (N_blocks):         
+    if FastExtraction == 1:
+        Bottom = [rs.CreatePoint(pt) for pt in curves[ii][4]]
+        Top    = [rs.CreatePoint(pt) for pt in curves[ii][5]]
+    else:
+        Bottom = rs.CurvePoints(curves[ii][4])
+        Top    = rs.CurvePoints(curves[ii][5])
     for jj in range(4):
-        BlockVertex[ii][jj]   = rs.CurvePoints(curves[ii][4])[jj] # vertices are defined on the xy-plane (4,5)
-        BlockVertex[ii][jj+4] = rs.CurvePoints(curves[ii][5])[jj]
+        BlockVertex[ii][jj]   = Bottom[jj]                  # vertices are defined on the xy-plane (4,5)
+        BlockVertex[ii][jj+4] = Top[jj]
         for kk in range(3):
             BlockVertex[ii][jj][kk]=round(BlockVertex[ii][jj][kk],RoundUnit)
             BlockVertex[ii][jj+4][kk]=round(BlockVertex[ii][jj+4][kk],RoundUnit)
@@ -231,31 +277,33 @@ for ii in range (N_blocks):
 del VerTmp
 
 # Delete the polylines drawn at the beginning
-for ii in range(N_blocks):
-    for jj in range(Nfaces):
-        rs.DeleteObjects(curves[ii][jj])
+if FastExtraction == 0:
+    for ii in range(N_blocks):
+        for jj in range(Nfaces):
+            rs.DeleteObjects(curves[ii][jj])
 
 # Add base contact
 for ii in range(N_blocks):
     for jj in range(8):
         if BlockVertex[ii][jj][2] == 0:
             t9[ii] = t9[ii] + 1
+            if len(FaceCorners[ii][4]) == 0:
+                FaceCorners[ii][4].append([-1 for col in range(4)])
             FaceCorners[ii][4][0][t9[ii]] = BlockVertex[ii][jj]
 
-# Clean the matrix FaceCorners and Index
-for ii in range(N_blocks):
-    for jj in range(Nfaces):
-        for mm in range(MCP):
-            if FaceCorners[ii][jj][mm][0] == -1:
-                t5[ii][jj] = t5[ii][jj] - 1
+# Initialize the indices, one per face corner
 for ii in range(N_blocks):
     for jj in range(Nfaces):
-        del FaceCorners[ii][jj][t5[ii][jj]:] 
-        del Index[ii][jj][t5[ii][jj]:]
-del BI,SI,dd,t5,t9,mm,MCP
+        Index[ii][jj] = [[-1 for col in range(4)] for kk in range(len(FaceCorners[ii][jj]))]
+del BI,SI,dd,t9
 
 
+# Time of section 3
+if Report == 1:
+    section_done("3", "face corners", t_section, {"interfaces": sum([len(FaceCorners[ii][jj]) for ii in range(N_blocks) for jj in range(Nfaces)])})
+
 ##----- 4. DEFINE CONTACT POINTS -----## 
+t_section = [time.time(), time.clock()]
 
 # Initialize variables 
 all_Xtmp = [[-1 for col in range(8)] for row in range(N_blocks)]    # temp variable
@@ -302,7 +350,12 @@ for ii in range(N_blocks):
 del Max_X,Max_Y,Max_Z,Min_X,Min_Y,Min_Z
 
 
+# Time of section 4
+if Report == 1:
+    section_done("4", "contact points", t_section, {"corners": 4*sum([len(FaceCorners[ii][jj]) for ii in range(N_blocks) for jj in range(Nfaces)])})
+
 ##----- 5. DEFINE CONTACT POINT INDEXES -----## 
+t_section = [time.time(), time.clock()]
 
 # Initialize variables
 Num_points = 8 
@@ -351,7 +404,12 @@ Max = max(sum)
 del Num_cont,sum,num,tt
 
 
+# Time of section 5
+if Report == 1:
+    section_done("5", "point indexes", t_section, {"points": Num_points, "max_interfaces": Max})
+
 ##----- 6. WRITE TXT FILE COMPATIBLE WITH LIABLOCK_3D SOFTWARE -----##
+t_section = [time.time(), time.clock()]
 
 # Initialize variables 
 Index_Excel    = [[-1 for col in range(Max)] for row in range(N_blocks)]                # contact points index
@@ -414,7 +472,12 @@ for ii in range(N_blocks):
 # Close txt-file
 f.close()
 
+# Time of section 6
+if Report == 1:
+    section_done("6", "liablock", t_section, {"columns": Max + 2*Num_points + 4})
+
 ##----- 7. WRITE TXT FILE COMPATIBLE WITH 3DEC VERSION 5.2 -----##
+t_section = [time.time(), time.clock()]
 
 # Open txt-file
 g = open("3DECInputFile.txt", "w+")
@@ -429,5 +492,19 @@ g.write("plot create plot Blocks\nplot block")
 # Close txt-file
 g.close()
 
+# Time of section 7
+if Report == 1:
+    section_done("7", "3dec", t_section, {"blocks": N_blocks})
+
+##----- WRITE REPORT -----##
+# one row per section: wall and cpu time (s) and sizes
+if Report == 1:
+    # the finditeasy3d package is next to this script
+    import os
+    import sys
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from finditeasy3d.report import write_sections
+    write_sections(Sections)
+
 # Debugging end point
 fine = 1
\ No newline at end of file
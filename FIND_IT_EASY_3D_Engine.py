@@ -0,0 +1,40 @@
+##----- FIND IT EASY! 3D -----##
+## Rhino front-end of the finditeasy3d engine
+## Laboratory of Earthquake Engineering and Structural Dynamics (EESD)
+## Ecole Polythecnique Federale de Lausanne (EPFL), Switzerland
+##----------------------------##
+
+##----- ALGORITHM DESCRIPTION -----##
+# Same output as FIND_IT_EASY_3D_Opensees.py (LiAInputFile, 3DECInputFile and OpenSeesInputFile)
+# Rhino is only used to read the boxes: contact detection and exporters run in the
+# finditeasy3d package, which also runs without Rhino (python -m finditeasy3d)
+
+##----- DEVELOPER OPTIONS -----##
+ID_Block = 0                            # type 1 to draw the Block_id in Rhino GUI, type 0 otherwise
+ID_Face  = 0                            # type 1 to draw the Face_id in Rhino GUI, type 0 otherwise
+Exporters = ["liablock", "3dec", "opensees"]    # input files to write ("liablock_compact": local point ids per block)
+Report   = 0                            # type 1 to write FindItEasyReport.json/.csv (time and sizes of each section), type 0 otherwise
+
+##----- 0. IMPORT LYBRARIES -----##
+import os
+import sys
+import rhinoscriptsyntax as rs
+
+# the finditeasy3d package is next to this script
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import finditeasy3d
+from finditeasy3d.rhino import extract_blocks, draw_ids
+
+##----- USER OPTIONS -----##
+# define units
+UnitsTag = rs.GetString("What is your unit of measure? (type: mm,cm,m)")
+while UnitsTag not in finditeasy3d.UNITS:
+    print("Sorry, that was an invalid command!")
+    UnitsTag = rs.GetString("What is your unit ? (type: mm,cm,m)")
+
+##----- 1. EXRACT INFORMATION FROM THE RHINO DRAWING -----##
+blocks = extract_blocks(rs)
+
+##----- 2.-8. CONTACTS AND INPUT FILES -----##
+model = finditeasy3d.run(blocks, UnitsTag, outdir=".", exporters=Exporters, report=(Report == 1))
+draw_ids(rs, model, ID_Block, ID_Face)
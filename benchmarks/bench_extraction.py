@@ -0,0 +1,66 @@
+##----- FIND IT EASY! 3D - BENCHMARK OF THE EXTRACTION (SECTION 1) -----##
+# explode/duplicate/join extraction of the Rhino script (FastExtraction = 0) against the in-memory
+# one (FastExtraction = 1): the script runs on the rhinoscriptsyntax stub with both options, the time
+# of section 1 is read from its report and the files it writes must be the same
+# (Python 2, as the IronPython of Rhino)
+#
+#   python2 benchmarks/bench_extraction.py --blocks 500
+
+import argparse
+import filecmp
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from rhinostub import run_script
+from generators import GENERATORS
+
+FILES = ["LiAInputFile.txt", "3DECInputFile.txt", "OpenSeesInputFile.txt"]
+
+
+def section_time(outdir, section="1"):
+    # wall time of a section in the report of the script
+    f = open(os.path.join(outdir, "FindItEasyReport.json"))
+    stages = json.load(f)['stages']
+    f.close()
+    return sum([stage['wall_s'] for stage in stages if stage['section'] == section])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="explode/duplicate/join extraction of the Rhino script against the in-memory one "
+                                                 "(rhinoscriptsyntax stub, Python 2)")
+    parser.add_argument("--blocks", type=int, default=500, help="number of blocks of the model")
+    parser.add_argument("--generator", default="running_bond", choices=sorted(GENERATORS))
+    parser.add_argument("--script", default="FIND_IT_EASY_3D_Opensees.py", choices=["FIND_IT_EASY_3D.py", "FIND_IT_EASY_3D_Opensees.py"])
+    parser.add_argument("--out", default=None, help="directory of the files of both runs (default: temporary)")
+    args = parser.parse_args(argv)
+    blocks = GENERATORS[args.generator](args.blocks)
+    outdir = args.out if args.out is not None else tempfile.mkdtemp()
+
+    times = []
+    changes = []
+    dirs = []
+    for FastExtraction in [0, 1]:
+        dirs.append(os.path.join(outdir, "FastExtraction" + str(FastExtraction)))
+        rs = run_script(os.path.join(ROOT, args.script), blocks, dirs[-1], {'FastExtraction': FastExtraction, 'Report': 1})
+        times.append(section_time(dirs[-1]))
+        changes.append(rs.added + rs.deleted)
+    names = [name for name in FILES if os.path.exists(os.path.join(dirs[0], name))]
+    differing = [name for name in names if not filecmp.cmp(os.path.join(dirs[0], name), os.path.join(dirs[1], name), shallow=False)]
+    if args.out is None:
+        shutil.rmtree(outdir)
+
+    print(str(len(blocks)) + " blocks (" + args.generator + ", " + args.script + ")")
+    print("explode/duplicate/join:  %8.3f s  %8d document changes" % (times[0], changes[0]))
+    print("in memory:               %8.3f s  %8d document changes" % (times[1], changes[1]))
+    print("speedup:                 %8.1f x" % (times[0]/max(times[1], 1e-9)))
+    print("same " + ", ".join(names) + ": " + str(differing == []) + ("" if differing == [] else " (differ: " + ", ".join(differing) + ")"))
+    return 1 if differing else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
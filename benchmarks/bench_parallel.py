@@ -0,0 +1,44 @@
+##----- FIND IT EASY! 3D - BENCHMARK OF THE TILED CONTACT DETECTION (SECTIONS 2-5) -----##
+# serial sections 2-5 against the process pool on spatial tiles (finditeasy3d.parallel),
+# on a running bond wall; the speedup depends on the cores of the machine
+#
+#   python benchmarks/bench_parallel.py --blocks 50000 --workers 2 4 8
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from finditeasy3d.pipeline import build_model
+from generators import running_bond
+
+
+def contacts(model):
+    return (model.ContBlockID, model.ContSurfID, model.FaceCorners, model.Index, model.Num_points)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="serial sections 2-5 against the process pool on spatial tiles")
+    parser.add_argument("--blocks", type=int, default=20000, help="number of blocks of the wall")
+    parser.add_argument("--units", default="m", choices=["mm", "cm", "m"])
+    parser.add_argument("--workers", type=int, nargs="+", default=[2, 4, 8], help="number of processes to test")
+    args = parser.parse_args(argv)
+    blocks = running_bond(args.blocks)
+
+    start = time.time()
+    serial = build_model(blocks, args.units)
+    t_serial = time.time() - start
+    print(str(len(blocks)) + " blocks, " + str(os.cpu_count() if hasattr(os, "cpu_count") else "?") + " cores")
+    print("serial:        %8.3f s" % t_serial)
+
+    for workers in args.workers:
+        start = time.time()
+        model = build_model(blocks, args.units, workers=workers)
+        t_parallel = time.time() - start
+        print("%2d workers:    %8.3f s   speedup %5.2f x   same result: %s"
+              % (workers, t_parallel, t_serial/max(t_parallel, 1e-9), contacts(model) == contacts(serial)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+##----- FIND IT EASY! 3D - BENCHMARK SUITE -----##
+# time every stage of the engine on synthetic masonry models of growing size
+#   extraction (section 1), index (spatial index), contacts (section 2), points (sections 3-5 as
+#   build_model runs them: interface rectangles with numpy when installed), points_python (pure Python
+#   sections 3-5, for reference), liablock, liablock_compact, 3dec and opensees (sections 6-8)
+# a stage is skipped when its time, extrapolated quadratically from the previous size of the same
+# generator, is over --budget seconds; results (and errors) are written as JSON
+#
+#   python benchmarks/bench_suite.py --sizes 100 1000 10000 100000 --out bench_suite.json
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from finditeasy3d.model import Model
+from finditeasy3d.geometry import extract_geometry
+from finditeasy3d.spatial import SpatialIndex
+from finditeasy3d.contacts import find_contact_pairs
+from finditeasy3d.points import define_face_corners, define_contact_points, define_point_indexes
+from finditeasy3d.pipeline import EXPORTERS, define_interfaces
+from generators import GENERATORS
+
+STAGES = ['extraction', 'index', 'contacts', 'points', 'points_python', 'liablock', 'liablock_compact', '3dec', 'opensees']
+MODEL_STAGES = ['extraction', 'index', 'contacts', 'points']     # needed by the stages after them
+
+
+def stage_functions(model, blocks, outdir):
+    # function running each stage on model
+    def extraction():
+        extract_geometry(model, blocks)
+
+    def index():
+        model.index = SpatialIndex(model)
+
+    def points():
+        # sections 3-5 of build_model
+        if define_interfaces is not None:
+            define_interfaces(model)
+        else:
+            define_face_corners(model)
+            define_contact_points(model)
+        define_point_indexes(model)
+
+    def points_python():
+        define_face_corners(model)
+        define_contact_points(model)
+        define_point_indexes(model)
+
+    def exporter(name):
+        writer, filename = EXPORTERS[name]
+        return lambda: writer(model, os.path.join(outdir, filename))
+
+    return {'extraction': extraction, 'index': index, 'contacts': lambda: find_contact_pairs(model),
+            'points': points, 'points_python': points_python, 'liablock': exporter('liablock'), 'liablock_compact': exporter('liablock_compact'),
+            '3dec': exporter('3dec'), 'opensees': exporter('opensees')}
+
+
+def run_case(generator, size, UnitsTag, stages, previous, budget):
+    # time the stages on a model of the generator, previous: {stage: (N_blocks, seconds)}
+    blocks = GENERATORS[generator](size)
+    N_blocks = len(blocks)
+    model = Model(UnitsTag)
+    outdir = tempfile.mkdtemp(prefix="finditeasy3d-bench-")
+    functions = stage_functions(model, blocks, outdir)
+    case = {'generator': generator, 'size': size, 'N_blocks': N_blocks, 'seconds': {}, 'skipped': {}, 'errors': {}}
+    failed = False
+    try:
+        for stage in STAGES:
+            if stage not in stages:
+                continue
+            if failed:
+                case['skipped'][stage] = "model not built"
+                continue
+            if stage in previous:
+                estimate = previous[stage][1]*(float(N_blocks)/previous[stage][0])**2
+                if estimate > budget:
+                    case['skipped'][stage] = "estimated %.1f s" % estimate
+                    failed = stage in MODEL_STAGES
+                    continue
+            start = time.time()
+            try:
+                functions[stage]()
+            except Exception as error:
+                case['errors'][stage] = type(error).__name__ + ": " + str(error)
+                failed = stage in MODEL_STAGES
+                continue
+            case['seconds'][stage] = time.time() - start
+            previous[stage] = (N_blocks, case['seconds'][stage])
+    finally:
+        shutil.rmtree(outdir, ignore_errors=True)
+    if 'points' in case['seconds']:
+        case['interfaces'] = sum(model.TotalContact)
+        case['points'] = model.Num_points
+    return case
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="time every stage of the engine on synthetic masonry models")
+    parser.add_argument("--generators", nargs="+", default=sorted(GENERATORS), choices=sorted(GENERATORS))
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000], help="approximate number of blocks")
+    parser.add_argument("--stages", nargs="+", default=STAGES, choices=STAGES)
+    parser.add_argument("--units", default="m", choices=["mm", "cm", "m"])
+    parser.add_argument("--budget", type=float, default=120., help="max estimated seconds of a stage")
+    parser.add_argument("--out", default="bench_suite.json", help="JSON file of the results")
+    args = parser.parse_args(argv)
+
+    results = {'python': platform.python_version(), 'platform': platform.platform(),
+               'units': args.units, 'budget': args.budget, 'cases': [],
+               'points': "numpy" if define_interfaces is not None else "python"}
+    print("%-20s %8s " % ("generator", "blocks") + " ".join(["%10s" % stage for stage in args.stages]))
+    for generator in args.generators:
+        previous = {}
+        for size in sorted(args.sizes):
+            case = run_case(generator, size, args.units, args.stages, previous, args.budget)
+            results['cases'].append(case)
+            row = []
+            for stage in args.stages:
+                if stage in case['seconds']:
+                    row.append("%10.3f" % case['seconds'][stage])
+                elif stage in case['errors']:
+                    row.append("%10s" % "error")
+                else:
+                    row.append("%10s" % "skipped")
+            print("%-20s %8d " % (generator, case['N_blocks']) + " ".join(row))
+
+    f = open(args.out, "w")
+    json.dump(results, f, indent=1, sort_keys=True)
+    f.close()
+    print("results written in " + args.out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+##----- FIND IT EASY! 3D - SYNTHETIC MASONRY MODELS -----##
+# parametric generators of axis-aligned blocks [x0, y0, z0, x1, y1, z1] (m) for the benchmarks;
+# N_blocks is the approximate number of blocks (courses and storeys are always complete)
+#   running_bond(N)          single-leaf wall, joints offset by half a brick every course
+#   english_bond(N)          one-brick-thick wall, courses of stretchers (two leaves) and of headers
+#   wall_with_openings(N)    running bond wall with rows of windows
+#   box_building(N)          multi-storey building: four interlocked running bond walls and a slab per storey
+
+L, H, T = 0.25, 0.06, 0.12              # brick length, height and width
+
+
+def joints(x0, x1, phase, step):
+    # bricks between x0 and x1 with joints at phase + k*step (bricks cut at the ends)
+    xs = [x0]
+    x = phase + step*int((x0 - phase)//step)
+    while x < x1 - 1e-9:
+        if x > x0 + 1e-9:
+            xs.append(round(x, 6))
+        x = x + step
+    xs.append(x1)
+    return list(zip(xs[:-1], xs[1:]))
+
+
+def size(N_blocks, per_block):
+    # bricks per course of a wall about twice as long as high
+    return max(2, int(round((N_blocks*per_block)**0.5)))
+
+
+def running_bond(N_blocks, per_course=None):
+    if per_course is None:
+        per_course = size(N_blocks, H/L*2)
+    blocks = []
+    course = 0
+    while len(blocks) < N_blocks:
+        for x0, x1 in joints(0., per_course*L, L*0.5*(course % 2), L):
+            blocks.append([x0, 0., round(course*H, 6), x1, T, round((course+1)*H, 6)])
+        course = course + 1
+    return blocks
+
+
+def english_bond(N_blocks, per_course=None):
+    # wall one brick length thick: stretchers in two leaves, headers across the wall
+    if per_course is None:
+        per_course = size(N_blocks, H/L)
+    W = per_course*L
+    blocks = []
+    course = 0
+    while len(blocks) < N_blocks:
+        z0, z1 = round(course*H, 6), round((course+1)*H, 6)
+        if course % 2 == 0:
+            for y0, y1 in ((0., L*0.5), (L*0.5, L)):
+                for x0, x1 in joints(0., W, 0., L):
+                    blocks.append([x0, y0, z0, x1, y1, z1])
+        else:
+            for x0, x1 in joints(0., W, L*0.25, L*0.5):               # queen closers at the ends
+                blocks.append([x0, 0., z0, x1, L, z1])
+        course = course + 1
+    return blocks
+
+
+def wall_with_openings(N_blocks, per_course=None, storey=20, sill=5, window=10):
+    # windows 2L wide with 2L piers, one row every storey courses
+    if per_course is None:
+        per_course = size(N_blocks, H/L*2)
+    W = per_course*L
+    windows = []
+    x = 2*L
+    while x + 4*L <= W:
+        windows.append((x, x + 2*L))
+        x = x + 4*L
+    blocks = []
+    course = 0
+    while len(blocks) < N_blocks:
+        level = course % storey
+        solid = [(0., W)]
+        if sill <= level < sill + window:
+            solid = []
+            x = 0.
+            for x0, x1 in windows:
+                solid.append((x, x0))
+                x = x1
+            solid.append((x, W))
+        for a, b in solid:
+            for x0, x1 in joints(a, b, L*0.5*(course % 2), L):
+                blocks.append([x0, 0., round(course*H, 6), x1, T, round((course+1)*H, 6)])
+        course = course + 1
+    return blocks
+
+
+def box_building(N_blocks, courses=16, slab=0.2):
+    # square plan with side bricks x L, one slab on the walls of each storey
+    side = max(2, int(round((N_blocks/(4.*courses))**0.5)))
+    storeys = max(1, int(round(N_blocks/(4.*courses*side))))
+    A = side*L
+    blocks = []
+    z = 0.
+    for ss in range(storeys):
+        for course in range(courses):
+            z0, z1 = round(z + course*H, 6), round(z + (course+1)*H, 6)
+            phase = L*0.5*(course % 2)
+            # walls along x and along y take the corners in turn
+            if course % 2 == 0:
+                xs, ys = (0., A), (T, A - T)
+            else:
+                xs, ys = (T, A - T), (0., A)
+            for y0, y1 in ((0., T), (A - T, A)):
+                for x0, x1 in joints(xs[0], xs[1], phase, L):
+                    blocks.append([x0, y0, z0, x1, y1, z1])
+            for x0, x1 in ((0., T), (A - T, A)):
+                for y0, y1 in joints(ys[0], ys[1], phase, L):
+                    blocks.append([x0, y0, z0, x1, y1, z1])
+        z = round(z + courses*H, 6)
+        blocks.append([0., 0., z, A, A, round(z + slab, 6)])
+        z = round(z + slab, 6)
+    return blocks
+
+
+GENERATORS = {'running_bond': running_bond,
+              'english_bond': english_bond,
+              'wall_with_openings': wall_with_openings,
+              'box_building': box_building}
@@ -0,0 +1,182 @@
+##----- FIND IT EASY! 3D - RHINOSCRIPTSYNTAX STUB -----##
+# minimal stand-in for the 'rhinoscriptsyntax' functions used by the scripts, to time
+# the extraction (section 1) without Rhino. The document is a dictionary of boxes, faces,
+# lines and polylines; every object added to or deleted from it is counted.
+# Face and edge order follow an exploded Rhino box (see finditeasy3d/geometry.py).
+#
+# run_script runs one of the Rhino scripts (Python 2, as IronPython) on the stub:
+#   rs = run_script("FIND_IT_EASY_3D_Opensees.py", blocks, "output", {'FastExtraction': 0})
+
+import itertools
+import os
+import re
+import sys
+
+POLYSURFACE = 1073741824
+
+# vertices of each face (LiA_Block order of the box vertices) and first two edges of its border:
+# edge 0 along z for the vertical faces and along x for the horizontal ones, edge 1 along the other direction
+FACE_EDGES = [[4, 0, 1, 5],
+              [5, 1, 2, 6],
+              [6, 2, 3, 7],
+              [7, 3, 0, 4],
+              [0, 1, 2, 3],
+              [4, 5, 6, 7]]
+
+
+class Point3d(list):
+    # indexable and mutable as a Rhino Point3d
+
+    def __init__(self, x, y, z):
+        list.__init__(self, [x, y, z])
+
+    X = property(lambda self: self[0])
+    Y = property(lambda self: self[1])
+    Z = property(lambda self: self[2])
+
+    def __str__(self):
+        # "x,y,z" as Rhino writes a Point3d (2.0 -> 2)
+        return ",".join(['%.15g' % (value if value != 0 else 0.) for value in self])
+
+
+class BoundingBox(object):
+
+    def __init__(self, lo, hi):
+        self.Min = Point3d(*lo)
+        self.Max = Point3d(*hi)
+
+
+class Brep(object):
+
+    def __init__(self, lo, hi):
+        self.lo = lo
+        self.hi = hi
+
+    def GetBoundingBox(self, accurate):
+        return BoundingBox(self.lo, self.hi)
+
+
+def box_vertices(lo, hi):
+    x0, y0, z0 = lo
+    x1, y1, z1 = hi
+    return [(x0, y0, z0), (x1, y0, z0), (x1, y1, z0), (x0, y1, z0),
+            (x0, y0, z1), (x1, y0, z1), (x1, y1, z1), (x0, y1, z1)]
+
+
+class RhinoStub(object):
+    # document with the boxes of the model
+
+    def __init__(self, blocks):
+        self.objects = {}
+        self.ids = itertools.count(1)
+        self.added = 0
+        self.deleted = 0
+        for block in blocks:
+            self.add(('box', tuple(block[:3]), tuple(block[3:])))
+        self.added = 0
+
+    def add(self, obj):
+        key = next(self.ids)
+        self.objects[key] = obj
+        self.added = self.added + 1
+        return key
+
+    ##----- rhinoscriptsyntax -----##
+
+    def GetString(self, message=None):
+        return "m"
+
+    def AllObjects(self, select=False):
+        return sorted(self.objects)
+
+    def ObjectType(self, key):
+        return POLYSURFACE if self.objects[key][0] == 'box' else 0
+
+    def DeleteObjects(self, keys):
+        if not isinstance(keys, (list, tuple)):
+            keys = [keys]
+        for key in keys:
+            del self.objects[key]
+            self.deleted = self.deleted + 1
+        return len(keys)
+
+    def ExplodePolysurfaces(self, key):
+        kind, lo, hi = self.objects[key]
+        vertex = box_vertices(lo, hi)
+        return [self.add(('face', [vertex[kk] for kk in FACE_EDGES[jj]])) for jj in range(6)]
+
+    def DuplicateEdgeCurves(self, key):
+        corners = self.objects[key][1]
+        return [self.add(('line', corners[kk], corners[(kk+1) % 4])) for kk in range(4)]
+
+    def JoinCurves(self, keys):
+        return [self.add(('polyline', [self.objects[key][1] for key in keys]))]
+
+    def polyline(self, key):
+        if isinstance(key, list):
+            key = key[0]
+        return self.objects[key][1]
+
+    def CurveAreaCentroid(self, key):
+        corners = self.polyline(key)
+        return [Point3d(*[sum(pt[kk] for pt in corners)/4. for kk in range(3)]), [0, 0, 0]]
+
+    def CurveLength(self, key):
+        kind, p0, p1 = self.objects[key]
+        return sum((p1[kk] - p0[kk])**2 for kk in range(3))**0.5
+
+    def EvaluateCurve(self, key, t):
+        return Point3d(*self.polyline(key)[int(t) % 4])
+
+    def CurvePoints(self, key):
+        corners = self.polyline(key)
+        return [Point3d(*pt) for pt in corners + corners[:1]]
+
+    def SurfaceVolumeCentroid(self, key):
+        kind, lo, hi = self.objects[key]
+        return [Point3d(*[(lo[kk] + hi[kk])*0.5 for kk in range(3)]), [0, 0, 0]]
+
+    def BoundingBox(self, key):
+        kind, lo, hi = self.objects[key]
+        return [Point3d(*pt) for pt in box_vertices(lo, hi)]
+
+    def coercebrep(self, key):
+        kind, lo, hi = self.objects[key]
+        return Brep(lo, hi)
+
+    def CreatePoint(self, x, y=None, z=None):
+        if y is None:
+            return Point3d(*x)
+        return Point3d(x, y, z)
+
+    def SortPoints(self, points, ascending=True, order=0):
+        return sorted(points, key=lambda pt: (pt[2], pt[1], pt[0]))
+
+    def AddText(self, text, point, height=1.0):
+        return self.add(('text', text, point))
+
+
+def run_script(filename, blocks, outdir=".", options=None):
+    # run a Rhino script on a stub of the blocks, its files are written in outdir; options: values of
+    # its developer options (e.g. {'FastExtraction': 0, 'Report': 1}); return the stub
+    filename = os.path.abspath(filename)
+    source = open(filename).read()
+    if options is None:
+        options = {}
+    for name in options:
+        source = re.sub(r"(?m)^" + name + r"(\s*)= *\d+", name + r"\1= " + str(options[name]), source)
+    if not os.path.isdir(outdir):
+        os.makedirs(outdir)
+    rs = RhinoStub(blocks)
+    previous = sys.modules.get('rhinoscriptsyntax'), os.getcwd()
+    sys.modules['rhinoscriptsyntax'] = rs
+    os.chdir(outdir)
+    try:
+        exec(compile(source, filename, 'exec'), {'__name__': '__main__', '__file__': filename})
+    finally:
+        os.chdir(previous[1])
+        if previous[0] is None:
+            del sys.modules['rhinoscriptsyntax']
+        else:
+            sys.modules['rhinoscriptsyntax'] = previous[0]
+    return rs
@@ -0,0 +1,30 @@
+##----- FIND IT EASY! 3D - ENGINE -----##
+# Geometry generator for 3D simplified micro models for masonry structures
+# runs without Rhino: the blocks are given as min/max corners of axis-aligned boxes
+#
+#   import finditeasy3d
+#   blocks = finditeasy3d.read_blocks("3DEC/Input_file/IgorBuilding.txt")
+#   model = finditeasy3d.run(blocks, "m", outdir="output")
+
+from .model import Model, UNITS, round_unit
+from .inputs import read_blocks, write_blocks
+from .pipeline import EXPORTERS, build_model, export, run
+from .incremental import update_model
+from .streaming import stream, stream_slabs, stream_order
+from .spatial import PointIndex, SpatialIndex
+from .cache import StageCache
+from .report import Report
+from .liablock import write_liablock, write_liablock_compact
+from .threedec import write_3dec
+from .opensees import OpenSeesModel, Recorder, opensees_model, build_opensees, write_opensees
+from .macro import coarsen, macro_model, write_opensees_macro
+
+# numpy is only needed by the compact storage, the contact graph, the binary OpenSees model and the
+# columnar model files
+try:
+    from .store import ContactStore
+    from .graph import ContactGraph, read_graph, write_graph
+    from .columns import save_columns, open_columns, load_model
+    from .opensees_npz import read_opensees, load_opensees, write_opensees_npz
+except ImportError:
+    pass
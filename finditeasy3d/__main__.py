@@ -0,0 +1,72 @@
+##----- FIND IT EASY! 3D - COMMAND LINE -----##
+#   python -m finditeasy3d blocks.txt --units m --out output --exporters liablock 3dec opensees
+#   python -m finditeasy3d output/FindItEasyModel --out output --exporters opensees     (saved model)
+#   python -m finditeasy3d district.txt --units m --out output --stream 100000         (slab after slab)
+#   python -m finditeasy3d blocks.txt --units m --out output --export-jobs 0           (exporters at the same time)
+#   python -m finditeasy3d blocks.txt --units m --exporters opensees_macro --macro-size 3   (coarse OpenSees model)
+#   python -m finditeasy3d blocks.txt --units m --exporters opensees --shared-nodes          (bricks sharing their nodes)
+
+import argparse
+import os
+
+from .cache import StageCache
+from .inputs import read_blocks
+from .pipeline import EXPORTERS, export, run
+from .report import Report
+from .streaming import stream
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="finditeasy3d", description="Find It Easy! 3D without Rhino")
+    parser.add_argument("blocks", help="file with the min/max corners of the blocks (3DEC 'poly brick' lines or 6 columns), "
+                                       "or directory of a model saved by the 'columns' exporter")
+    parser.add_argument("--units", choices=["mm", "cm", "m"], help="unit of measure of the model (not needed for a saved model)")
+    parser.add_argument("--out", default=".", help="directory of the output files")
+    parser.add_argument("--exporters", nargs="+", default=["liablock", "3dec", "opensees"], choices=sorted(EXPORTERS))
+    parser.add_argument("--workers", type=int, default=1, help="processes used to find the contacts (sections 2-5)")
+    parser.add_argument("--cache", default=None, help="directory of the cache of the stage results (sections 1-5)")
+    parser.add_argument("--cache-size", type=float, default=512, help="max size of the cache in MB")
+    parser.add_argument("--report", action="store_true", help="write FindItEasyReport.json/.csv (time and sizes of each section)")
+    parser.add_argument("--report-memory", action="store_true",
+                        help="--report with the peak of the memory of each section (tracemalloc: much slower, times not comparable)")
+    parser.add_argument("--export-jobs", type=int, default=1, metavar="N",
+                        help="run the exporters at the same time on N workers (0: one per exporter)")
+    parser.add_argument("--export-pool", choices=["process", "thread"], default="process", help="workers of --export-jobs")
+    parser.add_argument("--macro-size", type=float, default=None, help="opensees_macro: max side of a macro-block")
+    parser.add_argument("--macro-aspect", type=float, default=None, help="opensees_macro: max ratio of the longest to the middle side")
+    parser.add_argument("--macro-blocks", type=int, default=None, help="opensees_macro: max blocks per macro-block")
+    parser.add_argument("--shared-nodes", action="store_true",
+                        help="OpenSees exporters: one node per grid point of a block, no equalDOF between the bricks")
+    parser.add_argument("--stream", type=int, default=None, metavar="N",
+                        help="run the model slab after slab along z, at most N blocks per slab (models larger than memory); "
+                             "the blocks of the files are numbered slab by slab, StreamOrder.csv gives their order in the input")
+    args = parser.parse_args(argv)
+    export_jobs = args.export_jobs if args.export_jobs > 0 else None
+    options = {'opensees_macro': {'max_size': args.macro_size, 'max_aspect': args.macro_aspect, 'max_blocks': args.macro_blocks,
+                                  'shared': args.shared_nodes}}
+    for name in ['opensees', 'opensees_npz']:
+        options[name] = {'shared': args.shared_nodes}
+
+    if os.path.isdir(args.blocks):
+        # sections 1-5 were saved: only the exporters run
+        from .columns import load_model
+        export(load_model(args.blocks), args.out, args.exporters, jobs=export_jobs, pool=args.export_pool, options=options)
+        return
+    if args.units is None:
+        parser.error("--units is required with a file of blocks")
+    if args.stream is not None:
+        stream(read_blocks(args.blocks), args.units, outdir=args.out, exporters=args.exporters, max_blocks=args.stream,
+               options=options)
+        return
+    report = args.report
+    if args.report_memory:
+        report = Report(memory=True)
+    cache = None
+    if args.cache is not None:
+        cache = StageCache(args.cache, int(args.cache_size*2**20))
+    run(read_blocks(args.blocks), args.units, outdir=args.out, exporters=args.exporters, workers=args.workers, cache=cache,
+        report=report, export_jobs=export_jobs, export_pool=args.export_pool, options=options)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+##----- FIND IT EASY! 3D - BATCH RUNNER -----##
+# runs many models without prompts, each one in a process of a pool, and writes the files of
+# every model in its own directory (out/<model name>/), then a summary of times and sizes
+# (printed and written in out/summary.csv)
+#
+#   python -m finditeasy3d.batch models/*.txt --units m --out results --jobs 4
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from .inputs import read_blocks
+from .pipeline import EXPORTERS, build_model, export
+from .report import Report
+
+COLUMNS = ['model', 'blocks', 'interfaces', 'points', 'build_s', 'export_s', 'total_s', 'status']
+
+
+def model_dirs(files, outdir):
+    # one output directory per model, named after the file (numbered when two names are the same)
+    dirs = []
+    used = set()
+    for filename in files:
+        name = os.path.splitext(os.path.basename(filename))[0]
+        unique = name
+        kk = 1
+        while unique in used:
+            kk = kk + 1
+            unique = name + "_" + str(kk)
+        used.add(unique)
+        dirs.append(os.path.join(outdir, unique))
+    return dirs
+
+
+def run_model(job):
+    # run one model, return its row of the summary
+    filename, UnitsTag, outdir, exporters, cache, report, memory = job
+    row = {'model': filename, 'blocks': "", 'interfaces': "", 'points': "", 'build_s': "", 'export_s': "", 'status': "ok"}
+    start = time.time()
+    try:
+        blocks = read_blocks(filename)
+        stages = Report(enabled=report, memory=memory)
+        model = build_model(blocks, UnitsTag, cache=cache, report=stages)
+        row['build_s'] = time.time() - start
+        row['blocks'] = model.N_blocks
+        row['interfaces'] = sum(model.TotalContact)
+        row['points'] = model.Num_points
+        export(model, outdir, exporters, stages)
+        row['export_s'] = time.time() - start - row['build_s']
+        if report:
+            stages.write(outdir)
+    except Exception as error:
+        row['status'] = type(error).__name__ + ": " + str(error)
+    row['total_s'] = time.time() - start
+    return row
+
+
+def run_batch(files, UnitsTag, outdir=".", exporters=("liablock", "3dec", "opensees"), jobs=None, cache=None, report=False,
+              memory=False):
+    # rows of the summary, in the order of files; jobs processes (all the cores by default)
+    # memory: the report also records the peak of the memory of each stage
+    dirs = model_dirs(files, outdir)
+    work = [(files[kk], UnitsTag, dirs[kk], list(exporters), cache, report or memory, memory) for kk in range(len(files))]
+    if jobs == 1:
+        return [run_model(job) for job in work]
+    pool = ProcessPoolExecutor(max_workers=jobs)
+    try:
+        return list(pool.map(run_model, work))
+    finally:
+        pool.shutdown()
+
+
+def summary_table(rows):
+    # rows as an aligned text table
+    lines = []
+    cells = [[str(row[name]) if not isinstance(row[name], float) else "%.3f" % row[name] for name in COLUMNS] for row in rows]
+    widths = [max([len(COLUMNS[kk])] + [len(cell[kk]) for cell in cells]) for kk in range(len(COLUMNS))]
+    lines.append("  ".join([COLUMNS[kk].ljust(widths[kk]) for kk in range(len(COLUMNS))]))
+    for cell in cells:
+        lines.append("  ".join([cell[kk].ljust(widths[kk]) for kk in range(len(COLUMNS))]))
+    return "\n".join(lines)
+
+
+def write_summary(rows, filename):
+    f = open(filename, "w")
+    f.write(",".join(COLUMNS) + "\n")
+    for row in rows:
+        f.write(",".join(['"' + str(row[name]).replace('"', "'") + '"' if name in ('model', 'status') else
+                          ("%.6f" % row[name] if isinstance(row[name], float) else str(row[name])) for name in COLUMNS]) + "\n")
+    f.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="finditeasy3d.batch", description="Find It Easy! 3D on many models")
+    parser.add_argument("models", nargs="+", help="files with the min/max corners of the blocks (3DEC 'poly brick' lines or 6 columns)")
+    parser.add_argument("--units", required=True, choices=["mm", "cm", "m"], help="unit of measure of the models")
+    parser.add_argument("--out", default=".", help="directory of the output directories")
+    parser.add_argument("--exporters", nargs="+", default=["liablock", "3dec", "opensees"], choices=sorted(EXPORTERS))
+    parser.add_argument("--jobs", type=int, default=None, help="models run at the same time (default: number of cores)")
+    parser.add_argument("--cache", default=None, help="directory of the cache of the stage results (sections 1-5)")
+    parser.add_argument("--report", action="store_true", help="write FindItEasyReport.json/.csv for every model")
+    parser.add_argument("--report-memory", action="store_true", help="--report with the peak of the memory of each stage (much slower)")
+    args = parser.parse_args(argv)
+
+    rows = run_batch(args.models, args.units, args.out, args.exporters, args.jobs, args.cache, args.report,
+                     args.report_memory)
+    if not os.path.isdir(args.out):
+        os.makedirs(args.out)
+    write_summary(rows, os.path.join(args.out, "summary.csv"))
+    print(summary_table(rows))
+    failed = len([row for row in rows if row['status'] != "ok"])
+    if failed:
+        print(str(failed) + " of " + str(len(rows)) + " models failed")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,134 @@
+##----- FIND IT EASY! 3D - CACHE OF THE STAGE RESULTS -----##
+# the results of extraction (section 1), contact pairs (section 2) and contact points
+# (sections 3-5) are saved in a cache directory, one pickle file per stage, named by the hash of
+# everything the stage depends on:
+#   geometry:  block coordinates and RoundUnit
+#   contacts:  key of the geometry
+#   points:    key of the contacts and YTolFactor
+# a rerun on the same blocks and units loads the three stages and goes straight to the exporters.
+# files are touched when read; when the directory is larger than max_bytes the least recently
+# used files are deleted
+
+import hashlib
+import os
+import pickle
+
+CACHE_VERSION = 4                       # change it when the content of a stage changes
+
+# model attributes saved for each stage
+STAGES = {'geometry': ['N_blocks', 'Box', 'face_center', 'Dimensions', 'Volume', 'Block_center', 'BlockVertex', 'FacePoints'],
+          'contacts': ['ContBlockID', 'ContSurfID'],
+          'points':   ['FaceCorners', 'Index', 'Num_points', 'BlockPoints', 'Max', 'TotalContact']}
+
+
+def digest(*parts):
+    sha = hashlib.sha1()
+    for part in parts:
+        sha.update((repr(part) + ";").encode("utf-8"))
+    return sha.hexdigest()
+
+
+def stage_keys(model, blocks):
+    # keys of the three stages; the coordinates are hashed exactly (repr of the floats) since
+    # centres and sizes are computed on them before rounding
+    sha = hashlib.sha1()
+    for block in blocks:
+        sha.update((",".join([repr(float(x)) for x in block[:6]]) + "\n").encode("utf-8"))
+    geometry = digest(CACHE_VERSION, 'geometry', model.RoundUnit, sha.hexdigest())
+    contacts = digest(CACHE_VERSION, 'contacts', geometry)
+    points = digest(CACHE_VERSION, 'points', contacts, model.YTolFactor)
+    return {'geometry': geometry, 'contacts': contacts, 'points': points}
+
+
+class StageCache(object):
+    # directory of pickle files, size bounded with least recently used eviction
+
+    def __init__(self, path, max_bytes=512*2**20):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        if not os.path.isdir(path):
+            os.makedirs(path)
+
+    def filename(self, key):
+        return os.path.join(self.path, key + ".pkl")
+
+    def get(self, key):
+        filename = self.filename(key)
+        try:
+            f = open(filename, "rb")
+        except IOError:
+            self.misses = self.misses + 1
+            return None
+        try:
+            data = pickle.load(f)
+        except Exception:
+            # truncated or written by another version
+            self.misses = self.misses + 1
+            return None
+        finally:
+            f.close()
+        os.utime(filename, None)
+        self.hits = self.hits + 1
+        return data
+
+    def put(self, key, data):
+        filename = self.filename(key)
+        tmp = filename + "." + str(os.getpid()) + ".tmp"
+        f = open(tmp, "wb")
+        try:
+            pickle.dump(data, f, 2)
+        finally:
+            f.close()
+        try:
+            os.rename(tmp, filename)
+        except OSError:
+            os.remove(tmp)
+        self.evict(keep=key)
+
+    def entries(self):
+        # (last use, size, filename) of the cache files, least recently used first
+        entries = []
+        for name in os.listdir(self.path):
+            if name.endswith(".pkl"):
+                filename = os.path.join(self.path, name)
+                stat = os.stat(filename)
+                entries.append((stat.st_mtime, stat.st_size, filename))
+        entries.sort()
+        return entries
+
+    def size(self):
+        return sum([entry[1] for entry in self.entries()])
+
+    def evict(self, keep=None):
+        entries = self.entries()
+        total = sum([entry[1] for entry in entries])
+        for mtime, size, filename in entries:
+            if total <= self.max_bytes:
+                break
+            if keep is not None and filename == self.filename(keep):
+                continue
+            os.remove(filename)
+            total = total - size
+
+    def clear(self):
+        for mtime, size, filename in self.entries():
+            os.remove(filename)
+
+
+def load_stage(cache, keys, model, stage):
+    # fill the attributes of the stage from the cache, return False when they are not there
+    if cache is None:
+        return False
+    data = cache.get(keys[stage])
+    if data is None:
+        return False
+    for name in STAGES[stage]:
+        setattr(model, name, data[name])
+    return True
+
+
+def store_stage(cache, keys, model, stage):
+    if cache is not None:
+        cache.put(keys[stage], dict([(name, getattr(model, name)) for name in STAGES[stage]]))
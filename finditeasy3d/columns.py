@@ -0,0 +1,179 @@
+##----- FIND IT EASY! 3D - COLUMNAR MODEL FILES -----##
+# the model of sections 1-5 saved as a directory of .npy columns (requires numpy), so that the
+# exporters can run later without the extraction and large models open with numpy.load(mmap_mode='r')
+#   header.json                              units, sizes and the list of the columns (dtype, shape)
+#   blocks              N_blocks x 6   float64   min/max corners given as input (x0 y0 z0 x1 y1 z1)
+#   box                 N_blocks x 6   int64     min/max corners on the grid of tol (Box, coordinates = box/10**RoundUnit)
+#   block_center        N_blocks x 3   float64   block center
+#   block_size          N_blocks x 3   float64   block size along x, y, z
+#   volume              N_blocks       float64   block volume
+#   contact_offsets     6*N_blocks+1   int64     first contact of the face jj of block ii at [ii*6 + jj]
+#   contact_block       N_contacts     int64     block in contact (ContBlockID)
+#   contact_face        N_contacts     int8      face in contact (ContSurfID)
+#   interface_offsets   6*N_blocks+1   int64     first interface of the face jj of block ii at [ii*6 + jj]
+#   interface_corners   N_inter x 4 x 3 float64  corners of the interfaces (FaceCorners)
+#   interface_index     N_inter x 4    int64     point indices of the corners (Index)
+#   block_points        N_blocks       int64     contact points numbered by each block (BlockPoints)
+#
+#   finditeasy3d.save_columns(model, "output/FindItEasyModel")
+#   columns = finditeasy3d.open_columns("output/FindItEasyModel")      # memory mapped arrays
+#   model = finditeasy3d.load_model("output/FindItEasyModel")          # Model for the exporters
+
+import json
+import os
+
+import numpy as np
+
+from .model import Model
+from .geometry import FACE_VERTICES, block_vertices
+from .spatial import SpatialIndex
+from .store import ContactStore
+
+FORMAT = "finditeasy3d-columns"
+FORMAT_VERSION = 3
+
+
+def contact_columns(model):
+    # ContBlockID and ContSurfID in CSR layout
+    counts = [len(model.ContBlockID[ii][jj]) for ii in range(model.N_blocks) for jj in range(model.Nfaces)]
+    offsets = np.zeros(len(counts) + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    block = np.fromiter([BI for row in model.ContBlockID for face in row for BI in face], dtype=np.int64, count=offsets[-1])
+    face = np.fromiter([SI for row in model.ContSurfID for face in row for SI in face], dtype=np.int8, count=offsets[-1])
+    return offsets, block, face
+
+
+def save_columns(model, path):
+    if not os.path.isdir(path):
+        os.makedirs(path)
+    N_blocks = model.N_blocks
+    store = ContactStore.from_model(model)
+    contact_offsets, contact_block, contact_face = contact_columns(model)
+    columns = {'blocks': np.asarray(model.blocks, dtype=np.float64).reshape(-1, 6),
+               'box': np.asarray(model.Box, dtype=np.int64).reshape(-1, 6),
+               'block_center': np.asarray(model.Block_center, dtype=np.float64).reshape(-1, 3),
+               'block_size': np.array([[model.Dimensions[ii][4][0], model.Dimensions[ii][1][1], model.Dimensions[ii][1][2]]
+                                       for ii in range(N_blocks)], dtype=np.float64).reshape(-1, 3),
+               'volume': np.asarray(model.Volume, dtype=np.float64),
+               'contact_offsets': contact_offsets,
+               'contact_block': contact_block,
+               'contact_face': contact_face,
+               'interface_offsets': store.offsets,
+               'interface_corners': store.corners,
+               'interface_index': store.index,
+               'block_points': np.asarray(model.BlockPoints, dtype=np.int64)}
+    header = {'format': FORMAT, 'version': FORMAT_VERSION, 'UnitsTag': model.UnitsTag, 'RoundUnit': model.RoundUnit,
+              'YTolFactor': model.YTolFactor, 'Nfaces': model.Nfaces, 'N_blocks': N_blocks,
+              'Num_points': model.Num_points, 'Max': model.Max, 'TotalContact': list(model.TotalContact),
+              'columns': {}}
+    for name in sorted(columns):
+        np.save(os.path.join(path, name + ".npy"), columns[name])
+        header['columns'][name] = [columns[name].dtype.str, list(columns[name].shape)]
+    # the header is written last: a directory without it is not a complete model
+    f = open(os.path.join(path, "header.json"), "w")
+    json.dump(header, f, indent=1, sort_keys=True)
+    f.close()
+    return columns
+
+
+class Columns(object):
+    # arrays of a saved model, opened when first used (memory mapped with mmap_mode='r')
+
+    def __init__(self, path, mmap_mode='r'):
+        self.path = path
+        self.mmap_mode = mmap_mode
+        f = open(os.path.join(path, "header.json"))
+        try:
+            self.header = json.load(f)
+        finally:
+            f.close()
+        if self.header.get('format') != FORMAT or self.header.get('version') != FORMAT_VERSION:
+            raise ValueError("'" + path + "' is not a model saved by save_columns (version " + str(FORMAT_VERSION) + ")")
+        self.arrays = {}
+        self.N_blocks = self.header['N_blocks']
+        self.Nfaces = self.header['Nfaces']
+
+    def __getitem__(self, name):
+        if name not in self.arrays:
+            if name not in self.header['columns']:
+                raise KeyError(name)
+            filename = os.path.join(self.path, name + ".npy")
+            try:
+                self.arrays[name] = np.load(filename, mmap_mode=self.mmap_mode)
+            except ValueError:
+                # empty columns cannot be memory mapped
+                self.arrays[name] = np.load(filename)
+        return self.arrays[name]
+
+    def names(self):
+        return sorted(self.header['columns'])
+
+    def contacts(self, ii, jj):
+        # blocks and faces in contact with the face jj of block ii
+        start = self['contact_offsets'][ii*self.Nfaces + jj]
+        end = self['contact_offsets'][ii*self.Nfaces + jj + 1]
+        return self['contact_block'][start:end], self['contact_face'][start:end]
+
+    def store(self):
+        # interfaces as a ContactStore on the (memory mapped) columns
+        return ContactStore(self['interface_offsets'], self['interface_corners'], self['interface_index'], self.Nfaces)
+
+
+def open_columns(path, mmap_mode='r'):
+    return Columns(path, mmap_mode)
+
+
+def load_model(path):
+    # Model of sections 1-5 rebuilt from the columns (nested lists, as build_model leaves it)
+    columns = Columns(path, mmap_mode=None)
+    header = columns.header
+    model = Model(header['UnitsTag'], header['YTolFactor'])
+    N_blocks = header['N_blocks']
+    Nfaces = model.Nfaces
+
+    # Geometry (section 1)
+    model.N_blocks = N_blocks
+    model.blocks = columns['blocks'].tolist()
+    model.Box = [tuple(row) for row in columns['box'].tolist()]
+    boxes = (columns['box']/10.**model.RoundUnit).tolist()
+    center = columns['block_center'].tolist()
+    size = columns['block_size'].tolist()
+    model.Volume = columns['volume'].tolist()
+    model.face_center = [0 for row in range(N_blocks)]
+    model.Dimensions = [0 for row in range(N_blocks)]
+    model.Block_center = [0 for row in range(N_blocks)]
+    model.BlockVertex = [0 for row in range(N_blocks)]
+    model.FacePoints = [0 for row in range(N_blocks)]
+    for ii in range(N_blocks):
+        x0, y0, z0, x1, y1, z1 = boxes[ii]
+        cx, cy, cz = center[ii]
+        dx, dy, dz = size[ii]
+        model.face_center[ii] = [[cx, y0, cz], [x1, cy, cz], [cx, y1, cz],
+                                 [x0, cy, cz], [cx, cy, z0], [cx, cy, z1]]
+        model.Dimensions[ii] = [[dx, y0, dz], [x1, dy, dz], [dx, y1, dz],
+                                [x0, dy, dz], [dx, dy, z0], [dx, dy, z1]]
+        model.Block_center[ii] = (cx, cy, cz)
+        model.BlockVertex[ii] = block_vertices(x0, y0, z0, x1, y1, z1)
+        model.FacePoints[ii] = [[model.BlockVertex[ii][ff] for ff in FACE_VERTICES[jj]] for jj in range(Nfaces)]
+    model.index = SpatialIndex(model)
+
+    # Contact pairs (section 2)
+    offsets = columns['contact_offsets'].tolist()
+    block = columns['contact_block'].tolist()
+    face = columns['contact_face'].tolist()
+    model.ContBlockID = [[block[offsets[ii*Nfaces + jj]:offsets[ii*Nfaces + jj + 1]] for jj in range(Nfaces)]
+                         for ii in range(N_blocks)]
+    model.ContSurfID = [[face[offsets[ii*Nfaces + jj]:offsets[ii*Nfaces + jj + 1]] for jj in range(Nfaces)]
+                        for ii in range(N_blocks)]
+
+    # Contact points (sections 3-5)
+    model.FaceCorners, model.Index = columns.store().to_lists()
+    model.Num_points = header['Num_points']
+    model.BlockPoints = columns['block_points'].tolist()
+    model.Max = header['Max']
+    model.TotalContact = list(header['TotalContact'])
+    return model
+
+
+def write_columns(model, filename="FindItEasyModel"):
+    save_columns(model, filename)
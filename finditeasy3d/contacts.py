@@ -0,0 +1,96 @@
+##----- 2. FIND CONTACT PAIRS -----##
+# two faces are in contact when they lie on the same plane and their rectangles overlap by more
+# than tol in both in-plane directions; the test runs on the integer corners of the blocks (Box),
+# so planes are compared exactly and there is no rounding noise at the tolerance
+# the faces are grouped by plane coordinate and the pairs are found by a sort-and-sweep
+# along one in-plane direction: O(N log N + K) instead of comparing all the block pairs
+
+import heapq
+
+# faces belonging to the same plane orientation, coordinate of the plane in Dimensions
+# and in-plane directions
+#   xy-plane: faces 4,5 (z)     yz-plane: faces 1,3 (x)     xz-plane: faces 0,2 (y)
+PLANES = [((4, 5), 2, (1, 0)),
+          ((1, 3), 0, (2, 1)),
+          ((0, 2), 1, (2, 0))]
+
+# corner of the box (0: min, 1: max) holding the plane of each face
+FACE_SIDE = [0, 1, 1, 0, 0, 1]
+
+
+def face_plane(model, ii, pp, nn):
+    # plane coordinate of face pp of block ii on the grid of tol
+    return model.Box[ii][3*FACE_SIDE[pp] + nn]
+
+
+def in_contact(model, ii, pp, mm, tt, nn, aa, bb):
+    # test of the original script on the grid of tol: same plane, and
+    # |center distance| - (sum of the sizes)/2 < -tol along aa and bb (doubled: center = min + max)
+    A = model.Box[ii]
+    B = model.Box[mm]
+    if A[3*FACE_SIDE[pp] + nn] == B[3*FACE_SIDE[tt] + nn]:
+        for cc in (aa, bb):
+            if abs(A[cc] + A[cc+3] - B[cc] - B[cc+3]) - (A[cc+3] - A[cc] + B[cc+3] - B[cc]) >= -2:
+                return False
+        return True
+    return False
+
+
+def group_planes(model, faces, nn):
+    # faces grouped by their plane coordinate
+    planes = {}
+    for ii in range(model.N_blocks):
+        for pp in faces:
+            key = face_plane(model, ii, pp, nn)
+            if key not in planes:
+                planes[key] = []
+            planes[key].append((ii, pp))
+    return planes
+
+
+def sweep(model, group, aa):
+    # candidate pairs of faces of the group whose intervals along aa overlap by more than tol
+    items = [(model.Box[ii][aa], model.Box[ii][aa+3], ii, pp) for ii, pp in group]
+    items.sort()
+
+    active = []                                 # heap of the intervals still open: (upper bound, item)
+    for item in items:
+        while active and active[0][0] <= item[0] + 1:
+            heapq.heappop(active)
+        for other in active:
+            other = other[1]
+            if other[3] != item[3] and other[2] != item[2]:
+                yield other[2], other[3], item[2], item[3]
+        heapq.heappush(active, (item[1], item))
+
+
+def find_contact_pairs(model):
+    # Fill ContBlockID and ContSurfID
+    N_blocks = model.N_blocks
+    Nfaces = model.Nfaces
+
+    # Initialize variables
+    ContBlockID = [[[] for col in range(Nfaces)] for row in range(N_blocks)]  # contains, for each block face, the id of the block in contact with that face
+    ContSurfID  = [[[] for col in range(Nfaces)] for row in range(N_blocks)]  # contains, for each block face, the id of the face in contact with that face
+
+    # Define contact pairs in xy-, yz- and xz-plane
+    for faces, nn, (aa, bb) in PLANES:
+        planes = group_planes(model, faces, nn)
+        for key in planes:
+            for ii, pp, mm, tt in sweep(model, planes[key], aa):
+                if in_contact(model, ii, pp, mm, tt, nn, aa, bb):
+                    ContBlockID[ii][pp].append(mm)
+                    ContSurfID [ii][pp].append(tt)
+                    ContBlockID[mm][tt].append(ii)
+                    ContSurfID [mm][tt].append(pp)
+
+    # Sort the contacts of each face by block id (order of the original script)
+    for ii in range(N_blocks):
+        for jj in range(Nfaces):
+            pairs = sorted(zip(ContBlockID[ii][jj], ContSurfID[ii][jj]))
+            ContBlockID[ii][jj] = [pair[0] for pair in pairs]
+            ContSurfID [ii][jj] = [pair[1] for pair in pairs]
+
+    model.ContBlockID = ContBlockID
+    model.ContSurfID = ContSurfID
+    return model
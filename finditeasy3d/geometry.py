@@ -0,0 +1,86 @@
+##----- 1. BLOCK GEOMETRY FROM AXIS-ALIGNED BOXES -----##
+# every block is given by its min/max corners: [x0, y0, z0, x1, y1, z1]
+# face ids follow the order of an exploded Rhino box:
+#   0: xz-plane at y = y0       1: yz-plane at x = x1       2: xz-plane at y = y1
+#   3: yz-plane at x = x0       4: xy-plane at z = z0       5: xy-plane at z = z1
+# block vertices follow the order LiA_Block wants (sorted wrt z, y, x and then 2-3, 6-7 swapped)
+# the corners are quantized once on the grid of tol (Box, integers): the stages compare these
+# integers, and every rounded coordinate is exactly Box/10**RoundUnit
+
+from .spatial import quantize
+
+# vertices (BlockVertex ids) of the polyline representing each face, in the order of the joined
+# edges of an exploded Rhino box: the first edge is along z for the vertical faces
+FACE_VERTICES = [[4, 0, 1, 5],
+                 [5, 1, 2, 6],
+                 [6, 2, 3, 7],
+                 [7, 3, 0, 4],
+                 [0, 1, 2, 3],
+                 [4, 5, 6, 7]]
+
+# columns of Box (X0, Y0, Z0, X1, Y1, Z1) of the coordinates of each vertex
+VERTEX_BOX = [[0, 1, 2], [3, 1, 2], [3, 4, 2], [0, 4, 2],
+              [0, 1, 5], [3, 1, 5], [3, 4, 5], [0, 4, 5]]
+
+
+def block_vertices(x0, y0, z0, x1, y1, z1):
+    # 8 vertices of the box in the order LiA_Block wants
+    return [(x0, y0, z0), (x1, y0, z0), (x1, y1, z0), (x0, y1, z0),
+            (x0, y0, z1), (x1, y0, z1), (x1, y1, z1), (x0, y1, z1)]
+
+
+def extract_geometry(model, blocks):
+    # Fill face_center, Dimensions, Volume, Block_center, BlockVertex and FacePoints
+    RoundUnit = model.RoundUnit
+    N_blocks = len(blocks)
+
+    # Initialize variables
+    face_center = [0 for row in range(N_blocks)]
+    Dimensions = [0 for row in range(N_blocks)]
+    Volume = [-1 for row in range(N_blocks)]
+    Block_center = [0 for row in range(N_blocks)]
+    BlockVertex = [0 for row in range(N_blocks)]
+    FacePoints = [0 for row in range(N_blocks)]
+    Box = [0 for row in range(N_blocks)]
+
+    for ii in range(N_blocks):
+        # centers and sizes are computed on the exact corners and then rounded (as Rhino measures them)
+        c = blocks[ii]
+        X0, X1 = min(c[0], c[3]), max(c[0], c[3])
+        Y0, Y1 = min(c[1], c[4]), max(c[1], c[4])
+        Z0, Z1 = min(c[2], c[5]), max(c[2], c[5])
+        x0, y0, z0 = round(X0, RoundUnit), round(Y0, RoundUnit), round(Z0, RoundUnit)
+        x1, y1, z1 = round(X1, RoundUnit), round(Y1, RoundUnit), round(Z1, RoundUnit)
+        cx = round((X0 + X1)*0.5, RoundUnit)                       # block (and face) center
+        cy = round((Y0 + Y1)*0.5, RoundUnit)
+        cz = round((Z0 + Z1)*0.5, RoundUnit)
+        dx = round(X1 - X0, RoundUnit)                             # block size
+        dy = round(Y1 - Y0, RoundUnit)
+        dz = round(Z1 - Z0, RoundUnit)
+        face_center[ii] = [[cx, y0, cz], [x1, cy, cz], [cx, y1, cz],
+                           [x0, cy, cz], [cx, cy, z0], [cx, cy, z1]]
+        Dimensions[ii] = [[dx, y0, dz], [x1, dy, dz], [dx, y1, dz],
+                          [x0, dy, dz], [dx, dy, z0], [dx, dy, z1]]
+        Volume[ii] = Dimensions[ii][1][1]*Dimensions[ii][1][2]*Dimensions[ii][4][0]
+        Block_center[ii] = (cx, cy, cz)
+        BlockVertex[ii] = block_vertices(x0, y0, z0, x1, y1, z1)
+        Box[ii] = quantize((x0, y0, z0), model.tol) + quantize((x1, y1, z1), model.tol)
+        FacePoints[ii] = [[BlockVertex[ii][ff] for ff in FACE_VERTICES[jj]] for jj in range(6)]
+
+    model.N_blocks = N_blocks
+    model.face_center = face_center
+    model.Dimensions = Dimensions
+    model.Volume = Volume
+    model.Block_center = Block_center
+    model.BlockVertex = BlockVertex
+    model.FacePoints = FacePoints
+    model.Box = Box
+    return model
+
+
+def max_length(model):
+    # max block length (used for the size of the text drawn in Rhino)
+    maxLength = 0
+    for ii in range(model.N_blocks):
+        maxLength = max(maxLength, model.Dimensions[ii][1][1], model.Dimensions[ii][1][2], model.Dimensions[ii][0][0])
+    return maxLength
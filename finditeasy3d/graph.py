@@ -0,0 +1,148 @@
+##----- FIND IT EASY! 3D - CONTACT GRAPH -----##
+# the interfaces of a model as a graph over the blocks in CSR layout (requires numpy)
+# one edge per interface, seen from each of its two blocks, ordered by block, face and interface
+# (the order of FaceCorners and Index):
+#   indptr[ii]:indptr[ii+1]   edges of block ii
+#   indices        neighbour block (-1 for the base contact, on the ground)
+#   face           face of the block (0-5)          other_face   face of the neighbour (-1 on the ground)
+#   plane          0: XZ, 1: YZ, 2: XY (order of TotalContact)
+#   polygon        E x 4 x 3 corners of the interface        index   E x 4 point indices
+#   area           area of the interface                     normal  E x 3 outward normal of the face
+#
+#   graph = finditeasy3d.ContactGraph.from_model(model)
+#   graph.neighbours(12), graph.in_plane("XY"), graph.degree_stats(), graph.to_scipy()
+#
+# the "graph" exporter saves these arrays in FindItEasyContactGraph.npz (read_graph: dict of arrays)
+
+import numpy as np
+
+from .store import ContactStore
+
+PLANE_NAMES = ["XZ", "YZ", "XY"]
+FACE_PLANE = np.array([0, 1, 0, 1, 2, 2], dtype=np.int8)                 # plane of each face
+FACE_NORMAL = np.array([[0, -1, 0], [1, 0, 0], [0, 1, 0],
+                        [-1, 0, 0], [0, 0, -1], [0, 0, 1]], dtype=np.float64)
+PLANE_AXES = np.array([[0, 2], [1, 2], [0, 1]])                           # in-plane axes of each plane
+ARRAYS = ['indptr', 'indices', 'face', 'other_face', 'plane', 'polygon', 'index', 'area', 'normal']
+
+
+class ContactGraph(object):
+
+    def __init__(self, store, contact_offsets, contact_block, contact_face):
+        # store: ContactStore of the interfaces; contact_*: ContBlockID/ContSurfID in CSR layout
+        self.store = store
+        self.N_blocks = store.N_blocks
+        Nfaces = store.Nfaces
+        self.indptr = np.asarray(store.offsets[::Nfaces], dtype=np.int64)
+        self.polygon = store.corners
+        self.index = store.index
+
+        # block face of each edge and position of the edge among the interfaces of the face
+        slot = np.repeat(np.arange(self.N_blocks*Nfaces), np.diff(store.offsets))
+        kk = np.arange(len(slot)) - store.offsets[slot]
+        self.face = (slot % Nfaces).astype(np.int8)
+
+        # interface kk of a face lies on the contact kk; the base contact has no neighbour
+        contact_offsets = np.asarray(contact_offsets, dtype=np.int64)
+        has_block = kk < np.diff(contact_offsets)[slot]
+        pos = contact_offsets[slot[has_block]] + kk[has_block]
+        self.indices = np.full(len(slot), -1, dtype=np.int64)
+        self.indices[has_block] = np.asarray(contact_block)[pos]
+        self.other_face = np.full(len(slot), -1, dtype=np.int8)
+        self.other_face[has_block] = np.asarray(contact_face)[pos]
+
+        self.plane = FACE_PLANE[self.face]
+        self.normal = FACE_NORMAL[self.face]
+        extent = self.polygon.max(axis=1) - self.polygon.min(axis=1) if len(slot) else np.zeros((0, 3))
+        axes = PLANE_AXES[self.plane]
+        rows = np.arange(len(slot))
+        self.area = extent[rows, axes[:, 0]]*extent[rows, axes[:, 1]]
+
+    @classmethod
+    def from_model(cls, model):
+        from .columns import contact_columns
+        return cls(ContactStore.from_model(model), *contact_columns(model))
+
+    @classmethod
+    def from_columns(cls, columns):
+        # from the (memory mapped) columns of a saved model (open_columns)
+        return cls(columns.store(), columns['contact_offsets'], columns['contact_block'], columns['contact_face'])
+
+    ##----- QUERIES -----##
+
+    def __len__(self):
+        return len(self.indices)
+
+    def edges(self, ii):
+        # edge ids of block ii
+        return np.arange(self.indptr[ii], self.indptr[ii + 1])
+
+    def neighbours(self, ii):
+        # blocks in contact with block ii, sorted (the ground is left out)
+        near = np.unique(self.indices[self.indptr[ii]:self.indptr[ii + 1]])
+        return near[near >= 0]
+
+    def in_plane(self, plane):
+        # edge ids of the interfaces in a plane ("XY", "XZ", "YZ" or 0-2)
+        if not isinstance(plane, (int, np.integer)):
+            plane = PLANE_NAMES.index(plane.upper())
+        return np.flatnonzero(self.plane == plane)
+
+    def owners(self):
+        # block of each edge
+        return np.repeat(np.arange(self.N_blocks), np.diff(self.indptr))
+
+    def degree(self, interfaces=True):
+        # interfaces of each block, or number of distinct neighbour blocks (interfaces=False)
+        if interfaces:
+            return np.diff(self.indptr)
+        pairs = np.unique(np.stack([self.owners(), self.indices])[:, self.indices >= 0], axis=1)
+        return np.bincount(pairs[0], minlength=self.N_blocks)
+
+    def degree_stats(self, interfaces=True):
+        degree = self.degree(interfaces)
+        if len(degree) == 0:
+            return {'min': 0, 'max': 0, 'mean': 0., 'median': 0., 'histogram': []}
+        return {'min': int(degree.min()), 'max': int(degree.max()), 'mean': float(degree.mean()),
+                'median': float(np.median(degree)), 'histogram': np.bincount(degree).tolist()}
+
+    def isolated(self):
+        # blocks without interfaces (floating, not even on the ground)
+        return np.flatnonzero(np.diff(self.indptr) == 0)
+
+    def total_contact(self):
+        # interfaces in XZ-, YZ- and XY-plane (same as model.TotalContact)
+        return np.bincount(self.plane, minlength=3).tolist()
+
+    def max_interfaces(self):
+        # max number of interfaces per block (same as model.Max)
+        return int(np.diff(self.indptr).max()) if self.N_blocks else 0
+
+    def to_scipy(self, weight="area"):
+        # N_blocks x N_blocks scipy.sparse.csr_matrix; weight: "area" (summed over the interfaces
+        # between two blocks) or "count"; the base contacts are left out
+        from scipy.sparse import csr_matrix
+        keep = self.indices >= 0
+        if weight == "area":
+            data = self.area[keep]
+        elif weight == "count":
+            data = np.ones(int(keep.sum()))
+        else:
+            raise ValueError("Unknown weight '" + str(weight) + "' (type: area,count)")
+        matrix = csr_matrix((data, (self.owners()[keep], self.indices[keep])), shape=(self.N_blocks, self.N_blocks))
+        matrix.sum_duplicates()
+        return matrix
+
+    def save(self, filename):
+        np.savez_compressed(filename, N_blocks=np.asarray(self.N_blocks, dtype=np.int64),
+                            **dict([(name, np.asarray(getattr(self, name))) for name in ARRAYS]))
+
+
+def read_graph(filename):
+    # arrays of a saved graph (ARRAYS and N_blocks)
+    with np.load(filename) as f:
+        return dict([(name, f[name]) for name in f.files])
+
+
+def write_graph(model, filename="FindItEasyContactGraph.npz"):
+    ContactGraph.from_model(model).save(filename)
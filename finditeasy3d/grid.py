@@ -0,0 +1,112 @@
+##----- 8. SUB-BLOCK GRID WITH NUMPY -----##
+# the regular grid of every block (block bounds and interface corners along each axis) and the nodes
+# of its standard bricks, for all the blocks at once (requires numpy):
+#   - grid coordinates: one sort of the (block, coordinate) pairs per axis, duplicates dropped, on
+#     the integer grid of tol (Box); coordinates are Box/10**RoundUnit as the rounded ones
+#   - bricks: brick s of a block is (i, j, k) with i fastest, its 8 nodes are read from the grid
+#   - shared topology: point p of a block is (i, j, k) with i fastest, the bricks read their 8 node
+#     tags from the points
+# same nodes, bricks and vertex positions as subblock_grid (shared_grid), in time linear in the number of nodes
+
+import numpy as np
+
+from .store import ContactStore
+
+# offsets (along x, y, z) of the 8 nodes of a brick wrt its first grid point
+BRICK_NODES = np.array([[0, 1, 0], [0, 0, 0], [1, 0, 0], [1, 1, 0],
+                        [0, 1, 1], [0, 0, 1], [1, 0, 1], [1, 1, 1]], dtype=np.int64)
+
+
+def grid_coordinates(model, store=None):
+    # sorted grid coordinates of every block along each axis on the grid of tol, in CSR layout:
+    # [(offsets, values)] * 3
+    N_blocks = model.N_blocks
+    if store is None:
+        store = ContactStore.from_lists(model.FaceCorners, Nfaces=model.Nfaces)
+    Box = np.asarray(model.Box, dtype=np.int64).reshape(N_blocks, 6)
+    corners = np.rint(store.corners/model.tol).astype(np.int64)
+    owner = np.repeat(store.owners()[0], 4)
+    owner = np.concatenate([np.arange(N_blocks), np.arange(N_blocks), owner])
+    grid = []
+    for ff in range(3):
+        values = np.concatenate([Box[:, ff], Box[:, ff+3], corners[:, :, ff].ravel()])
+        order = np.lexsort((values, owner))
+        values = values[order]
+        block = owner[order]
+        keep = np.ones(len(values), dtype=bool)
+        keep[1:] = (block[1:] != block[:-1]) | (values[1:] != values[:-1])
+        offsets = np.zeros(N_blocks + 1, dtype=np.int64)
+        np.cumsum(np.bincount(block[keep], minlength=N_blocks), out=offsets[1:])
+        grid.append((offsets, values[keep]))
+    return grid
+
+
+def cells(n):
+    # block and (i, j, k) of the cells of every block (n[ii] cells along x, y, z, i fastest) and first
+    # cell of every block
+    N_blocks = len(n)
+    first = np.zeros(N_blocks + 1, dtype=np.int64)
+    np.cumsum(n.prod(axis=1), out=first[1:])
+    owner = np.repeat(np.arange(N_blocks), np.diff(first))
+    ss = np.arange(first[-1]) - first[owner]
+    nx, ny = n[owner, 0], n[owner, 1]
+    return owner, np.stack([ss % nx, (ss//nx) % ny, ss//(nx*ny)], axis=1), first
+
+
+def subblock_arrays(model, store=None):
+    # nodes of the standard bricks (8 per brick, bricks sorted wrt z, y, x), number of bricks of
+    # each block and position of the nodes at the block vertices, as subblock_grid returns them
+    grid = grid_coordinates(model, store)
+    n = np.stack([np.diff(grid[ff][0]) - 1 for ff in range(3)], axis=1)      # bricks along x, y, z
+    N_subBlock = n.prod(axis=1)
+
+    # brick (i, j, k) of every brick of the model
+    owner, ijk, first = cells(n)
+
+    # coordinates of the 8 nodes of every brick
+    Nodes = np.empty((len(owner), 8, 3), dtype=np.int64)
+    for ff in range(3):
+        offsets, values = grid[ff]
+        Nodes[:, :, ff] = values[offsets[owner][:, None] + ijk[:, ff][:, None] + BRICK_NODES[None, :, ff]]
+    Nodes = Nodes.reshape(-1, 3)/10.**model.RoundUnit
+
+    # vertex pp of a block: first or last brick along each axis (VERTEX_NODES of opensees.py)
+    from .opensees import VERTEX_NODES
+    corner = np.array([[aa, bb, cc] for aa, bb, cc, node in VERTEX_NODES], dtype=np.int64)
+    node = np.array([node for aa, bb, cc, node in VERTEX_NODES], dtype=np.int64)
+    last = corner[None, :, :]*(n[:, None, :] - 1)
+    brick = last[:, :, 0] + n[:, None, 0]*(last[:, :, 1] + n[:, None, 1]*last[:, :, 2])
+    IndVertex = 8*(first[:-1, None] + brick) + node[None, :]
+
+    points = list(zip(Nodes[:, 0].tolist(), Nodes[:, 1].tolist(), Nodes[:, 2].tolist()))
+    return points, N_subBlock.tolist(), IndVertex.tolist()
+
+
+def shared_arrays(model, store=None):
+    # shared topology: grid points of the blocks (sorted wrt z, y, x), 8 node tags of the standard
+    # bricks and position of the nodes at the block vertices, as shared_grid returns them
+    grid = grid_coordinates(model, store)
+    m = np.stack([np.diff(grid[ff][0]) for ff in range(3)], axis=1)          # grid points along x, y, z
+
+    # coordinates of the grid points (i, j, k) of every block
+    owner, ijk, first = cells(m)
+    Nodes = np.empty((len(owner), 3), dtype=np.int64)
+    for ff in range(3):
+        offsets, values = grid[ff]
+        Nodes[:, ff] = values[offsets[owner] + ijk[:, ff]]
+    Nodes = Nodes/10.**model.RoundUnit
+
+    # tags of the 8 nodes of every brick: grid point (i, j, k) has the tag first+i+mx*(j+my*k)+1
+    owner, ijk = cells(m - 1)[:2]
+    corner = ijk[:, None, :] + BRICK_NODES[None, :, :]
+    mx, my = m[owner, 0][:, None], m[owner, 1][:, None]
+    Bricks = first[owner][:, None] + corner[:, :, 0] + mx*(corner[:, :, 1] + my*corner[:, :, 2]) + 1
+
+    # vertex pp of a block: first or last grid point along each axis (VERTEX_NODES of opensees.py)
+    from .opensees import VERTEX_NODES
+    corner = np.array([[aa, bb, cc] for aa, bb, cc, node in VERTEX_NODES], dtype=np.int64)
+    last = corner[None, :, :]*(m[:, None, :] - 1)
+    IndVertex = first[:-1, None] + last[:, :, 0] + m[:, None, 0]*(last[:, :, 1] + m[:, None, 1]*last[:, :, 2])
+
+    points = list(zip(Nodes[:, 0].tolist(), Nodes[:, 1].tolist(), Nodes[:, 2].tolist()))
+    return points, Bricks.tolist(), IndVertex.tolist()
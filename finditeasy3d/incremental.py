@@ -0,0 +1,225 @@
+##----- 2.-5. INCREMENTAL UPDATE OF THE CONTACTS -----##
+# blocks removed, modified (new min/max corners) or added to a model built by build_model:
+# only the edited blocks and their neighbours (before and after the edit) are recomputed
+#   - geometry of the modified and added blocks (section 1)
+#   - contacts of their faces through the spatial index, and the contact lists of the
+#     neighbours patched in place (section 2)
+#   - face corners and contact points of the edited blocks and of the neighbours (sections 3-5)
+# the other blocks only change id (removed blocks) and point numbers (the new points of each
+# block follow the ones of the previous blocks). The result is the model build_model returns
+# on the edited list of blocks: kept blocks in their order, added blocks at the end
+# without removed blocks the ids do not change and the lists of the model are patched in place:
+# the cost follows the edit, except the point numbers of the blocks after an edited one, which
+# are shifted when the edit changes its number of points
+
+import bisect
+
+from .model import Model
+from .geometry import extract_geometry
+from .spatial import SpatialIndex
+from .points import block_face_corners, block_contact_points, block_point_indexes, count_contacts
+
+GEOMETRY = ['Box', 'face_center', 'Dimensions', 'Volume', 'Block_center', 'BlockVertex', 'FacePoints']
+
+
+def contact_counts(FaceCorners):
+    # contacts of a block in the XZ, YZ and XY planes (as count_contacts)
+    Num_cont = [len(face) for face in FaceCorners]
+    return [Num_cont[0] + Num_cont[2], Num_cont[1] + Num_cont[3], Num_cont[4] + Num_cont[5]]
+
+
+def add_contacts(model, Edited, Affected):
+    # contacts of the edited blocks, added to the lists of their neighbours in order (section 2)
+    index = model.index
+    for ii in sorted(Edited):
+        for pp in range(model.Nfaces):
+            for mm, tt in index.faces_touching(ii, pp):
+                model.ContBlockID[ii][pp].append(mm)
+                model.ContSurfID[ii][pp].append(tt)
+                if mm not in Edited:
+                    kk = bisect.bisect(model.ContBlockID[mm][tt], ii)
+                    model.ContBlockID[mm][tt].insert(kk, ii)
+                    model.ContSurfID[mm][tt].insert(kk, pp)
+                    Affected.add(mm)
+
+
+def update_in_place(model, modified, added):
+    # update_model without removed blocks: ids unchanged, only the edited blocks and their
+    # neighbours are visited
+    index = model.index
+    Nfaces = model.Nfaces
+    N_old = model.N_blocks
+    N_blocks = N_old + len(added)
+    Edited = set(list(modified) + list(range(N_old, N_blocks)))
+
+    # Contacts of the modified blocks removed from the lists of their neighbours (section 2)
+    Affected = set(Edited)
+    for ii in modified:
+        index.remove_block(ii)
+        for jj in range(Nfaces):
+            for mm, tt in zip(model.ContBlockID[ii][jj], model.ContSurfID[ii][jj]):
+                Affected.add(mm)
+                if mm not in modified:
+                    for kk in range(len(model.ContBlockID[mm][tt])):
+                        if model.ContBlockID[mm][tt][kk] == ii and model.ContSurfID[mm][tt][kk] == jj:
+                            del model.ContBlockID[mm][tt][kk]
+                            del model.ContSurfID[mm][tt][kk]
+                            break
+            model.ContBlockID[ii][jj] = []
+            model.ContSurfID[ii][jj] = []
+
+    # Geometry of the edited blocks (section 1)
+    EditedBlocks = sorted(Edited)
+    for ii in modified:
+        model.blocks[ii] = list(modified[ii][:6])
+    model.blocks.extend([list(block[:6]) for block in added])
+    edit = Model(model.UnitsTag, model.YTolFactor)
+    extract_geometry(edit, [model.blocks[ii] for ii in EditedBlocks])
+    for name in GEOMETRY:
+        values = getattr(model, name)
+        values.extend([0 for row in range(len(added))])
+        for kk in range(len(EditedBlocks)):
+            values[EditedBlocks[kk]] = getattr(edit, name)[kk]
+    model.N_blocks = N_blocks
+    index.block_cells.extend([[] for row in range(len(added))])
+    for ii in EditedBlocks:
+        index.add_block(ii)
+
+    # New contacts of the edited blocks
+    for ii in range(len(added)):
+        model.ContBlockID.append([[] for col in range(Nfaces)])
+        model.ContSurfID.append([[] for col in range(Nfaces)])
+        model.FaceCorners.append([[] for col in range(Nfaces)])
+        model.Index.append([[] for col in range(Nfaces)])
+        model.BlockPoints.append(0)
+    add_contacts(model, Edited, Affected)
+
+    # Face corners, contact points and indexes (sections 3-5) of the affected blocks, in order; the
+    # blocks up to the next affected one keep their points, shifted by the points gained before them
+    Affected = sorted(Affected)
+    Num_points = 8 + sum(model.BlockPoints[:Affected[0]])
+    shift = 0
+    recount = False                                             # a block with Max contacts lost some
+    for kk in range(len(Affected)):
+        ii = Affected[kk]
+        end = Affected[kk+1] if kk + 1 < len(Affected) else N_blocks
+        before = contact_counts(model.FaceCorners[ii])
+        model.FaceCorners[ii] = block_face_corners(model, ii)
+        block_contact_points(model, ii)
+        model.Index[ii], Last = block_point_indexes(model, ii, Num_points)
+        shift = shift + (Last - Num_points) - model.BlockPoints[ii]
+        model.BlockPoints[ii] = Last - Num_points
+        after = contact_counts(model.FaceCorners[ii])
+        model.TotalContact = [model.TotalContact[ff] + after[ff] - before[ff] for ff in range(3)]
+        if sum(before) == model.Max and sum(after) < model.Max:
+            recount = True
+        model.Max = max(model.Max, sum(after))
+        if shift != 0:
+            for bb in range(ii + 1, end):
+                model.Index[bb] = [[[fTmp + shift if fTmp > 8 else fTmp for fTmp in corners] for corners in face]
+                                   for face in model.Index[bb]]
+        Num_points = Last + sum(model.BlockPoints[ii+1:end])
+    model.Num_points = Num_points
+    if recount:
+        count_contacts(model)
+    return list(range(N_old))
+
+
+def update_model(model, removed=(), modified=None, added=()):
+    # removed: ids of the blocks to delete, modified: {id: [x0, y0, z0, x1, y1, z1]},
+    # added: min/max corners of the new blocks; return the new id of the old blocks (-1 if removed)
+    if modified is None:
+        modified = {}
+    removed = set(removed)
+    index = model.index
+    if index is None:
+        index = model.index = SpatialIndex(model)
+    N_old = model.N_blocks
+    if len(removed) == 0:
+        if len(modified) == 0 and len(added) == 0:
+            return list(range(N_old))
+        return update_in_place(model, modified, added)
+
+    # Neighbours of the blocks that are removed or change geometry (old ids)
+    Affected = set()
+    for ii in removed.union(modified):
+        for jj in range(model.Nfaces):
+            Affected.update(model.ContBlockID[ii][jj])
+        index.remove_block(ii)
+    Affected.difference_update(removed)
+
+    # New ids: kept blocks in their order, then the added ones
+    NewID = [-1 for row in range(N_old)]
+    Kept = [ii for ii in range(N_old) if ii not in removed]
+    for kk in range(len(Kept)):
+        NewID[Kept[kk]] = kk
+    N_blocks = len(Kept) + len(added)
+    Edited = set([NewID[ii] for ii in modified if ii not in removed] + list(range(len(Kept), N_blocks)))
+
+    # Geometry of the edited blocks (section 1)
+    edit = Model(model.UnitsTag, model.YTolFactor)
+    EditedBlocks = sorted(Edited)
+    model.blocks = [model.blocks[ii] for ii in Kept] + [list(block[:6]) for block in added]
+    for ii in modified:
+        if ii not in removed:
+            model.blocks[NewID[ii]] = list(modified[ii][:6])
+    extract_geometry(edit, [model.blocks[ii] for ii in EditedBlocks])
+    for name in GEOMETRY:
+        values = [getattr(model, name)[ii] for ii in Kept] + [0 for row in range(len(added))]
+        for kk in range(len(EditedBlocks)):
+            values[EditedBlocks[kk]] = getattr(edit, name)[kk]
+        setattr(model, name, values)
+    model.N_blocks = N_blocks
+    index.renumber(NewID, N_blocks)
+    for ii in EditedBlocks:
+        index.add_block(ii)
+
+    # Contacts of the kept blocks: new ids, without the blocks removed or modified (section 2)
+    Gone = removed.union(modified)
+    ContBlockID = [[[] for col in range(model.Nfaces)] for row in range(N_blocks)]
+    ContSurfID = [[[] for col in range(model.Nfaces)] for row in range(N_blocks)]
+    for ii in Kept:
+        if ii in modified:
+            continue
+        for jj in range(model.Nfaces):
+            for mm in range(len(model.ContBlockID[ii][jj])):
+                if model.ContBlockID[ii][jj][mm] not in Gone:
+                    ContBlockID[NewID[ii]][jj].append(NewID[model.ContBlockID[ii][jj][mm]])
+                    ContSurfID[NewID[ii]][jj].append(model.ContSurfID[ii][jj][mm])
+
+    # Contacts of the edited blocks, added to the lists of their neighbours in order
+    Affected = set([NewID[ii] for ii in Affected]).union(Edited)
+    model.ContBlockID = ContBlockID
+    model.ContSurfID = ContSurfID
+    add_contacts(model, Edited, Affected)
+
+    # Face corners, contact points and indexes (sections 3-5): recomputed for the affected
+    # blocks, the numbers of the others are shifted
+    FaceCorners = [0 for row in range(N_blocks)]
+    Index = [0 for row in range(N_blocks)]
+    BlockPoints = [0 for row in range(N_blocks)]
+    Offset = [8 for row in range(N_old)]                            # first number of each old block
+    for ii in range(1, N_old):
+        Offset[ii] = Offset[ii-1] + model.BlockPoints[ii-1]
+    for ii in Kept:
+        FaceCorners[NewID[ii]] = model.FaceCorners[ii]
+        Index[NewID[ii]] = model.Index[ii]
+        BlockPoints[NewID[ii]] = model.BlockPoints[ii]
+    model.FaceCorners = FaceCorners
+    Num_points = 8
+    for ii in range(N_blocks):
+        if ii in Affected:
+            model.FaceCorners[ii] = block_face_corners(model, ii)
+            block_contact_points(model, ii)
+            Index[ii], Last = block_point_indexes(model, ii, Num_points)
+            BlockPoints[ii] = Last - Num_points
+        else:
+            shift = Num_points - Offset[Kept[ii]]
+            if shift != 0:
+                Index[ii] = [[[fTmp + shift if fTmp > 8 else fTmp for fTmp in corners] for corners in face] for face in Index[ii]]
+        Num_points = Num_points + BlockPoints[ii]
+    model.Index = Index
+    model.BlockPoints = BlockPoints
+    model.Num_points = Num_points
+    count_contacts(model)
+    return NewID
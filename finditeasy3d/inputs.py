@@ -0,0 +1,44 @@
+##----- FIND IT EASY! 3D - INPUT BLOCKS -----##
+# read the min/max corners of the blocks from a text file, one block per line:
+#   3DEC file:      poly brick  x0,x1  y0,y1  z0,z1
+#   plain file:     x0 y0 z0 x1 y1 z1     (separated by spaces, tabs or commas)
+# empty lines, lines starting with '#' and other 3DEC commands are skipped
+
+
+def parse_block(line):
+    # min/max corners in a line of the file, None if the line is not a block
+    line = line.strip()
+    if line == "" or line.startswith("#"):
+        return None
+    if line.startswith("poly brick"):
+        values = line[len("poly brick"):].replace(",", " ").split()
+        if len(values) != 6:
+            raise ValueError("Invalid 3DEC block: " + line)
+        x0, x1, y0, y1, z0, z1 = [float(v) for v in values]
+        return [x0, y0, z0, x1, y1, z1]
+    values = line.replace(",", " ").split()
+    try:
+        values = [float(v) for v in values]
+    except ValueError:
+        return None                                     # 3DEC commands (new, plot, ...)
+    if len(values) != 6:
+        raise ValueError("Invalid block, 6 coordinates expected: " + line)
+    return values
+
+
+def read_blocks(filename):
+    blocks = []
+    f = open(filename, "r")
+    for line in f:
+        block = parse_block(line)
+        if block is not None:
+            blocks.append(block)
+    f.close()
+    return blocks
+
+
+def write_blocks(blocks, filename):
+    f = open(filename, "w")
+    for block in blocks:
+        f.write("\t".join([repr(float(v)) for v in block]) + "\n")
+    f.close()
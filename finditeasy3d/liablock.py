@@ -0,0 +1,88 @@
+##----- 6. WRITE TXT FILE COMPATIBLE WITH LIABLOCK_3D SOFTWARE -----##
+# global numbering: point ids are shared by the whole model, every row has 2*Num_points columns
+# compact numbering: point ids of each block are local (vertices 1-8, then the points of its own
+# interfaces), the number of columns is set by the block with more points
+
+from .model import num_str, point_str
+
+
+def local_points(model, ii):
+    # local index of the interface points of block ii and their coordinates (vertices 1-8 first)
+    Local = {}
+    Points = [point_str(model.BlockVertex[ii][jj]) for jj in range(8)]
+    for jj in range(model.Nfaces):
+        for kk in range(len(model.Index[ii][jj])):
+            for pp in range(4):
+                fTmp = model.Index[ii][jj][kk][pp]
+                if fTmp > 8 and fTmp not in Local:
+                    Local[fTmp] = len(Points) + 1
+                    Points.append(point_str(model.FaceCorners[ii][jj][kk][pp]))
+    return Local, Points
+
+
+def block_cells(model, ii, compact=False):
+    # cells of the row of block ii: contact point indexes of each interface ("a, b, c, d") and
+    # coordinates of the points from column 1 to the last one used (None for an empty column)
+    Index = model.Index[ii]
+    if compact:
+        Local, Points = local_points(model, ii)
+        Contacts = [", ".join([str(Local.get(fTmp, fTmp)) for fTmp in Index[jj][kk]])
+                    for jj in range(model.Nfaces) for kk in range(len(Index[jj]))]
+        return Contacts, Points
+    Contacts = [", ".join([str(Index[jj][kk][pp]) for pp in range(4)]) for jj in range(model.Nfaces) for kk in range(len(Index[jj]))]
+    Columns = {}
+    for jj in range(8):
+        Columns[jj+1] = point_str(model.BlockVertex[ii][jj])
+    for jj in range(model.Nfaces):
+        for kk in range(len(Index[jj])):
+            for pp in range(4):
+                if Index[jj][kk][pp] > 8:
+                    Columns[Index[jj][kk][pp]] = point_str(model.FaceCorners[ii][jj][kk][pp])
+    return Contacts, [Columns.get(kk) for kk in range(1, max(Columns)+1)]
+
+
+def header_line(Max, N_columns):
+    # First row of the input file for LiaBlock_3D
+    return ("&Count\t"+"&Name\t"+"&BASE\t"+"&C\t"+"".join(["&CONTACT_"+str(ii+1)+"\t" for ii in range(Max)])
+            + "".join(["&POINT_"+str(ii+1)+"\t" for ii in range(N_columns)])+"&VOLUME\n")
+
+
+def row_head(ii, Block_center):
+    return "1\t"+"&BLOCK_TYPE_"+str(ii)+"\t"+"&4\t"+"&"+point_str(Block_center)+"\t"
+
+
+def row_cells(model, ii, Max, N_columns, compact=False):
+    # row of block ii with Max contact columns and N_columns point columns
+    Contacts, Points = block_cells(model, ii, compact)
+    return (row_head(ii, model.Block_center[ii]) + "".join(["&"+cell+"\t" for cell in Contacts]) + "\t"*(Max - len(Contacts))
+            + "".join(["&"+cell+"\t" if cell is not None else "\t" for cell in Points]) + "\t"*(N_columns - len(Points))
+            + "&"+num_str(model.Volume[ii])+"\n")
+
+
+def write_liablock(model, filename="LiAInputFile.txt", compact=False):
+    # global numbering: 2*Num_points - 1 point columns; compact: the columns of the block with more
+    # points (at least the 8 vertices)
+    N_blocks = model.N_blocks
+    if compact:
+        N_columns = 8
+        for ii in range(N_blocks):
+            N_columns = max(N_columns, len(local_points(model, ii)[1]))
+    else:
+        N_columns = 2*model.Num_points - 1
+
+    # Open txt-file
+    f = open(filename, "w+")
+
+    # First row of the input file for LiaBlock_3D
+    f.write(header_line(model.Max, N_columns))
+
+    # Fill the rest of the input file
+    for ii in range(N_blocks):
+        f.write(row_cells(model, ii, model.Max, N_columns, compact))
+
+    # Close txt-file
+    f.close()
+
+
+def write_liablock_compact(model, filename="LiAInputFile.txt"):
+    write_liablock(model, filename, compact=True)
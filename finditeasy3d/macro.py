@@ -0,0 +1,105 @@
+##----- 8. MACRO-BLOCKS FOR A COARSE OPENSEES MODEL -----##
+# groups of blocks merged into larger boxes (macro-blocks) along their contacts, for fast preliminary
+# analyses: two boxes are merged when they share a whole face (same plane, same rectangle), so that a
+# macro-block is always a box made of whole blocks (a course of a running bond wall, the courses of a
+# panel between two openings...) and is subdivided into standard bricks as a block
+#   - the merges are done in rounds, as a matching on the contact graph: a box takes part in one
+#     merge per round, the smallest results first, so that the macro-blocks grow evenly
+#   - a merge is kept only if the macro-block respects the limits: max_size (longest side, in the
+#     units of the model), max_aspect (longest side / middle side: the thickness of a wall is left
+#     out) and max_blocks (blocks per macro-block); None for no limit
+# the macro-blocks are a model of their own (sections 1-5), written by the OpenSees exporter, with
+# MacroBlocks.csv next to the file: macro-block of every block
+#
+#   python -m finditeasy3d blocks.txt --units m --exporters opensees_macro --macro-size 3 --macro-aspect 4
+
+import csv
+import os
+
+from .opensees import write_opensees
+
+
+def within_limits(box, N_members, tol, max_size=None, max_aspect=None, max_blocks=None):
+    # box on the grid of tol
+    sides = sorted([box[3] - box[0], box[4] - box[1], box[5] - box[2]])
+    if max_size is not None and sides[2] > round(max_size/tol):
+        return False
+    if max_aspect is not None and sides[2] > max_aspect*sides[1]:
+        return False
+    if max_blocks is not None and N_members > max_blocks:
+        return False
+    return True
+
+
+def coarsen(model, max_size=None, max_aspect=None, max_blocks=None):
+    # macro-blocks of a model: their boxes on the grid of tol (as Box) and the macro-block of each block
+    # macro-blocks are numbered in the order of their first block
+    Boxes = [tuple(box) for box in model.Box]
+    Members = [[ii] for ii in range(model.N_blocks)]
+    alive = list(range(model.N_blocks))
+    merged = True
+    while merged:
+        # Pairs of boxes sharing a whole face: the max face of kk along ff is the min face of mm
+        Candidates = []
+        for ff in range(3):
+            aa, bb = [cc for cc in range(3) if cc != ff]
+            Lower = {}                                              # min face along ff -> box
+            for kk in alive:
+                box = Boxes[kk]
+                Lower[(box[ff], box[aa], box[aa+3], box[bb], box[bb+3])] = kk
+            for kk in alive:
+                box = Boxes[kk]
+                mm = Lower.get((box[ff+3], box[aa], box[aa+3], box[bb], box[bb+3]))
+                if mm is None:
+                    continue
+                union = tuple([min(box[cc], Boxes[mm][cc]) for cc in range(3)] + [max(box[cc+3], Boxes[mm][cc+3]) for cc in range(3)])
+                if within_limits(union, len(Members[kk]) + len(Members[mm]), model.tol, max_size, max_aspect, max_blocks):
+                    volume = (union[3] - union[0])*(union[4] - union[1])*(union[5] - union[2])
+                    Candidates.append((volume, kk, mm, union))
+
+        # Matching: each box in one merge, smallest macro-blocks first
+        Candidates.sort()
+        used = set()
+        merged = False
+        for volume, kk, mm, union in Candidates:
+            if kk in used or mm in used:
+                continue
+            used.add(kk)
+            used.add(mm)
+            Boxes[kk] = union
+            Members[kk] = Members[kk] + Members[mm]
+            Boxes[mm] = None
+            merged = True
+        alive = [kk for kk in alive if Boxes[kk] is not None]
+
+    alive.sort(key=lambda kk: min(Members[kk]))
+    Macro = [0 for row in range(model.N_blocks)]
+    for nn in range(len(alive)):
+        for ii in Members[alive[nn]]:
+            Macro[ii] = nn
+    return [Boxes[kk] for kk in alive], Macro
+
+
+def macro_model(model, max_size=None, max_aspect=None, max_blocks=None):
+    # model of the macro-blocks (sections 1-5) and macro-block of each block
+    from .pipeline import build_model
+    Boxes, Macro = coarsen(model, max_size, max_aspect, max_blocks)
+    scale = 10.**model.RoundUnit
+    return build_model([[value/scale for value in box] for box in Boxes], model.UnitsTag), Macro
+
+
+def write_macro_map(Macro, filename="MacroBlocks.csv"):
+    f = open(filename, "w")
+    writer = csv.writer(f, lineterminator="\n")
+    writer.writerow(['block', 'macro'])
+    for ii in range(len(Macro)):
+        writer.writerow([ii, Macro[ii]])
+    f.close()
+
+
+def write_opensees_macro(model, filename="OpenSeesMacroInputFile.txt", max_size=None, max_aspect=None, max_blocks=None,
+                         shared=False):
+    # OpenSees input file of the macro-blocks and MacroBlocks.csv in the same directory
+    coarse, Macro = macro_model(model, max_size, max_aspect, max_blocks)
+    write_macro_map(Macro, os.path.join(os.path.dirname(filename), "MacroBlocks.csv"))
+    return write_opensees(coarse, filename, shared=shared)
@@ -0,0 +1,63 @@
+##----- FIND IT EASY! 3D - MODEL -----##
+# Container of the data shared by the stages of the algorithm (sections 1-8)
+# variable names follow the ones used in FIND_IT_EASY_3D.py
+
+##----- USER OPTIONS -----##
+UNITS = {'mm': 1, 'cm': 2, 'm': 4}      # number of digits kept for each unit of measure
+Nfaces = 6                              # number of faces per block
+YTolFactor = 100                        # vertices are matched with a tolerance of YTolFactor*tol along y
+
+
+def round_unit(UnitsTag):
+    # number of digits used to round the coordinates
+    if UnitsTag not in UNITS:
+        raise ValueError("Sorry, that was an invalid command! (type: mm,cm,m)")
+    return UNITS[UnitsTag]
+
+
+class Model(object):
+    # Block geometry (section 1), contact pairs (section 2) and contact points (sections 3-5)
+
+    def __init__(self, UnitsTag, YTolFactor=YTolFactor):
+        self.UnitsTag = UnitsTag
+        self.RoundUnit = round_unit(UnitsTag)
+        self.tol = 10**(-self.RoundUnit)            # tolerance used for contact detection
+        self.YTolFactor = YTolFactor                # tolerance along y to match the block vertices (in tol)
+        self.blocks = []            # min/max corners of the blocks (input of section 1)
+        self.N_blocks = 0
+        self.Box = []               # min/max corners on the grid of tol (integers): X0, Y0, Z0, X1, Y1, Z1
+        self.Nfaces = Nfaces
+        self.face_center = []       # x-, y-, z-coordinates of face center
+        self.Dimensions = []        # face size in x-, y- and z-direction (plane coordinate for the normal direction)
+        self.Volume = []            # block volume
+        self.Block_center = []      # x-, y-, z-coordinates of block center
+        self.BlockVertex = []       # block vertices coordinates (order used by LiA_Block)
+        self.FacePoints = []        # corners of each block face (replace the Rhino polylines)
+        self.index = None           # spatial index of blocks and vertices (SpatialIndex)
+        self.ContBlockID = []       # for each block face, the id of the blocks in contact with that face
+        self.ContSurfID = []        # for each block face, the id of the faces in contact with that face
+        self.FaceCorners = []       # corner coordinates of each interface
+        self.Index = []             # corner indices of each interface
+        self.Num_points = 8         # highest contact point index
+        self.BlockPoints = []       # number of contact points numbered by each block (after the vertices)
+        self.Max = 0                # max number of interfaces per block
+        self.TotalContact = [0, 0, 0]   # interfaces in XZ-, YZ- and XY-plane
+
+
+##----- STRING FORMAT -----##
+
+def num_str(value):
+    # coordinate written as a python float (as str() of a Point3d component)
+    return str(float(value))
+
+
+def rhino_num(value):
+    # coordinate written as Rhino does for a Point3d (e.g. 2.0 -> 2)
+    if value == 0:
+        value = 0.
+    return '%.15g' % value
+
+
+def point_str(point):
+    # same string as str(Point3d) in Rhino: "x,y,z"
+    return rhino_num(point[0]) + "," + rhino_num(point[1]) + "," + rhino_num(point[2])
@@ -0,0 +1,339 @@
+##----- 8. CREATE INPUT FILE FOR OPENSEES -----##
+# every block is subdivided into a regular grid of standard bricks whose planes
+# pass through the corners of its interfaces
+# the OpenSees model is first computed as arrays (OpenSeesModel), then either written as a
+# script (write_opensees) or handed to an openseespy-compatible builder (build_opensees)
+# two topologies of the bricks of a block:
+#   - duplicated (default): 8 nodes for every brick, the coincident nodes of a block tied by equalDOF
+#   - shared (shared=True): one node for every grid point of a block, the bricks share their nodes and
+#     there is no equalDOF; the blocks keep their own nodes, tied by the zeroLength elements
+
+from .model import num_str
+from .spatial import PointIndex, SpatialIndex
+
+# with numpy the grids of all the blocks are built with array arithmetic (same nodes)
+try:
+    from .grid import subblock_arrays, shared_arrays
+except ImportError:
+    subblock_arrays = None
+    shared_arrays = None
+
+# materials of the standard bricks and of the zero length springs
+BRICK_MATERIAL  = ("ElasticIsotropic3D", 1, 2100000000., 0.3, 0.0)
+SPRING_MATERIAL = ("Elastic", 3, 262500000.)
+
+
+# brick (along x, y, z: 0 first, 1 last) and node of the brick at each block vertex
+VERTEX_NODES = [(0, 0, 0, 1), (1, 0, 0, 2), (1, 1, 0, 3), (0, 1, 0, 0),
+                (0, 0, 1, 5), (1, 0, 1, 6), (1, 1, 1, 7), (0, 1, 1, 4)]
+
+
+# grid point (along x, y, z) of the 8 nodes of a brick wrt its first grid point
+BRICK_CORNERS = [(0, 1, 0), (0, 0, 0), (1, 0, 0), (1, 1, 0), (0, 1, 1), (0, 0, 1), (1, 0, 1), (1, 1, 1)]
+
+
+def vertex_positions(first, nx, ny, nz):
+    # position of the nodes at the 8 block vertices, the block has nx*ny*nz bricks from node first
+    return [first + 8*(cc*(nz-1)*nx*ny + bb*(ny-1)*nx + aa*(nx-1)) + node for aa, bb, cc, node in VERTEX_NODES]
+
+
+def block_grid(model, ii):
+    # grid coordinates of block ii: block bounds and interface corners, one sort per axis
+    FaceCorners = model.FaceCorners
+    BlockVertex = model.BlockVertex
+    AllIntCoord = [set([BlockVertex[ii][0][ff], BlockVertex[ii][6][ff]]) for ff in range(3)]
+    for jj in range(model.Nfaces):
+        for kk in range(len(FaceCorners[ii][jj])):
+            for pp in range(4):
+                for ff in range(3):
+                    AllIntCoord[ff].add(FaceCorners[ii][jj][kk][pp][ff])
+    return [sorted(AllIntCoord[ff]) for ff in range(3)]
+
+
+def subblock_grid(model):
+    # Create a regular point grid for every block, return the nodes of the standard bricks (8 per
+    # brick, bricks sorted wrt z, y, x), the number of bricks of each block and the position of
+    # the nodes at the block vertices
+    N_blocks = model.N_blocks
+
+    # Initialize variables
+    Nodes      = []                                 # nodes of the standard bricks
+    N_subBlock = [0 for row in range(N_blocks)]
+    IndVertex  = [0 for row in range(N_blocks)]
+
+    for ii in range(N_blocks):
+        X, Y, Z = block_grid(model, ii)
+        nx, ny, nz = len(X) - 1, len(Y) - 1, len(Z) - 1
+
+        # Nodes of the bricks: the brick (i, j, k) goes from the grid point (i, j, k) to (i+1, j+1, k+1)
+        IndVertex[ii] = vertex_positions(len(Nodes), nx, ny, nz)
+        N_subBlock[ii] = nx*ny*nz
+        for kk in range(nz):
+            for jj in range(ny):
+                for pp in range(nx):
+                    for zz in (Z[kk], Z[kk+1]):
+                        Nodes.extend([(X[pp], Y[jj+1], zz), (X[pp], Y[jj], zz), (X[pp+1], Y[jj], zz), (X[pp+1], Y[jj+1], zz)])
+
+    return Nodes, N_subBlock, IndVertex
+
+
+def shared_grid(model):
+    # Shared topology: one node for every point of the grid of a block (points sorted wrt z, y, x),
+    # return the nodes, the 8 node tags of the standard bricks (bricks sorted wrt z, y, x) and the
+    # position of the nodes at the block vertices
+    N_blocks = model.N_blocks
+
+    # Initialize variables
+    Nodes      = []                                 # grid points of the blocks
+    Bricks     = []                                 # node tags of the standard bricks
+    IndVertex  = [0 for row in range(N_blocks)]
+
+    for ii in range(N_blocks):
+        X, Y, Z = block_grid(model, ii)
+        nx, ny, nz = len(X) - 1, len(Y) - 1, len(Z) - 1
+
+        # Grid point (i, j, k) has the tag first+i+(nx+1)*(j+(ny+1)*k)+1
+        first = len(Nodes)
+        for zz in Z:
+            for yy in Y:
+                Nodes.extend([(xx, yy, zz) for xx in X])
+        IndVertex[ii] = [first + aa*nx + (nx+1)*(bb*ny + (ny+1)*cc*nz) for aa, bb, cc, node in VERTEX_NODES]
+        for kk in range(nz):
+            for jj in range(ny):
+                for pp in range(nx):
+                    Bricks.append([first + pp+aa + (nx+1)*(jj+bb + (ny+1)*(kk+cc)) + 1 for aa, bb, cc in BRICK_CORNERS])
+
+    return Nodes, Bricks, IndVertex
+
+
+def fixed_nodes(Nodes, first=0):
+    # tags of the nodes at the base (z = 0), Nodes[kk] has the tag first+kk+1
+    return [first + kk + 1 for kk in range(len(Nodes)) if Nodes[kk][2] == 0]
+
+
+def equal_dof(Nodes, N_subBlock, first=0):
+    # Dependent nodes: the nodes of a block are grouped by coordinate in one pass, each node is the
+    # master of the coincident nodes with a higher tag (nodes at z = 0 are fixed and not tied)
+    EqualDOF = []                                           # master and slave nodes
+    start = 0
+    for ii in range(len(N_subBlock)):
+        end = start + 8*N_subBlock[ii]
+        Coincident = {}                                     # coordinate -> node tags, ascending
+        for pp in range(start, end):
+            if Nodes[pp][2] != 0:
+                key = tuple(Nodes[pp])
+                if key not in Coincident:
+                    Coincident[key] = []
+                Coincident[key].append(first + pp + 1)
+        for pp in range(start, end):
+            for tt in Coincident.get(tuple(Nodes[pp]), []):
+                if tt > first + pp + 1:
+                    EqualDOF.append([first + pp + 1, tt])
+        start = end
+    return EqualDOF
+
+
+def brick_nodes(model, shared=False):
+    # nodes, 8 node tags of every standard brick, equalDOF pairs and position of the nodes at the
+    # block vertices, in the topology of shared (tags from 1)
+    if shared:
+        if shared_arrays is not None:
+            Nodes, Bricks, IndVertex = shared_arrays(model)
+        else:
+            Nodes, Bricks, IndVertex = shared_grid(model)
+        return Nodes, Bricks, [], IndVertex
+    if subblock_arrays is not None:
+        Nodes, N_subBlock, IndVertex = subblock_arrays(model)
+    else:
+        Nodes, N_subBlock, IndVertex = subblock_grid(model)
+
+    # Define the standard blocks (8 consecutive nodes each) and set equal DOF for the sub_blocks
+    Bricks = [[8*kk + pp + 1 for pp in range(8)] for kk in range(len(Nodes)//8)]
+    return Nodes, Bricks, equal_dof(Nodes, N_subBlock), IndVertex
+
+
+class OpenSeesModel(object):
+    # nodes, elements and constraints of the OpenSees model
+    #   Nodes[kk]          coordinates of the node kk+1
+    #   Bricks[kk]         8 node tags of the stdBrick element NumNodes+kk+1
+    #   Fixed              tags of the nodes fixed at the base (z = 0)
+    #   EqualDOF[kk]       master and slave node tags
+    #   ZeroLength[kk]     node tags of the zeroLength element kk
+    #   IndVertex[ii]      position (tag-1) of the nodes at the 8 vertices of block ii
+    #   shared             True if the bricks of a block share their nodes (no EqualDOF)
+
+    def __init__(self, N_blocks, Nodes, Bricks, Fixed, EqualDOF, ZeroLength, IndVertex, shared=False):
+        self.N_blocks = N_blocks
+        self.Nodes = Nodes
+        self.Bricks = Bricks
+        self.Fixed = Fixed
+        self.EqualDOF = EqualDOF
+        self.ZeroLength = ZeroLength
+        self.IndVertex = IndVertex
+        self.shared = shared
+
+    @property
+    def NumNodes(self):
+        return len(self.Nodes)
+
+
+def opensees_model(model, shared=False):
+    # shared: one node for every grid point of a block instead of 8 nodes for every brick
+    N_blocks = model.N_blocks
+    BlockVertex = model.BlockVertex
+    Nodes, Bricks, EqualDOF, IndVertex = brick_nodes(model, shared)
+
+    # Initialize variables
+    IDnodeOpensees = [[-1 for col in range(3)]] + Nodes     # coordinates of each node (tag = position)
+    ZeroLengthElem = []                                     # node tags at each coordinate shared by two blocks
+    ZeroLength = []                                         # nodes of the zero length elements
+
+    # Fix the base of each standard block
+    Fixed = fixed_nodes(Nodes)
+
+    # Contact zero length element: block vertices and nodes are bucketed by coordinate, one row
+    # for each coordinate shared by the vertices of two blocks, with all the node tags at that
+    # coordinate (first block vertex found wins, the rows of the other vertices were duplicates)
+    index = model.index
+    if index is None:
+        index = SpatialIndex(model)
+    NodeIndex = PointIndex(model.tol)                       # coordinate -> node tags
+    for kk in range(1, len(IDnodeOpensees)):
+        NodeIndex.add(IDnodeOpensees[kk], kk)
+    Shared = set()                                          # coordinates with a row
+    for ii in range(N_blocks):
+        for jj in range(8):
+            key = NodeIndex.key(BlockVertex[ii][jj])
+            if key not in Shared:
+                for nn, pp in index.vertices_at(BlockVertex[ii][jj]):
+                    if nn != ii:
+                        Shared.add(key)
+                        ZeroLengthElem.append(NodeIndex.at(BlockVertex[ii][jj]))
+                        break
+    for ii in range(len(ZeroLengthElem)):
+        for jj in range(1, len(ZeroLengthElem[ii])):
+            ZeroLength.append([ZeroLengthElem[ii][0], ZeroLengthElem[ii][jj]])
+
+    return OpenSeesModel(N_blocks, Nodes, Bricks, Fixed, EqualDOF, ZeroLength, IndVertex, shared)
+
+
+def build_opensees(data, ops):
+    # replay the model on an openseespy-compatible builder (e.g. openseespy.opensees)
+    ops.wipe()
+    ops.model('basic', '-ndm', 3, '-ndf', 3)
+    for kk in range(len(data.Nodes)):
+        ops.node(kk + 1, *[float(x) for x in data.Nodes[kk]])
+    ops.nDMaterial(*BRICK_MATERIAL)
+    ops.uniaxialMaterial(*SPRING_MATERIAL)
+    NumNodes = len(data.Nodes)
+    for kk in range(len(data.Bricks)):
+        ops.element("stdBrick", NumNodes + kk + 1, *([int(tag) for tag in data.Bricks[kk]] + [BRICK_MATERIAL[1]]))
+    for tag in data.Fixed:
+        ops.fix(int(tag), 1, 1, 1)
+    for master, slave in data.EqualDOF:
+        ops.equalDOF(int(master), int(slave), 1, 2, 3)
+    for kk in range(len(data.ZeroLength)):
+        ops.element("zeroLength", kk, int(data.ZeroLength[kk][0]), int(data.ZeroLength[kk][1]),
+                    '-mat', SPRING_MATERIAL[1], '-dir', 1, 2, 3)
+    return ops
+
+
+class Recorder(object):
+    # stand-in for openseespy.opensees that records the calls: [(name, args)]
+
+    def __init__(self):
+        self.calls = []
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+
+        def call(*args):
+            self.calls.append((name, args))
+        return call
+
+
+##----- TEXT OF THE INPUT FILE -----##
+
+OPENSEES_HEADER = ("import openseespy.opensees as ops\n\nops.wipe()\n\nops.model('basic', '-ndm', 3, '-ndf', 3)\n\n"
+                   "## Definition of the geometry\n\n# Create nodes\n#\t\t tag\tX\tY\tZ\n")
+OPENSEES_MATERIALS = ("\n# Material Definition\nops.nDMaterial(\"ElasticIsotropic3D\", 1, 2100000000., 0.3, 0.0)\n"
+                      "ops.uniaxialMaterial(\"Elastic\",3, 262500000.)\n"
+                      "\n# Create Standard Brick Elements\n#Element\ttag\tnode1\tnode2\tnode3\tnode4\tnode5\tnode6\tnode7\tnode8\tmatTag\n")
+OPENSEES_CONSTRAINTS = "\n# Constraints Definition\n"
+OPENSEES_ZERO_LENGTH = "\n\n# ZeroLength Elements definition\n"
+OPENSEES_FOOTER = "\nprint (\"Geometric model built\")\n\n"
+
+
+def node_line(tag, node):
+    return "ops.node("+str(tag)+","+num_str(node[0])+","+num_str(node[1])+","+num_str(node[2])+")\n"
+
+
+def brick_line(tag, nodes):
+    return "ops.element(\"stdBrick\","+str(tag)+","+"".join([str(node)+"," for node in nodes])+"1)\n"
+
+
+def fix_line(tag):
+    return "ops.fix("+str(tag)+",1,1,1)\n"
+
+
+def equal_dof_line(master, slave):
+    return "ops.equalDOF("+str(master)+","+str(slave)+",1,2,3)\n"
+
+
+def zero_length_line(tag, nodes):
+    return "ops.element(\"zeroLength\","+str(tag)+","+str(nodes[0])+","+str(nodes[1])+",'-mat',3,'-dir',1,2,3)\n"
+
+
+def vertex_list(IndVertex):
+    # positions of the nodes at the vertices of a block: "[a,b,c,d,e,f,g,h,]"
+    return "["+"".join([str(pos)+"," for pos in IndVertex])+"]"
+
+
+def write_opensees(model, filename="OpenSeesInputFile.txt", data=None, shared=False):
+    # data: OpenSees model of the model, computed here when not given (or not in the topology of shared)
+    if data is None or data.shared != shared:
+        data = opensees_model(model, shared)
+    N_blocks = data.N_blocks
+    NumNodes = data.NumNodes
+
+    # Open txt-file
+    opensees = open(filename, "w+")
+
+    # Fill the input file
+    opensees.write(OPENSEES_HEADER)
+
+    # Create the nodes to define the standard blocks
+    for kk in range(NumNodes):
+        opensees.write(node_line(kk+1, data.Nodes[kk]))
+
+    # Add material used for the standard brick elements and define the standard blocks
+    opensees.write(OPENSEES_MATERIALS)
+    for kk in range(len(data.Bricks)):
+        opensees.write(brick_line(NumNodes+kk+1, data.Bricks[kk]))
+
+    # Fix the base of each standard block
+    opensees.write(OPENSEES_CONSTRAINTS)
+    for tag in data.Fixed:
+        opensees.write(fix_line(tag))
+
+    # Set equal DOF for the sub_blocks
+    for master, slave in data.EqualDOF:
+        opensees.write(equal_dof_line(master, slave))
+
+    # Write the zero 1D-length elements
+    opensees.write(OPENSEES_ZERO_LENGTH)
+    for kk in range(len(data.ZeroLength)):
+        opensees.write(zero_length_line(kk, data.ZeroLength[kk]))
+    opensees.write(OPENSEES_FOOTER)
+    opensees.write("\n\nN_blocks="+str(N_blocks))
+    opensees.write("\nNumNodes="+str(NumNodes))
+
+    # External Variables: position of the nodes at the block vertices
+    opensees.write("\nIndVertex=[")
+    opensees.write(",".join([vertex_list(data.IndVertex[ii]) for ii in range(N_blocks)]))
+    opensees.write("]")
+
+    # Close txt-file
+    opensees.close()
+    return data
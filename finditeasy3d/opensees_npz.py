@@ -0,0 +1,48 @@
+##----- 8. OPENSEES MODEL AS NUMPY ARRAYS -----##
+# the OpenSees model saved in a compressed .npz file (requires numpy) and replayed on a builder:
+#   nodes          NumNodes x 3    float64    coordinates (tag = row + 1)
+#   bricks         N_bricks x 8    int64      node tags of the stdBrick elements (tag = NumNodes + row + 1)
+#   fixed          N_fixed         int64      nodes fixed at the base
+#   equal_dof      N_equal x 2     int64      master and slave nodes
+#   zero_length    N_zero x 2      int64      nodes of the zeroLength elements (tag = row)
+#   ind_vertex     N_blocks x 8    int64      position (tag-1) of the nodes at the block vertices
+#   shared         ()              bool       the bricks of a block share their nodes (no equal_dof)
+#
+#   import finditeasy3d.opensees_npz as npz
+#   npz.load_opensees("OpenSeesModel.npz")         # builds the model in openseespy
+
+import numpy as np
+
+from .opensees import OpenSeesModel, opensees_model, build_opensees
+
+
+def save_opensees(data, filename):
+    np.savez_compressed(filename,
+                        nodes=np.asarray(data.Nodes, dtype=np.float64).reshape(-1, 3),
+                        bricks=np.asarray(data.Bricks, dtype=np.int64).reshape(-1, 8),
+                        fixed=np.asarray(data.Fixed, dtype=np.int64),
+                        equal_dof=np.asarray(data.EqualDOF, dtype=np.int64).reshape(-1, 2),
+                        zero_length=np.asarray(data.ZeroLength, dtype=np.int64).reshape(-1, 2),
+                        ind_vertex=np.asarray(data.IndVertex, dtype=np.int64).reshape(-1, 8),
+                        shared=np.asarray(data.shared, dtype=bool))
+
+
+def read_opensees(filename):
+    with np.load(filename) as f:
+        shared = 'shared' in f.files and bool(f['shared'])
+        return OpenSeesModel(len(f['ind_vertex']), f['nodes'], f['bricks'], f['fixed'],
+                             f['equal_dof'], f['zero_length'], f['ind_vertex'], shared)
+
+
+def load_opensees(filename, ops=None):
+    # build the saved model on ops (openseespy.opensees by default)
+    if ops is None:
+        import openseespy.opensees as ops
+    return build_opensees(read_opensees(filename), ops)
+
+
+def write_opensees_npz(model, filename="OpenSeesModel.npz", data=None, shared=False):
+    if data is None or data.shared != shared:
+        data = opensees_model(model, shared)
+    save_opensees(data, filename)
+    return data
@@ -0,0 +1,104 @@
+##----- 2.-5. CONTACTS BY SPATIAL TILES ON SEVERAL PROCESSES -----##
+# the blocks are split in tiles along the longest horizontal direction (same number of block
+# centres per tile); each tile is sent to a worker with its halo, the blocks closer than tol to
+# the tile, so that all the contacts of the tile blocks are found there (sections 2-4).
+# the worker numbers the new points of every block from 9 (section 5), the merge shifts them by
+# the points of the previous blocks: ContBlockID, ContSurfID, FaceCorners and Index are the
+# same as in the serial run, whatever the number of workers and tiles
+
+from concurrent.futures import ProcessPoolExecutor
+
+from .model import Model
+from .geometry import extract_geometry
+from .contacts import find_contact_pairs
+from .spatial import SpatialIndex
+from .points import define_face_corners, define_contact_points, block_point_indexes, count_contacts
+
+
+def split_tiles(model, N_tiles):
+    # block ids of each tile, sorted
+    N_blocks = model.N_blocks
+    if N_blocks == 0:
+        return []
+    lo = [min(model.BlockVertex[ii][0][ff] for ii in range(N_blocks)) for ff in range(2)]
+    hi = [max(model.BlockVertex[ii][6][ff] for ii in range(N_blocks)) for ff in range(2)]
+    ff = 0 if hi[0] - lo[0] >= hi[1] - lo[1] else 1              # longest horizontal direction
+    order = sorted(range(N_blocks), key=lambda ii: (model.Block_center[ii][ff], ii))
+    N_tiles = max(1, min(N_tiles, N_blocks))
+    tiles = []
+    for kk in range(N_tiles):
+        tiles.append(sorted(order[kk*N_blocks//N_tiles:(kk+1)*N_blocks//N_tiles]))
+    return tiles
+
+
+def tile_contacts(job):
+    # sections 2-5 on a tile and its halo, return the results of the tile blocks
+    UnitsTag, YTolFactor, blocks, ids, owned = job
+    model = Model(UnitsTag, YTolFactor)
+    extract_geometry(model, blocks)
+    find_contact_pairs(model)
+    define_face_corners(model)
+    define_contact_points(model)
+    result = []
+    for ii in owned:
+        Index, Num_points = block_point_indexes(model, ii)
+        ContBlockID = [[ids[mm] for mm in model.ContBlockID[ii][jj]] for jj in range(model.Nfaces)]
+        result.append((ids[ii], ContBlockID, model.ContSurfID[ii], model.FaceCorners[ii], Index, Num_points - 8))
+    return result
+
+
+def tile_jobs(model, blocks, tiles):
+    index = model.index
+    if index is None:
+        index = SpatialIndex(model)
+    jobs = []
+    for tile in tiles:
+        lo = [min(model.BlockVertex[ii][0][ff] for ii in tile) for ff in range(3)]
+        hi = [max(model.BlockVertex[ii][6][ff] for ii in tile) for ff in range(3)]
+        ids = index.blocks_near(lo, hi)                             # tile and halo, sorted
+        position = dict((ii, kk) for kk, ii in enumerate(ids))
+        jobs.append((model.UnitsTag, model.YTolFactor, [blocks[ii] for ii in ids], ids, [position[ii] for ii in tile]))
+    return jobs
+
+
+def find_contacts_parallel(model, blocks, workers=2, N_tiles=None):
+    # sections 2-5 on workers processes, model geometry already extracted from blocks (section 1)
+    N_blocks = model.N_blocks
+    if N_tiles is None:
+        N_tiles = workers
+    jobs = tile_jobs(model, blocks, split_tiles(model, N_tiles))
+
+    # Initialize variables
+    ContBlockID = [0 for row in range(N_blocks)]
+    ContSurfID = [0 for row in range(N_blocks)]
+    FaceCorners = [0 for row in range(N_blocks)]
+    Index = [0 for row in range(N_blocks)]
+    NewPoints = [0 for row in range(N_blocks)]                      # points numbered by each block
+
+    pool = ProcessPoolExecutor(max_workers=workers)
+    try:
+        for result in pool.map(tile_contacts, jobs):
+            for ii, BlockIDs, SurfIDs, Corners, BlockIndex, Count in result:
+                ContBlockID[ii], ContSurfID[ii], FaceCorners[ii] = BlockIDs, SurfIDs, Corners
+                Index[ii], NewPoints[ii] = BlockIndex, Count
+    finally:
+        pool.shutdown()
+
+    # Shift the new points of each block by the points of the previous blocks (serial numbering)
+    Num_points = 8
+    for ii in range(N_blocks):
+        shift = Num_points - 8
+        for jj in range(model.Nfaces):
+            for kk in range(len(Index[ii][jj])):
+                for pp in range(4):
+                    if Index[ii][jj][kk][pp] > 8:
+                        Index[ii][jj][kk][pp] = Index[ii][jj][kk][pp] + shift
+        Num_points = Num_points + NewPoints[ii]
+
+    model.ContBlockID = ContBlockID
+    model.ContSurfID = ContSurfID
+    model.FaceCorners = FaceCorners
+    model.Index = Index
+    model.Num_points = Num_points
+    model.BlockPoints = NewPoints
+    return count_contacts(model)
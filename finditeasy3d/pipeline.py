@@ -0,0 +1,221 @@
+##----- FIND IT EASY! 3D - PIPELINE -----##
+# run the sections of the algorithm on an array of axis-aligned blocks
+
+import os
+
+from .model import Model
+from .geometry import extract_geometry
+from .contacts import find_contact_pairs
+from .spatial import SpatialIndex
+from .cache import StageCache, stage_keys, load_stage, store_stage
+from .report import Report
+from .points import define_face_corners, define_contact_points, define_point_indexes
+from .liablock import write_liablock, write_liablock_compact
+from .threedec import write_3dec
+from .opensees import write_opensees
+from .macro import write_opensees_macro
+
+# exporters and name of the file they write
+EXPORTERS = {'liablock': (write_liablock, "LiAInputFile.txt"),
+             'liablock_compact': (write_liablock_compact, "LiAInputFile.txt"),
+             '3dec':     (write_3dec,     "3DECInputFile.txt"),
+             'opensees': (write_opensees, "OpenSeesInputFile.txt"),
+             'opensees_macro': (write_opensees_macro, "OpenSeesMacroInputFile.txt")}
+
+# exporters that write the OpenSees model (computed once for all of them)
+OPENSEES = ['opensees', 'opensees_npz']
+
+# section of the algorithm of each exporter
+SECTIONS = {'liablock': "6", 'liablock_compact': "6", '3dec': "7", 'opensees': "8", 'opensees_npz': "8", 'opensees_macro': "8",
+            'columns': "1-5", 'graph': "1-5"}
+
+# numpy is only needed by the binary OpenSees model, the columnar model files and the contact graph
+try:
+    from .opensees_npz import write_opensees_npz
+    from .columns import write_columns
+    from .graph import ContactGraph, write_graph
+    EXPORTERS['opensees_npz'] = (write_opensees_npz, "OpenSeesModel.npz")
+    EXPORTERS['columns'] = (write_columns, "FindItEasyModel")
+    EXPORTERS['graph'] = (write_graph, "FindItEasyContactGraph.npz")
+except ImportError:
+    ContactGraph = None
+
+# with numpy the interface rectangles of sections 3-4 are computed on arrays (same FaceCorners)
+try:
+    from .rectangles import define_interfaces
+except ImportError:
+    define_interfaces = None
+
+
+def face_contacts(model):
+    # number of (face, face in contact) pairs, each contact is counted from both faces
+    return sum([len(model.ContBlockID[ii][jj]) for ii in range(model.N_blocks) for jj in range(model.Nfaces)])
+
+
+def interfaces(model):
+    return sum([len(model.FaceCorners[ii][jj]) for ii in range(model.N_blocks) for jj in range(model.Nfaces)])
+
+
+def file_size(filename):
+    # bytes of a file, or of the files of a directory
+    if os.path.isdir(filename):
+        return sum([os.path.getsize(os.path.join(filename, name)) for name in os.listdir(filename)])
+    return os.path.getsize(filename)
+
+
+def build_model(blocks, UnitsTag, workers=1, N_tiles=None, cache=None, report=None):
+    # sections 1-5: from the block min/max corners to the indexed contact points
+    # with workers > 1 the sections 2-5 run on spatial tiles in a process pool (same result)
+    # with a cache (StageCache or directory) the stages already computed are loaded
+    # with a report (Report) the time, memory and sizes of every section are recorded
+    if report is None:
+        report = Report(enabled=False)
+    model = Model(UnitsTag)
+    model.blocks = [list(block[:6]) for block in blocks]
+    if cache is not None and not isinstance(cache, StageCache):
+        cache = StageCache(cache)
+    keys = stage_keys(model, blocks) if cache is not None else None
+
+    with report.stage("1", "extraction") as stage:
+        stage.cached = load_stage(cache, keys, model, 'geometry')
+        if not stage.cached:
+            extract_geometry(model, blocks)
+            store_stage(cache, keys, model, 'geometry')
+        stage.count(blocks=model.N_blocks, faces=model.N_blocks*model.Nfaces)
+    with report.stage("1", "spatial index") as stage:
+        model.index = SpatialIndex(model)
+        stage.count(cells=len(model.index.grid))
+
+    if workers > 1:
+        with report.stage("2-5", "contacts on " + str(workers) + " workers") as stage:
+            stage.cached = load_stage(cache, keys, model, 'contacts') and load_stage(cache, keys, model, 'points')
+            if not stage.cached:
+                from .parallel import find_contacts_parallel
+                find_contacts_parallel(model, blocks, workers, N_tiles)
+                store_stage(cache, keys, model, 'contacts')
+                store_stage(cache, keys, model, 'points')
+            stage.count(face_contacts=face_contacts(model), interfaces=interfaces(model), points=model.Num_points)
+        return model
+
+    with report.stage("2", "contact pairs") as stage:
+        stage.cached = load_stage(cache, keys, model, 'contacts')
+        if not stage.cached:
+            find_contact_pairs(model)
+            store_stage(cache, keys, model, 'contacts')
+        stage.count(face_contacts=face_contacts(model))
+    if define_interfaces is not None:
+        with report.stage("3-4", "interface rectangles") as stage:
+            stage.cached = cached = load_stage(cache, keys, model, 'points')
+            if not cached:
+                define_interfaces(model)
+            stage.count(interfaces=interfaces(model), corners=4*interfaces(model))
+    else:
+        with report.stage("3", "face corners") as stage:
+            stage.cached = cached = load_stage(cache, keys, model, 'points')
+            if not cached:
+                define_face_corners(model)
+            stage.count(interfaces=interfaces(model))
+        with report.stage("4", "contact points") as stage:
+            stage.cached = cached
+            if not cached:
+                define_contact_points(model)
+            stage.count(corners=4*interfaces(model))
+    with report.stage("5", "point indexes") as stage:
+        stage.cached = cached
+        if not cached:
+            define_point_indexes(model)
+            store_stage(cache, keys, model, 'points')
+        stage.count(points=model.Num_points, max_interfaces=model.Max)
+    return model
+
+
+def contact_graph(model):
+    # ContactGraph of the model, None without numpy
+    if ContactGraph is None:
+        return None
+    return ContactGraph.from_model(model)
+
+
+def print_summary(model, graph=None):
+    # with the contact graph of the model also the interfaces and neighbours per block
+    print(str(model.N_blocks) + " Blocks detected in the structure!")
+    print(str(model.TotalContact[2]) + " Contact interfaces detected in XY plane")
+    print(str(model.TotalContact[0]) + " Contact interfaces detected in XZ plane")
+    print(str(model.TotalContact[1]) + " Contact interfaces detected in YZ plane")
+    print(str(sum(model.TotalContact)) + " Total contact interfaces detected")
+    if graph is None:
+        return
+    for name, interfaces in [("Contact interfaces", True), ("Blocks in contact", False)]:
+        stats = graph.degree_stats(interfaces)
+        print(name + " per block: min " + str(stats['min']) + ", mean " + "%.2f" % stats['mean'] + ", max " + str(stats['max']))
+    isolated = graph.isolated()
+    if len(isolated):
+        print(str(len(isolated)) + " Blocks without contact interfaces: " + ", ".join([str(ii) for ii in isolated[:10]])
+              + (", ..." if len(isolated) > 10 else ""))
+
+
+def write_exporter(model, name, outdir, stage, data=None, options=None):
+    # run one exporter and count its sizes in stage; data: OpenSees model already computed (OPENSEES),
+    # options: keyword arguments of the writer; return the OpenSees model of the model written by an
+    # exporter of OPENSEES, if any (the one of opensees_macro is the model of the macro-blocks)
+    writer, filename = EXPORTERS[name]
+    filename = os.path.join(outdir, filename)
+    if options is None:
+        options = {}
+    if name in OPENSEES:
+        written = writer(model, filename, data, **options)
+    else:
+        written = writer(model, filename, **options)
+    stage.count(bytes=file_size(filename))
+    if written is not None:
+        # OpenSees model
+        stage.count(nodes=written.NumNodes, bricks=len(written.Bricks), fixed=len(written.Fixed),
+                    equal_dof=len(written.EqualDOF), zero_length=len(written.ZeroLength))
+    if name in OPENSEES:
+        return written
+    return None
+
+
+def export(model, outdir=".", exporters=("liablock", "3dec", "opensees"), report=None, jobs=1, pool="process", options=None):
+    # sections 6-8: write the input files of the selected software in outdir
+    # with jobs > 1 (None: one per exporter) the exporters run at the same time on a pool of
+    # processes or threads (pool), see scheduler.py
+    # options: keyword arguments of the exporters, e.g. {'opensees_macro': {'max_size': 3.}, 'opensees': {'shared': True}}
+    if report is None:
+        report = Report(enabled=False)
+    if options is None:
+        options = {}
+    for name in exporters:
+        if name not in EXPORTERS:
+            raise ValueError("Unknown exporter '" + name + "' (type: " + ",".join(sorted(EXPORTERS)) + ")")
+    if not os.path.isdir(outdir):
+        os.makedirs(outdir)
+    if jobs != 1 and len(exporters) > 1:
+        from .scheduler import export_concurrent
+        export_concurrent(model, outdir, exporters, report, jobs, pool, options)
+    else:
+        data = None                                         # OpenSees model, computed once
+        for name in exporters:
+            with report.stage(SECTIONS.get(name, ""), name) as stage:
+                data = write_exporter(model, name, outdir, stage, data, options.get(name)) or data
+    return [os.path.join(outdir, EXPORTERS[name][1]) for name in exporters]
+
+
+def run(blocks, UnitsTag, outdir=".", exporters=("liablock", "3dec", "opensees"), verbose=True, workers=1, cache=None,
+        report=False, export_jobs=1, export_pool="process", options=None):
+    # report: True (or a Report) to write FindItEasyReport.json/.csv in outdir
+    # export_jobs, export_pool: exporters run at the same time (jobs and pool of export)
+    # options: keyword arguments of the exporters (options of export)
+    if report is True:
+        report = Report()
+    elif report is False:
+        report = None
+    model = build_model(blocks, UnitsTag, workers, cache=cache, report=report)
+    if verbose:
+        print_summary(model, contact_graph(model))
+    export(model, outdir, exporters, report, export_jobs, export_pool, options)
+    if report is not None and report.enabled:
+        written = report.write(outdir)
+        if verbose:
+            print("Report written in " + written[0])
+    return model
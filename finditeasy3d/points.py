@@ -0,0 +1,149 @@
+##----- 3.-5. DEFINE BLOCK, FACE and CONTACT POINTS -----##
+
+from .spatial import quantize
+
+
+def block_face_corners(model, ii):
+    # corners of the faces in contact with the faces of block ii, and base contact
+    BlockVertex = model.BlockVertex[ii]
+    FaceCorners = [[] for col in range(model.Nfaces)]
+
+    # Extract face corners (corners of the face in contact)
+    for jj in range(model.Nfaces):
+        for mm in range(len(model.ContBlockID[ii][jj])):
+            BI = model.ContBlockID[ii][jj][mm]
+            SI = model.ContSurfID[ii][jj][mm]
+            FaceCorners[jj].append([model.FacePoints[BI][SI][ff] for ff in range(4)])
+
+    # Add base contact (vertices 0-3 lie at Z0, vertices 4-7 at Z1)
+    t9 = -1                                                         # counter
+    for jj in range(8):
+        if model.Box[ii][2 + 3*(jj//4)] == 0:
+            t9 = t9 + 1
+            if len(FaceCorners[4]) == 0:
+                FaceCorners[4].append([-1 for col in range(4)])
+            FaceCorners[4][0][t9] = BlockVertex[jj]
+    return FaceCorners
+
+
+def block_contact_points(model, ii):
+    # clamp the face corners of block ii to the block domain
+    # all the coordinates are grid values (Box/10**RoundUnit): their order is the order of the
+    # integers on the grid and the bounds are compared exactly, without tolerance
+    FaceCorners = model.FaceCorners[ii]
+    Min = model.BlockVertex[ii][0]                                  # lower bound of the block domain
+    Max = model.BlockVertex[ii][6]                                  # upper bound of the block domain
+    for jj in range(model.Nfaces):
+        for kk in range(len(FaceCorners[jj])):
+            for pp in range(4):
+                point = list(FaceCorners[jj][kk][pp])
+                for ff in range(3):
+                    if point[ff] > Max[ff]:
+                        point[ff] = Max[ff]
+                    if point[ff] < Min[ff]:
+                        point[ff] = Min[ff]
+                FaceCorners[jj][kk][pp] = tuple(point)
+    return FaceCorners
+
+
+def define_face_corners(model):
+    ##----- 3. DEFINE BLOCK and FACE POINTS -----##
+    model.FaceCorners = [block_face_corners(model, ii) for ii in range(model.N_blocks)]
+    return model
+
+
+def define_contact_points(model):
+    ##----- 4. DEFINE CONTACT POINTS -----##
+    # Subdivide block 'faces' into 'inter-faces'
+    for ii in range(model.N_blocks):
+        block_contact_points(model, ii)
+    return model
+
+
+def block_point_indexes(model, ii, Num_points=8):
+    # contact point indexes of block ii, the new points are numbered from Num_points + 1
+    # return the indexes and the last number used
+    # coincident points are found through dictionaries of the coordinates quantized on the
+    # RoundUnit grid: every corner is resolved in O(1) instead of comparing all the corners of a face
+    Nfaces = model.Nfaces
+    tol = model.tol
+    FaceCorners = model.FaceCorners[ii]
+    BlockVertex = model.BlockVertex[ii]
+
+    # Initialize variables
+    Index = [[[-1 for col in range(4)] for kk in range(len(FaceCorners[jj]))] for jj in range(Nfaces)]
+
+    # Define index number all block vertices (tolerance of YTolFactor*tol along y, last vertex found wins)
+    Vertices = {}                                                   # (x, z) -> [(y, vertex id)]
+    for ff in range(8):
+        x, y, z = quantize(BlockVertex[ff], tol)
+        if (x, z) not in Vertices:
+            Vertices[(x, z)] = []
+        Vertices[(x, z)].append((y, ff))
+    for jj in range(Nfaces):
+        for kk in range(len(FaceCorners[jj])):
+            for pp in range(4):
+                x, y, z = quantize(FaceCorners[jj][kk][pp], tol)
+                for yy, ff in Vertices.get((x, z), []):
+                    if abs(y - yy) < model.YTolFactor:
+                        Index[jj][kk][pp] = max(Index[jj][kk][pp], ff + 1)
+
+    # Add index of points belonging to interfaces (consecutive numbers wrt vertices)
+    for jj in range(Nfaces):
+        for kk in range(len(FaceCorners[jj])):
+            for pp in range(4):
+                if Index[jj][kk][pp] == -1:
+                    Num_points = Num_points + 1
+                    Index[jj][kk][pp] = Num_points
+
+    # Detect which points of the previous set have the same coordinates and assign the same index:
+    # each corner of the interfaces kk > 0 takes the index of the last corner at the same coordinate
+    # that belongs to another interface of the face (already updated when that interface comes before kk)
+    for jj in range(Nfaces):
+        Corners = {}                                                # coordinate -> [(interface, corner)]
+        for kk in range(len(FaceCorners[jj])):
+            for pp in range(4):
+                key = quantize(FaceCorners[jj][kk][pp], tol)
+                if key not in Corners:
+                    Corners[key] = []
+                Corners[key].append((kk, pp))
+        for kk in range(1, len(FaceCorners[jj])):
+            for pp in range(4):
+                for tt, ff in reversed(Corners[quantize(FaceCorners[jj][kk][pp], tol)]):
+                    if tt != kk:
+                        Index[jj][kk][pp] = Index[jj][tt][ff]
+                        break
+
+    return Index, Num_points
+
+
+def count_contacts(model):
+    # Count max number of contact per block and the number of contact for each plane
+    TotalContact = [0, 0, 0]
+    Max = 0
+    for ii in range(model.N_blocks):
+        Num_cont = [len(model.FaceCorners[ii][jj]) for jj in range(model.Nfaces)]
+        TotalContact[0] = TotalContact[0] + Num_cont[0] + Num_cont[2]  # contact in XZ-plane
+        TotalContact[1] = TotalContact[1] + Num_cont[1] + Num_cont[3]  # contact in YZ-plane
+        TotalContact[2] = TotalContact[2] + Num_cont[4] + Num_cont[5]  # contact in XY-plane
+        Max = max(Max, sum(Num_cont))
+    model.Max = Max
+    model.TotalContact = TotalContact
+    return model
+
+
+def define_point_indexes(model):
+    ##----- 5. DEFINE CONTACT POINT INDEXES -----##
+    # the blocks are indexed one after the other, the new points are numbered globally
+    Num_points = 8
+    Index = [0 for row in range(model.N_blocks)]
+    BlockPoints = [0 for row in range(model.N_blocks)]
+    for ii in range(model.N_blocks):
+        Index[ii], Last = block_point_indexes(model, ii, Num_points)
+        BlockPoints[ii] = Last - Num_points
+        Num_points = Last
+
+    model.Index = Index
+    model.Num_points = Num_points
+    model.BlockPoints = BlockPoints
+    return count_contacts(model)
@@ -0,0 +1,52 @@
+##----- 3.-4. INTERFACE RECTANGLES WITH NUMPY -----##
+# for axis-aligned boxes an interface is the intersection of two rectangles: the corners of the face
+# in contact clamped to the block box, i.e. max of the mins and min of the maxes along each axis.
+# the corners are computed on the integer grid of the blocks (Box) for all the contacts of the model
+# in a few array operations, and converted back to coordinates (Box/10**RoundUnit, the same floats
+# as the rounded coordinates); FaceCorners keeps the corner order of section 3 (polyline of the
+# face in contact, base contact from the vertices at z = 0)
+
+import numpy as np
+
+from .geometry import FACE_VERTICES, VERTEX_BOX
+from .store import ContactStore
+from .columns import contact_columns
+
+
+def interface_rectangles(model):
+    # ContactStore of the interfaces (corners only, indices are set by section 5)
+    Nfaces = model.Nfaces
+    N_blocks = model.N_blocks
+    Box = np.asarray(model.Box, dtype=np.int64).reshape(N_blocks, 6)
+    Vertex = Box[:, VERTEX_BOX]                                                 # N_blocks x 8 x 3
+    offsets, block, face = contact_columns(model)
+    counts = np.diff(offsets).reshape(N_blocks, Nfaces)
+
+    # Base contact: the vertices at z = 0 (first interface of face 4, added when there is none)
+    z0 = Box[:, 2] == 0
+    base = z0 | (Box[:, 5] == 0)
+    added = base & (counts[:, 4] == 0)
+    counts = counts.copy()
+    counts[added, 4] = 1
+    new_offsets = np.zeros(N_blocks*Nfaces + 1, dtype=np.int64)
+    np.cumsum(counts.ravel(), out=new_offsets[1:])
+
+    # Corners of the faces in contact (section 3), in the order of their polylines
+    FacePoints = Vertex[:, FACE_VERTICES]                                       # N_blocks x 6 x 4 x 3
+    slot = np.repeat(np.arange(N_blocks*Nfaces), np.diff(offsets))
+    corners = np.empty((new_offsets[-1], 4, 3), dtype=np.int64)
+    position = new_offsets[slot] + np.arange(len(slot)) - offsets[slot]
+    corners[position] = FacePoints[block, face]
+    first = new_offsets[np.flatnonzero(base)*Nfaces + 4]
+    corners[first] = np.where(z0[base, None, None], Vertex[base, 0:4], Vertex[base, 4:8])
+
+    # Clamp to the block domain (section 4)
+    owner = np.repeat(np.arange(N_blocks), np.diff(new_offsets[::Nfaces]))
+    corners = np.minimum(np.maximum(corners, Box[owner, None, 0:3]), Box[owner, None, 3:6])
+    return ContactStore(new_offsets, corners/10.**model.RoundUnit, np.full((len(corners), 4), -1, dtype=np.int64), Nfaces)
+
+
+def define_interfaces(model):
+    ##----- 3.-4. DEFINE FACE CORNERS and CONTACT POINTS -----##
+    model.FaceCorners = interface_rectangles(model).to_lists()[0]
+    return model
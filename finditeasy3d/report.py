@@ -0,0 +1,147 @@
+##----- FIND IT EASY! 3D - REPORT OF THE SECTIONS -----##
+# wall time, CPU time, peak of the memory traced by tracemalloc and sizes (blocks, faces,
+# interfaces, points, nodes, elements...) of each section, written as JSON and CSV:
+#   FindItEasyReport.json     {"stages": [...], "total": {...}}
+#   FindItEasyReport.csv      one row per stage, one column per size
+# tracemalloc slows the run down many times over: the times are measured without it (memory=False,
+# the default) and memory=True is a separate run that measures the peaks
+# stages run at the same time as others (exporters on several workers) are measured where they run
+# and marked concurrent: the total wall time only counts the stage that waits for them, the total CPU
+# time counts them only when they ran in other processes (the CPU of threads is in the process time
+# of the stage that waits for them)
+
+import csv
+import json
+import os
+import time
+
+try:
+    import tracemalloc
+except ImportError:                     # python 2 / IronPython
+    tracemalloc = None
+
+if hasattr(time, "process_time"):
+    cpu_time = time.process_time
+else:
+    cpu_time = time.clock
+
+# CPU time of the calling thread (stages measured on a thread pool)
+if hasattr(time, "thread_time"):
+    thread_time = time.thread_time
+else:
+    thread_time = cpu_time
+
+
+class Stage(object):
+    # measures of one stage, used as context manager
+
+    def __init__(self, report, section, name):
+        self.report = report
+        self.section = section
+        self.name = name
+        self.wall = 0.
+        self.cpu = 0.
+        self.peak = None
+        self.cached = False
+        self.concurrent = False
+        self.in_process = False             # concurrent stage whose CPU time is in the stage that waits for it
+        self.counts = {}
+
+    def count(self, **counts):
+        self.counts.update(counts)
+
+    def __enter__(self):
+        self.tracing = self.report.memory and not tracemalloc.is_tracing()
+        if self.tracing:
+            tracemalloc.start()
+        elif self.report.memory and hasattr(tracemalloc, "reset_peak"):
+            tracemalloc.reset_peak()
+        self.start = (time.time(), self.report.clock())
+        return self
+
+    def __exit__(self, kind, value, traceback):
+        self.wall = time.time() - self.start[0]
+        self.cpu = self.report.clock() - self.start[1]
+        if self.report.memory:
+            self.peak = tracemalloc.get_traced_memory()[1]
+        if self.tracing:
+            tracemalloc.stop()
+        if self.report.enabled:
+            self.report.stages.append(self)
+        return False
+
+    def row(self):
+        return {'section': self.section, 'stage': self.name, 'wall_s': self.wall, 'cpu_s': self.cpu,
+                'peak_bytes': self.peak, 'cached': self.cached, 'concurrent': self.concurrent, 'counts': dict(self.counts)}
+
+
+class Report(object):
+    # stages measured during a run; with enabled=False nothing is recorded
+
+    def __init__(self, enabled=True, memory=False, clock=cpu_time):
+        self.enabled = enabled
+        self.memory = enabled and memory and tracemalloc is not None
+        self.clock = clock                  # CPU time: cpu_time (process) or thread_time
+        self.stages = []
+
+    def stage(self, section, name):
+        return Stage(self, section, name)
+
+    def merge(self, row, in_process=False):
+        # add a stage measured on another worker (row of its report), marked concurrent;
+        # in_process: the worker is a thread of this process
+        stage = Stage(self, row['section'], row['stage'])
+        stage.wall, stage.cpu, stage.peak, stage.cached = row['wall_s'], row['cpu_s'], row['peak_bytes'], row['cached']
+        stage.concurrent = True
+        stage.in_process = in_process
+        stage.counts = dict(row['counts'])
+        if self.enabled:
+            self.stages.append(stage)
+        return stage
+
+    def rows(self):
+        return [stage.row() for stage in self.stages]
+
+    def total(self):
+        peaks = [stage.peak for stage in self.stages if stage.peak is not None]
+        return {'wall_s': sum([stage.wall for stage in self.stages if not stage.concurrent]),
+                'cpu_s': sum([stage.cpu for stage in self.stages if not stage.in_process]),
+                'peak_bytes': max(peaks) if peaks else None}
+
+    def write(self, outdir=".", basename="FindItEasyReport"):
+        # write basename.json and basename.csv in outdir, return their names
+        if not os.path.isdir(outdir):
+            os.makedirs(outdir)
+        rows = self.rows()
+        names = []
+        for row in rows:
+            for name in sorted(row['counts']):
+                if name not in names:
+                    names.append(name)
+
+        json_name = os.path.join(outdir, basename + ".json")
+        f = open(json_name, "w")
+        json.dump({'stages': rows, 'total': self.total()}, f, indent=1, sort_keys=True)
+        f.close()
+
+        csv_name = os.path.join(outdir, basename + ".csv")
+        f = open(csv_name, "w")
+        writer = csv.writer(f, lineterminator="\n")
+        writer.writerow(['section', 'stage', 'wall_s', 'cpu_s', 'peak_bytes', 'cached', 'concurrent'] + names)
+        for row in rows:
+            writer.writerow([row['section'], row['stage'], "%.6f" % row['wall_s'], "%.6f" % row['cpu_s'],
+                             "" if row['peak_bytes'] is None else row['peak_bytes'], int(row['cached']), int(row['concurrent'])] +
+                            [row['counts'].get(name, "") for name in names])
+        f.close()
+        return [json_name, csv_name]
+
+
+def write_sections(sections, outdir=".", basename="FindItEasyReport"):
+    # report of the Rhino scripts: sections is the list of their (section, name, wall, cpu, sizes)
+    report = Report()
+    for section, name, wall, cpu, sizes in sections:
+        stage = report.stage(section, name)
+        stage.wall, stage.cpu = wall, cpu
+        stage.counts = dict(sizes)
+        report.stages.append(stage)
+    return report.write(outdir, basename)
@@ -0,0 +1,36 @@
+##----- FIND IT EASY! 3D - RHINO ADAPTER -----##
+# read the boxes drawn in Rhino and feed them to the engine
+# rhinoscriptsyntax is passed as argument: this module can be imported without Rhino
+
+POLYSURFACE = 1073741824                # serial number used by Rhino for 3D prismatic objects
+
+
+def select_blocks(rs):
+    # Select all the objects from Rhino sketch (hidden object are selected too) and keep the blocks
+    ALL_OGG = rs.AllObjects(select=True) or []
+    return [obj for obj in ALL_OGG if rs.ObjectType(obj) == POLYSURFACE]
+
+
+def extract_blocks(rs, ALL_BLOCKS=None):
+    # min/max corners [x0, y0, z0, x1, y1, z1] of each block, read from the geometry in memory:
+    # no face, edge or polyline is added to (and deleted from) the Rhino document
+    if ALL_BLOCKS is None:
+        ALL_BLOCKS = select_blocks(rs)
+    blocks = []
+    for obj in ALL_BLOCKS:
+        box = rs.coercebrep(obj).GetBoundingBox(True)   # axis-aligned box of the block
+        blocks.append([box.Min.X, box.Min.Y, box.Min.Z, box.Max.X, box.Max.Y, box.Max.Z])
+    return blocks
+
+
+def draw_ids(rs, model, ID_Block=1, ID_Face=0):
+    # Write the id of the block in its centre and the id of each face in its face centre
+    from .geometry import max_length
+    maxLength = max_length(model)
+    if ID_Block == 1:
+        for ii in range(model.N_blocks):
+            rs.AddText(str(ii), list(model.Block_center[ii]), maxLength/14)
+    if ID_Face == 1:
+        for ii in range(model.N_blocks):
+            for jj in range(model.Nfaces):
+                rs.AddText(str(jj), model.face_center[ii][jj], maxLength/24)
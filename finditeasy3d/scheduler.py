@@ -0,0 +1,89 @@
+##----- 6.-8. EXPORTERS AT THE SAME TIME -----##
+# the exporters only read the model (sections 1-5): they run at the same time on a pool of
+# processes (default) or threads, all on one snapshot of the model. The processes receive it once
+# when they start (inherited when they are forked), the threads get it with their job
+#   - the exporters of the OpenSees model share one job, the model is computed once; exporters
+#     writing the same file (liablock, liablock_compact) share one job too, in their order
+#   - the jobs start from the longest (LiABlock with global numbering, OpenSees...), the pool has
+#     one worker per job at most
+#   - each exporter is measured where it runs (time, CPU, memory traced in its process) and added
+#     to the report as a concurrent stage; the export takes the time of the slowest job instead of
+#     the sum of the exporters
+# with a thread pool the exporters are not measured for memory (tracemalloc traces the whole process)
+# and the pure Python writers share one interpreter: processes are faster on several cores
+
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from .pipeline import EXPORTERS, OPENSEES, SECTIONS, write_exporter
+from .report import Report, thread_time
+
+# exporters from the longest to the shortest (order of the jobs)
+COST = ['liablock', 'opensees', 'opensees_npz', 'opensees_macro', 'liablock_compact', 'columns', 'graph', '3dec']
+
+SNAPSHOT = {}                           # model read by the jobs of a worker process
+
+
+def set_snapshot(model):
+    SNAPSHOT['model'] = model
+
+
+def export_groups(exporters):
+    # exporters of each job, jobs sorted from the longest
+    groups = []
+    for name in exporters:
+        for group in groups:
+            if (name in OPENSEES and group[0] in OPENSEES) or EXPORTERS[name][1] in [EXPORTERS[other][1] for other in group]:
+                group.append(name)
+                break
+        else:
+            groups.append([name])
+    groups.sort(key=lambda group: min([COST.index(name) if name in COST else len(COST) for name in group]))
+    return groups
+
+
+def export_job(job):
+    # run the exporters of a job on its model (threads) or on the snapshot of the process, return the
+    # rows of their stages
+    names, outdir, memory, model, options = job
+    if model is not None:
+        report = Report(memory=False, clock=thread_time)
+    else:
+        model = SNAPSHOT['model']
+        report = Report(memory=memory)
+    data = None
+    for name in names:
+        with report.stage(SECTIONS.get(name, ""), name) as stage:
+            data = write_exporter(model, name, outdir, stage, data, options.get(name)) or data
+    return report.rows()
+
+
+def export_concurrent(model, outdir, exporters, report, jobs=None, pool="process", options=None):
+    # exporters of export() on jobs workers (None: one per job), pool: "process" or "thread"
+    if pool not in ("process", "thread"):
+        raise ValueError("Unknown pool '" + str(pool) + "' (type: process,thread)")
+    groups = export_groups(exporters)
+    if jobs is None:
+        jobs = len(groups)
+    workers = max(1, min(jobs, len(groups)))
+    if options is None:
+        options = {}
+    work = [(group, outdir, report.memory, model if pool == "thread" else None, options) for group in groups]
+
+    with report.stage("6-8", "exporters on " + str(workers) + " " + pool + ("es" if pool == "process" else "s")) as stage:
+        if pool == "thread":
+            executor = ThreadPoolExecutor(max_workers=workers)
+        else:
+            executor = ProcessPoolExecutor(max_workers=workers, initializer=set_snapshot, initargs=(model,))
+        try:
+            results = list(executor.map(export_job, work))
+        finally:
+            executor.shutdown()
+        stage.count(exporters=len(exporters), jobs=len(groups))
+
+    # stages in the order of the exporters
+    rows = {}
+    for result in results:
+        for row in result:
+            rows.setdefault(row['stage'], []).append(row)
+    for name in exporters:
+        report.merge(rows[name].pop(0), pool == "thread")
@@ -0,0 +1,135 @@
+##----- FIND IT EASY! 3D - SPATIAL INDEX -----##
+# built once after the extraction (section 1) and shared by the following stages
+#   - uniform hash grid over the block bounding boxes:   blocks close to a box, faces touching a face
+#   - coordinates quantized on the RoundUnit grid:         block vertices and nodes at a point
+# queries cost O(1) on average instead of a scan of all the blocks
+
+from .contacts import PLANES, in_contact
+
+
+def quantize(point, tol):
+    # integer coordinates of a point on the grid of tol
+    return (int(round(point[0]/tol)), int(round(point[1]/tol)), int(round(point[2]/tol)))
+
+
+class PointIndex(object):
+    # ids stored by coordinate, coordinates are quantized on the grid of tol
+
+    def __init__(self, tol):
+        self.tol = tol
+        self.points = {}
+
+    def key(self, point):
+        return quantize(point, self.tol)
+
+    def add(self, point, item):
+        key = self.key(point)
+        if key not in self.points:
+            self.points[key] = []
+        self.points[key].append(item)
+
+    def at(self, point):
+        # items added at this coordinate, in insertion order
+        return self.points.get(self.key(point), [])
+
+
+class SpatialIndex(object):
+    # hash grid of the blocks of a model and index of their vertices
+
+    def __init__(self, model, cell=None):
+        self.model = model
+        self.tol = model.tol
+        if cell is None:
+            cell = self.default_cell(model)
+        self.cell = cell
+        self.grid = {}                                              # cell -> block ids
+        self.block_cells = [[] for row in range(model.N_blocks)]    # cells of each block
+        self.vertices = PointIndex(model.tol)                       # coordinate -> (block id, vertex id)
+        for ii in range(model.N_blocks):
+            self.add_block(ii)
+
+    @staticmethod
+    def default_cell(model):
+        # mean of the largest block size
+        if model.N_blocks == 0:
+            return 1.
+        total = 0.
+        for ii in range(model.N_blocks):
+            total = total + max(model.Dimensions[ii][4][0], model.Dimensions[ii][4][1], model.Dimensions[ii][1][2])
+        return max(total/model.N_blocks, 10*model.tol)
+
+    def box(self, ii):
+        return self.model.BlockVertex[ii][0], self.model.BlockVertex[ii][6]
+
+    def cells(self, lo, hi):
+        # cells covering the box enlarged by tol
+        rng = [range(int((lo[kk] - self.tol)//self.cell), int((hi[kk] + self.tol)//self.cell) + 1) for kk in range(3)]
+        return [(cx, cy, cz) for cx in rng[0] for cy in rng[1] for cz in rng[2]]
+
+    def add_block(self, ii):
+        lo, hi = self.box(ii)
+        self.block_cells[ii] = self.cells(lo, hi)
+        for key in self.block_cells[ii]:
+            if key not in self.grid:
+                self.grid[key] = []
+            self.grid[key].append(ii)
+        for jj in range(8):
+            self.vertices.add(self.model.BlockVertex[ii][jj], (ii, jj))
+
+    def remove_block(self, ii):
+        for key in self.block_cells[ii]:
+            self.grid[key].remove(ii)
+            if len(self.grid[key]) == 0:
+                del self.grid[key]
+        self.block_cells[ii] = []
+        for jj in range(8):
+            self.vertices.at(self.model.BlockVertex[ii][jj]).remove((ii, jj))
+
+    def renumber(self, NewID, N_blocks):
+        # block ids changed (NewID[ii] = new id of block ii, -1 when it was removed)
+        for key in self.grid:
+            self.grid[key] = [NewID[ii] for ii in self.grid[key] if NewID[ii] != -1]
+        for key in self.vertices.points:
+            self.vertices.points[key] = [(NewID[ii], jj) for ii, jj in self.vertices.points[key] if NewID[ii] != -1]
+        block_cells = [[] for row in range(N_blocks)]
+        for ii in range(len(NewID)):
+            if NewID[ii] != -1:
+                block_cells[NewID[ii]] = self.block_cells[ii]
+        self.block_cells = block_cells
+
+    ##----- QUERIES -----##
+
+    def blocks_near(self, lo, hi, tol=None):
+        # ids of the blocks closer than tol to the box [lo, hi] (overlapping blocks included), sorted
+        if tol is None:
+            tol = self.tol
+        found = set()
+        for key in self.cells(lo, hi):
+            for ii in self.grid.get(key, []):
+                found.add(ii)
+        near = []
+        for ii in found:
+            blo, bhi = self.box(ii)
+            if all(blo[kk] - hi[kk] < tol and lo[kk] - bhi[kk] < tol for kk in range(3)):
+                near.append(ii)
+        near.sort()
+        return near
+
+    def faces_touching(self, ii, pp):
+        # contacts (block id, face id) of the face pp of block ii, same order as ContBlockID/ContSurfID
+        for faces, nn, (aa, bb) in PLANES:
+            if pp in faces:
+                break
+        tt = faces[1] if pp == faces[0] else faces[0]
+        lo = list(self.model.BlockVertex[ii][0])
+        hi = list(self.model.BlockVertex[ii][6])
+        lo[nn] = hi[nn] = self.model.Dimensions[ii][pp][nn]          # the face is the box flattened on its plane
+        touching = []
+        for mm in self.blocks_near(lo, hi):
+            if mm != ii and in_contact(self.model, ii, pp, mm, tt, nn, aa, bb):
+                touching.append((mm, tt))
+        return touching
+
+    def vertices_at(self, point):
+        # (block id, vertex id) of the block vertices at this coordinate
+        return self.vertices.at(point)
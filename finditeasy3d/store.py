@@ -0,0 +1,80 @@
+##----- FIND IT EASY! 3D - CONTACT STORE -----##
+# compact storage of FaceCorners and Index in CSR layout (requires numpy)
+#   offsets[ii*Nfaces + jj]     first interface of the face jj of block ii (offsets[-1] = number of interfaces)
+#   corners[kk]                 4 x 3 coordinates of the corners of interface kk
+#   index[kk]                   4 point indices of interface kk
+# memory is proportional to the number of interfaces and there is no limit on the contacts per face
+
+import numpy as np
+
+
+class ContactStore(object):
+
+    def __init__(self, offsets, corners, index, Nfaces=6):
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.corners = np.asarray(corners, dtype=np.float64).reshape(-1, 4, 3)
+        self.index = np.asarray(index, dtype=np.int64).reshape(-1, 4)
+        self.Nfaces = Nfaces
+        self.N_blocks = (len(self.offsets) - 1)//Nfaces
+
+    @classmethod
+    def from_lists(cls, FaceCorners, Index=None, Nfaces=6):
+        # from the nested lists FaceCorners[ii][jj][kk][pp] (and Index[ii][jj][kk][pp])
+        counts = [len(FaceCorners[ii][jj]) for ii in range(len(FaceCorners)) for jj in range(Nfaces)]
+        offsets = np.zeros(len(counts) + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        corners = np.array([point for row in FaceCorners for face in row for corner in face for point in corner],
+                           dtype=np.float64).reshape(-1, 4, 3)
+        if Index is None:
+            index = np.full((offsets[-1], 4), -1, dtype=np.int64)
+        else:
+            index = np.array([tag for row in Index for face in row for corner in face for tag in corner],
+                             dtype=np.int64).reshape(-1, 4)
+        return cls(offsets, corners, index, Nfaces)
+
+    @classmethod
+    def from_model(cls, model):
+        return cls.from_lists(model.FaceCorners, model.Index, model.Nfaces)
+
+    ##----- ACCESS -----##
+
+    def __len__(self):
+        return int(self.offsets[-1])
+
+    def span(self, ii, jj=None):
+        # first and last+1 interface of a face (or of all the faces of a block)
+        if jj is None:
+            return int(self.offsets[ii*self.Nfaces]), int(self.offsets[(ii + 1)*self.Nfaces])
+        return int(self.offsets[ii*self.Nfaces + jj]), int(self.offsets[ii*self.Nfaces + jj + 1])
+
+    def face(self, ii, jj):
+        # corners and indices of the interfaces of face jj of block ii (views, no copy)
+        start, end = self.span(ii, jj)
+        return self.corners[start:end], self.index[start:end]
+
+    def counts(self):
+        # number of interfaces of each block face, N_blocks x Nfaces
+        return np.diff(self.offsets).reshape(self.N_blocks, self.Nfaces)
+
+    def owners(self):
+        # block and face of each interface
+        owner = np.repeat(np.arange(self.N_blocks*self.Nfaces), np.diff(self.offsets))
+        return owner//self.Nfaces, owner % self.Nfaces
+
+    @property
+    def nbytes(self):
+        return self.offsets.nbytes + self.corners.nbytes + self.index.nbytes
+
+    def to_lists(self):
+        # FaceCorners and Index as nested lists (points as tuples)
+        flat = self.corners.reshape(-1, 3)
+        points = list(zip(flat[:, 0].tolist(), flat[:, 1].tolist(), flat[:, 2].tolist()))
+        corners = [points[kk:kk + 4] for kk in range(0, len(points), 4)]
+        index = self.index.tolist()
+        offsets = self.offsets.tolist()
+        Nfaces = self.Nfaces
+        FaceCorners = [[corners[offsets[ii*Nfaces + jj]:offsets[ii*Nfaces + jj + 1]] for jj in range(Nfaces)]
+                       for ii in range(self.N_blocks)]
+        Index = [[index[offsets[ii*Nfaces + jj]:offsets[ii*Nfaces + jj + 1]] for jj in range(Nfaces)]
+                 for ii in range(self.N_blocks)]
+        return FaceCorners, Index
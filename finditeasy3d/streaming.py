@@ -0,0 +1,413 @@
+##----- FIND IT EASY! 3D - STREAMING BY SLABS -----##
+# models larger than memory: the blocks are split in slabs along z (whole courses or storeys, by the
+# bottom of the blocks) and sections 2-8 run on one slab at a time, with its halo (the blocks of the
+# other slabs touching its z range) so that the contacts between two slabs are found. The LiA rows,
+# the 3DEC 'poly brick' lines and the OpenSees nodes and elements of a slab are generated and written
+# before the next slab is loaded: memory is bounded by the size of a slab and its halo, not of the model
+#   - stream order: slab after slab, the blocks of a slab in input order. Block ids, point numbers
+#     and node tags are global in this order; for blocks listed from the bottom up (z0 non-decreasing)
+#     it is the input order and the files are the ones written by run(). StreamOrder.csv, next to
+#     the files, gives the input id of every block id of the files
+#   - the parts of the files that need the totals of the model (LiA header and empty columns, tags
+#     of the stdBrick elements, ...) are spooled in temporary files next to them and copied at the end
+#   - a zeroLength row at a coordinate that the next slabs can reach stays open until they are loaded
+#
+#   model = finditeasy3d.stream(blocks, "m", outdir="output", max_blocks=100000)
+
+import csv
+import heapq
+import os
+import tempfile
+
+from .model import Model, YTolFactor, round_unit, num_str
+from .geometry import extract_geometry
+from .contacts import find_contact_pairs
+from .spatial import PointIndex
+from .points import block_face_corners, block_contact_points, block_point_indexes, count_contacts
+from .incremental import GEOMETRY
+from .liablock import block_cells, header_line, row_head
+from .threedec import poly_brick
+from .opensees import (brick_nodes, fixed_nodes, OPENSEES_HEADER, OPENSEES_MATERIALS, OPENSEES_CONSTRAINTS,
+                       OPENSEES_ZERO_LENGTH, OPENSEES_FOOTER, node_line, brick_line, fix_line, equal_dof_line,
+                       zero_length_line, vertex_list)
+from .pipeline import EXPORTERS, print_summary
+
+
+class Slab(Model):
+    # blocks of a slab with the results of sections 1-5, block ids and point numbers are global
+
+    def __init__(self, UnitsTag, YTolFactor=YTolFactor):
+        Model.__init__(self, UnitsTag, YTolFactor)
+        self.first = 0              # stream id of the first block of the slab (the ids are consecutive)
+        self.first_point = 8        # highest point index of the previous slabs
+        self.vertices = None        # vertices of the slab and halo blocks: coordinate -> (stream id, vertex id)
+        self.z_next = None          # bottom of the next slab on the grid of tol (None for the last slab)
+
+
+##----- SLABS -----##
+
+def z_bounds(blocks, RoundUnit):
+    # bottom and top of every block on the grid of tol (Box[2] and Box[5])
+    tol = 10**(-RoundUnit)
+    z0 = [int(round(round(min(c[2], c[5]), RoundUnit)/tol)) for c in blocks]
+    z1 = [int(round(round(max(c[2], c[5]), RoundUnit)/tol)) for c in blocks]
+    return z0, z1
+
+
+def split_slabs(z0, max_blocks):
+    # block ids of each slab (input order), slabs sorted wrt z: at most max_blocks blocks per slab,
+    # cut between two levels of z0 unless a single level has more blocks
+    order = sorted(range(len(z0)), key=lambda ii: (z0[ii], ii))
+    slabs = []
+    start = 0
+    while start < len(order):
+        end = min(start + max_blocks, len(order))
+        cut = end
+        while start < cut < len(order) and z0[order[cut]] == z0[order[cut-1]]:
+            cut = cut - 1
+        if cut == start:
+            cut = end
+        slabs.append(sorted(order[start:cut]))
+        start = cut
+    return slabs
+
+
+def stream_order(blocks, UnitsTag, max_blocks):
+    # input id of the blocks in stream order (block ii of the files is blocks[order[ii]])
+    z0, z1 = z_bounds(blocks, round_unit(UnitsTag))
+    return [ii for slab in split_slabs(z0, max_blocks) for ii in slab]
+
+
+def write_stream_map(order, filename="StreamOrder.csv"):
+    # block id of the files and input id of the block (position in blocks)
+    f = open(filename, "w")
+    writer = csv.writer(f, lineterminator="\n")
+    writer.writerow(['block', 'input'])
+    for ii in range(len(order)):
+        writer.writerow([ii, order[ii]])
+    f.close()
+
+
+def slab_model(blocks, UnitsTag, YTolFactor, local, ids, owned, Num_points):
+    # sections 1-5 of the owned blocks, with the local model of the slab and its halo (local: input
+    # ids in stream order, ids: their stream ids, owned: positions of the slab blocks in local)
+    model = Model(UnitsTag, YTolFactor)
+    extract_geometry(model, [blocks[ii] for ii in local])
+    find_contact_pairs(model)
+    model.FaceCorners = [None for row in range(model.N_blocks)]
+    for kk in owned:
+        model.FaceCorners[kk] = block_face_corners(model, kk)
+        block_contact_points(model, kk)
+
+    slab = Slab(UnitsTag, YTolFactor)
+    slab.N_blocks = len(owned)
+    slab.blocks = [blocks[local[kk]] for kk in owned]
+    for name in GEOMETRY:
+        setattr(slab, name, [getattr(model, name)[kk] for kk in owned])
+    slab.first = ids[owned[0]]
+    slab.first_point = Num_points
+    slab.ContBlockID = [[[ids[mm] for mm in model.ContBlockID[kk][jj]] for jj in range(model.Nfaces)] for kk in owned]
+    slab.ContSurfID = [model.ContSurfID[kk] for kk in owned]
+    slab.FaceCorners = [model.FaceCorners[kk] for kk in owned]
+    slab.Index = [0 for row in range(slab.N_blocks)]
+    slab.BlockPoints = [0 for row in range(slab.N_blocks)]
+    for ii in range(slab.N_blocks):
+        slab.Index[ii], Last = block_point_indexes(model, owned[ii], Num_points)
+        slab.BlockPoints[ii] = Last - Num_points
+        Num_points = Last
+    slab.Num_points = Num_points
+    slab.vertices = PointIndex(model.tol)
+    for kk in range(model.N_blocks):
+        for jj in range(8):
+            slab.vertices.add(model.BlockVertex[kk][jj], (ids[kk], jj))
+    return count_contacts(slab)
+
+
+def stream_slabs(blocks, UnitsTag, max_blocks=50000, YTolFactor=YTolFactor):
+    # sections 1-5 slab after slab: generator of the Slab models in stream order
+    z0, z1 = z_bounds(blocks, round_unit(UnitsTag))
+    slabs = split_slabs(z0, max_blocks)
+    bottom = [min([z0[ii] for ii in slab]) for slab in slabs]
+    position = [0 for row in range(len(blocks))]                   # stream id of each block
+    first = 0
+    for slab in slabs:
+        for ii in slab:
+            position[ii] = first
+            first = first + 1
+
+    below = []                          # heap of the blocks of the previous slabs: (top, input id)
+    Num_points = 8
+    for ss in range(len(slabs)):
+        owned = slabs[ss]
+        top = max([z1[ii] for ii in owned])
+
+        # Halo: blocks of the previous slabs up to the bottom, of the next slabs down to the top
+        while below and below[0][0] < bottom[ss]:
+            heapq.heappop(below)
+        halo = [ii for zz, ii in below]
+        for tt in range(ss + 1, len(slabs)):
+            if bottom[tt] > top:
+                break
+            halo.extend([ii for ii in slabs[tt] if z0[ii] <= top])
+
+        local = sorted(owned + halo, key=lambda ii: position[ii])
+        owned_set = set(owned)
+        slab = slab_model(blocks, UnitsTag, YTolFactor, local, [position[ii] for ii in local],
+                          [kk for kk in range(len(local)) if local[kk] in owned_set], Num_points)
+        if ss + 1 < len(slabs):
+            slab.z_next = bottom[ss + 1]
+        Num_points = slab.Num_points
+        yield slab
+
+        for ii in owned:
+            heapq.heappush(below, (z1[ii], ii))
+
+
+##----- LINES OF EACH SLAB -----##
+
+def liablock_rows(slab, compact=False):
+    # (row head, contact cells, point cells, volume) of the blocks of the slab
+    for ii in range(slab.N_blocks):
+        Contacts, Points = block_cells(slab, ii, compact)
+        yield (row_head(slab.first + ii, slab.Block_center[ii]), ["&"+cell+"\t" for cell in Contacts],
+               ["&"+cell+"\t" if cell is not None else "\t" for cell in Points], "&"+num_str(slab.Volume[ii])+"\n")
+
+
+def threedec_lines(slab):
+    for ii in range(slab.N_blocks):
+        yield poly_brick(slab, ii)
+
+
+class ZeroLengthRows(object):
+    # rows of the zeroLength elements across the slabs: one row for each coordinate shared by the
+    # vertices of two blocks, with all the node tags at that coordinate (as opensees_model). A row
+    # is complete when its coordinate is below the bottom of the next slab (no other block can add
+    # nodes there); the rows are given in order, the ones after an open row wait for it
+
+    def __init__(self, tol):
+        self.tol = tol
+        self.carry = {}                 # coordinate -> tags of the nodes of the previous slabs that the next slabs can reach
+        self.shared = set()             # coordinates with a row that the next slabs can reach
+        self.rows = []                  # rows not given yet: (coordinate, node tags)
+
+    def add(self, slab, Nodes, first_tag):
+        # complete rows once the nodes of the slab are added, Nodes[kk] has the tag first_tag+kk+1
+        NodeIndex = PointIndex(self.tol)
+        for kk in range(len(Nodes)):
+            NodeIndex.add(Nodes[kk], first_tag + kk + 1)
+        for key, tags in self.rows:
+            tags.extend(NodeIndex.points.get(key, []))
+        for ii in range(slab.N_blocks):
+            for jj in range(8):
+                key = NodeIndex.key(slab.BlockVertex[ii][jj])
+                if key not in self.shared:
+                    for nn, pp in slab.vertices.at(slab.BlockVertex[ii][jj]):
+                        if nn != slab.first + ii:
+                            self.shared.add(key)
+                            self.rows.append((key, self.carry.get(key, []) + NodeIndex.points.get(key, [])))
+                            break
+
+        # Keep what the next slabs can reach (z >= their bottom)
+        z_next = slab.z_next
+        if z_next is None:
+            rows, self.rows = self.rows, []
+            return [tags for key, tags in rows]
+        self.carry = dict((key, tags) for key, tags in self.carry.items() if key[2] >= z_next)
+        for key in NodeIndex.points:
+            if key[2] >= z_next:
+                self.carry[key] = self.carry.get(key, []) + NodeIndex.points[key]
+        self.shared = set([key for key in self.shared if key[2] >= z_next])
+        done = 0
+        while done < len(self.rows) and self.rows[done][0][2] < z_next:
+            done = done + 1
+        rows, self.rows = self.rows[:done], self.rows[done:]
+        return [tags for key, tags in rows]
+
+
+def opensees_parts(slab, first_tag, rows, shared=False):
+    # (part, text) of the OpenSees file for the blocks of the slab, parts: "node", "brick" (node tags of
+    # the element), "fix", "equalDOF", "zeroLength" (node tags of the element), "vertex" (IndVertex of a block)
+    Nodes, Bricks, EqualDOF, IndVertex = brick_nodes(slab, shared)
+    for kk in range(len(Nodes)):
+        yield "node", node_line(first_tag + kk + 1, Nodes[kk])
+    for nodes in Bricks:
+        yield "brick", [first_tag + tag for tag in nodes]
+    for tag in fixed_nodes(Nodes, first_tag):
+        yield "fix", fix_line(tag)
+    for master, slave in EqualDOF:
+        yield "equalDOF", equal_dof_line(first_tag + master, first_tag + slave)
+    for tags in rows.add(slab, Nodes, first_tag):
+        for jj in range(1, len(tags)):
+            yield "zeroLength", [tags[0], tags[jj]]
+    for ii in range(slab.N_blocks):
+        yield "vertex", vertex_list([first_tag + pos for pos in IndVertex[ii]])
+
+
+##----- FILES -----##
+
+# exporters that can write slab after slab (files of pipeline.EXPORTERS)
+STREAMING = ['3dec', 'liablock', 'liablock_compact', 'opensees']
+
+
+def spool(filename):
+    # temporary file next to the output file, deleted when closed
+    return tempfile.TemporaryFile(mode="w+", dir=os.path.dirname(os.path.abspath(filename)))
+
+
+class LiAStream(object):
+    # the rows are spooled without the empty cells, the header and the number of cells of every row
+    # (Max contacts, point columns) are known at the end
+
+    def __init__(self, filename, compact=False):
+        self.filename = filename
+        self.compact = compact
+        self.rows = spool(filename)
+        self.Max = 0
+        self.N_columns = 8
+        self.Num_points = 8
+
+    def write(self, slab):
+        for head, Contacts, Points, volume in liablock_rows(slab, self.compact):
+            self.rows.write(str(len(Contacts))+" "+str(len(Points))+"\n"+head+"".join(Contacts)+"\n"+"".join(Points)+volume)
+            self.N_columns = max(self.N_columns, len(Points))
+        self.Max = max(self.Max, slab.Max)
+        self.Num_points = slab.Num_points
+
+    def close(self):
+        if not self.compact:
+            self.N_columns = 2*self.Num_points - 1
+        f = open(self.filename, "w+")
+        f.write(header_line(self.Max, self.N_columns))
+        self.rows.seek(0)
+        sizes = self.rows.readline()
+        while sizes:
+            N_contacts, N_points = [int(size) for size in sizes.split()]
+            f.write(self.rows.readline()[:-1] + "\t"*(self.Max - N_contacts))
+            Points = self.rows.readline()
+            tail = Points.rindex("&")
+            f.write(Points[:tail] + "\t"*(self.N_columns - N_points) + Points[tail:])
+            sizes = self.rows.readline()
+        self.rows.close()
+        f.close()
+
+
+class ThreeDECStream(object):
+
+    def __init__(self, filename):
+        self.file = open(filename, "w+")
+        self.file.write("new\n")
+
+    def write(self, slab):
+        for line in threedec_lines(slab):
+            self.file.write(line)
+
+    def close(self):
+        self.file.write("plot create plot Blocks\nplot block")
+        self.file.close()
+
+
+class OpenSeesStream(object):
+    # nodes go straight to the file, the other parts are spooled (the tags of the stdBrick elements
+    # follow the last node) and copied after them
+
+    PARTS = ["brick", "fix", "equalDOF", "zeroLength", "vertex"]
+
+    def __init__(self, filename, tol, shared=False):
+        self.file = open(filename, "w+")
+        self.shared = shared
+        self.file.write(OPENSEES_HEADER)
+        self.parts = dict((part, spool(filename)) for part in self.PARTS)
+        self.rows = ZeroLengthRows(tol)
+        self.NumNodes = 0
+        self.N_blocks = 0
+        self.N_zeroLength = 0
+
+    def write(self, slab):
+        NumNodes = self.NumNodes
+        for part, text in opensees_parts(slab, NumNodes, self.rows, self.shared):
+            if part == "node":
+                self.file.write(text)
+                self.NumNodes = self.NumNodes + 1
+            elif part == "brick":
+                self.parts[part].write("".join([str(tag)+"," for tag in text])+"\n")
+            elif part == "zeroLength":
+                self.parts[part].write(zero_length_line(self.N_zeroLength, text))
+                self.N_zeroLength = self.N_zeroLength + 1
+            else:
+                self.parts[part].write(text + ("\n" if part == "vertex" else ""))
+        self.N_blocks = self.N_blocks + slab.N_blocks
+
+    def copy(self, part):
+        self.parts[part].seek(0)
+        for line in self.parts[part]:
+            self.file.write(line)
+        self.parts[part].close()
+
+    def close(self):
+        f = self.file
+        f.write(OPENSEES_MATERIALS)
+        self.parts["brick"].seek(0)
+        kk = 0
+        for line in self.parts["brick"]:
+            kk = kk + 1
+            f.write(brick_line(self.NumNodes + kk, line[:-1].split(",")[:-1]))
+        self.parts["brick"].close()
+        f.write(OPENSEES_CONSTRAINTS)
+        self.copy("fix")
+        self.copy("equalDOF")
+        f.write(OPENSEES_ZERO_LENGTH)
+        self.copy("zeroLength")
+        f.write(OPENSEES_FOOTER)
+        f.write("\n\nN_blocks="+str(self.N_blocks))
+        f.write("\nNumNodes="+str(self.NumNodes))
+        f.write("\nIndVertex=[")
+        self.parts["vertex"].seek(0)
+        for kk, line in enumerate(self.parts["vertex"]):
+            f.write(("," if kk else "")+line[:-1])
+        self.parts["vertex"].close()
+        f.write("]")
+        f.close()
+
+
+def stream_writer(name, outdir, tol, options=None):
+    # options: keyword arguments of the writer (shared for 'opensees')
+    filename = os.path.join(outdir, EXPORTERS[name][1])
+    if options is None:
+        options = {}
+    if name == 'liablock':
+        return LiAStream(filename)
+    if name == 'liablock_compact':
+        return LiAStream(filename, compact=True)
+    if name == '3dec':
+        return ThreeDECStream(filename)
+    return OpenSeesStream(filename, tol, **options)
+
+
+def stream(blocks, UnitsTag, outdir=".", exporters=("liablock", "3dec", "opensees"), max_blocks=50000,
+           verbose=True, YTolFactor=YTolFactor, options=None):
+    # sections 1-8 slab after slab (at most max_blocks blocks per slab), the files are written in
+    # outdir with StreamOrder.csv (input id of the blocks of the files); return a Model with the
+    # totals only (N_blocks, Num_points, Max, TotalContact)
+    # options: keyword arguments of the exporters, e.g. {'opensees': {'shared': True}}
+    for name in exporters:
+        if name not in STREAMING:
+            raise ValueError("Exporter '" + name + "' cannot stream (type: " + ",".join(STREAMING) + ")")
+    if not os.path.isdir(outdir):
+        os.makedirs(outdir)
+    model = Model(UnitsTag, YTolFactor)
+    if options is None:
+        options = {}
+    write_stream_map(stream_order(blocks, UnitsTag, max_blocks), os.path.join(outdir, "StreamOrder.csv"))
+    writers = [stream_writer(name, outdir, model.tol, options.get(name)) for name in exporters]
+    for slab in stream_slabs(blocks, UnitsTag, max_blocks, YTolFactor):
+        for writer in writers:
+            writer.write(slab)
+        model.N_blocks = model.N_blocks + slab.N_blocks
+        model.Num_points = slab.Num_points
+        model.Max = max(model.Max, slab.Max)
+        model.TotalContact = [model.TotalContact[ff] + slab.TotalContact[ff] for ff in range(3)]
+    for writer in writers:
+        writer.close()
+    if verbose:
+        print_summary(model)
+    return model
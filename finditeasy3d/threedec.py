@@ -0,0 +1,24 @@
+##----- 7. WRITE TXT FILE COMPATIBLE WITH 3DEC VERSION 5.2 -----##
+
+from .model import num_str
+
+
+def poly_brick(model, ii):
+    # Take two opposite vertices among the 8 present in each block
+    V0 = model.BlockVertex[ii][0]
+    V6 = model.BlockVertex[ii][6]
+    return "poly brick\t"+num_str(V0[0])+","+num_str(V6[0])+"\t"+num_str(V0[1])+","+num_str(V6[1])+"\t"+num_str(V0[2])+","+num_str(V6[2])+"\n"
+
+
+def write_3dec(model, filename="3DECInputFile.txt"):
+    # Open txt-file
+    g = open(filename, "w+")
+
+    # Fill the input file
+    g.write("new\n")
+    for ii in range(model.N_blocks):
+        g.write(poly_brick(model, ii))
+    g.write("plot create plot Blocks\nplot block")
+
+    # Close txt-file
+    g.close()
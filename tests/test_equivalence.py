@@ -0,0 +1,539 @@
+##----- FIND IT EASY! 3D - EQUIVALENCE CHECKS -----##
+# the optimized paths of the engine write the same files as the reference ones, on the bundled samples
+#
+#   python -m pytest -q tests
+
+import copy
+import filecmp
+import os
+import random
+import subprocess
+import threading
+
+import pytest
+
+import finditeasy3d
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLES = {'igor': os.path.join(ROOT, "3DEC", "Input_file", "IgorBuilding.txt"),
+           'ex_buildings': os.path.join(ROOT, "3DEC", "Input_file", "Ex_Buildings.txt")}
+
+MODELS = {}                             # sample -> model of sections 1-5, built once
+
+# Python 2 interpreter for the Rhino scripts (IronPython 2.7 in Rhino)
+PYTHON2 = os.environ.get("PYTHON2", "python2")
+
+# runs a script on the rhinoscriptsyntax stub with both extractions, and run() on the same blocks:
+#   python2 -c SCRIPT_RUN script generator N_blocks outdir
+SCRIPT_RUN = '''
+import os, sys
+sys.path[:0] = [os.getcwd(), os.path.join(os.getcwd(), "benchmarks")]
+import finditeasy3d
+from rhinostub import run_script
+from generators import GENERATORS
+script, generator, N_blocks, outdir = sys.argv[1], sys.argv[2], int(sys.argv[3]), sys.argv[4]
+blocks = GENERATORS[generator](N_blocks)
+for FastExtraction in [0, 1]:
+    run_script(script, blocks, os.path.join(outdir, "script" + str(FastExtraction)), {'FastExtraction': FastExtraction})
+finditeasy3d.run(blocks, "m", os.path.join(outdir, "engine"), verbose=False)
+'''
+
+
+def blocks_of(sample):
+    return finditeasy3d.read_blocks(SAMPLES[sample])
+
+
+def model_of(sample):
+    if sample not in MODELS:
+        MODELS[sample] = finditeasy3d.build_model(blocks_of(sample), "m")
+    return MODELS[sample]
+
+
+def same_file(name1, name2):
+    # same bytes, or same arrays for .npz files (the zip entries carry the time they were written)
+    if not name1.endswith(".npz"):
+        return filecmp.cmp(name1, name2, shallow=False)
+    np = pytest.importorskip("numpy")
+    with np.load(name1) as f1:
+        with np.load(name2) as f2:
+            return sorted(f1.files) == sorted(f2.files) and all([np.array_equal(f1[name], f2[name]) for name in f1.files])
+
+
+def python2():
+    # True if PYTHON2 runs a Python 2 interpreter
+    try:
+        return subprocess.check_output([PYTHON2, "-c", "import sys; print(sys.version_info[0])"], stderr=subprocess.STDOUT).strip() == b"2"
+    except (OSError, subprocess.CalledProcessError):
+        return False
+
+
+def differing_files(dir1, dir2, names):
+    # names of the files that differ
+    return [name for name in names if not same_file(os.path.join(dir1, name), os.path.join(dir2, name))]
+
+
+# attributes of a model of sections 1-5
+SECTIONS = ['N_blocks', 'blocks', 'Box', 'face_center', 'Dimensions', 'Volume', 'Block_center', 'BlockVertex', 'FacePoints',
+            'ContBlockID', 'ContSurfID', 'FaceCorners', 'Index', 'Num_points', 'BlockPoints', 'Max', 'TotalContact']
+
+
+def differing_attributes(model, other):
+    return [name for name in SECTIONS if getattr(model, name) != getattr(other, name)]
+
+
+OPPOSITE = {0: 2, 2: 0, 1: 3, 3: 1, 4: 5, 5: 4}         # face in contact with each face
+NORMAL = {0: 1, 2: 1, 1: 0, 3: 0, 4: 2, 5: 2}           # axis normal to each face
+
+
+def float_pairs(model):
+    # (block, face, block, face) in contact with the float test of section 2 of the Rhino scripts
+    # (floats within tol), on the faces of the same plane instead of all block pairs
+    tol = model.tol
+    planes = {}
+    for mm in range(model.N_blocks):
+        for tt in range(model.Nfaces):
+            planes.setdefault((tt, int(round(model.Dimensions[mm][tt][NORMAL[tt]]/tol))), []).append(mm)
+    pairs = set()
+    for ii in range(model.N_blocks):
+        for pp in range(model.Nfaces):
+            tt = OPPOSITE[pp]
+            axis = NORMAL[pp]
+            key = int(round(model.Dimensions[ii][pp][axis]/tol))
+            for mm in planes.get((tt, key - 1), []) + planes.get((tt, key), []) + planes.get((tt, key + 1), []):
+                if mm == ii or abs(model.Dimensions[ii][pp][axis] - model.Dimensions[mm][tt][axis]) >= tol:
+                    continue
+                if all([abs(model.face_center[ii][pp][aa] - model.face_center[mm][tt][aa])
+                        - abs((model.Dimensions[ii][pp][aa] + model.Dimensions[mm][tt][aa])*0.5) < -tol
+                        for aa in range(3) if aa != axis]):
+                    pairs.add((ii, pp, mm, tt))
+    return pairs
+
+
+def all_pairs(model):
+    # ContBlockID and ContSurfID of the loop over all the block pairs, before the sort-and-sweep
+    from finditeasy3d.contacts import PLANES, in_contact
+    ContBlockID = [[[] for jj in range(model.Nfaces)] for ii in range(model.N_blocks)]
+    ContSurfID = [[[] for jj in range(model.Nfaces)] for ii in range(model.N_blocks)]
+    for faces, nn, (aa, bb) in PLANES:
+        for ii in range(model.N_blocks):
+            for mm in range(model.N_blocks):
+                if mm != ii:
+                    for pp in faces:
+                        for tt in faces:
+                            if pp != tt and in_contact(model, ii, pp, mm, tt, nn, aa, bb):
+                                ContBlockID[ii][pp].append(mm)
+                                ContSurfID[ii][pp].append(tt)
+    return ContBlockID, ContSurfID
+
+
+def all_corner_pairs(model):
+    # Index and Num_points of the loops of section 5 of the Rhino scripts, comparing every corner with
+    # the block vertices and with all the corners of the other interfaces of the face, on the grid of tol
+    from finditeasy3d.spatial import quantize
+    Num_points = 8
+    Index = []
+    for ii in range(model.N_blocks):
+        FaceCorners = [[[quantize(point, model.tol) for point in corners] for corners in face] for face in model.FaceCorners[ii]]
+        BlockVertex = [quantize(point, model.tol) for point in model.BlockVertex[ii]]
+        Index.append([[[-1 for pp in range(4)] for corners in face] for face in FaceCorners])
+        for jj in range(model.Nfaces):
+            for kk in range(len(FaceCorners[jj])):
+                for pp in range(4):
+                    for ff in range(8):
+                        x, y, z = FaceCorners[jj][kk][pp]
+                        if x == BlockVertex[ff][0] and abs(y - BlockVertex[ff][1]) < model.YTolFactor and z == BlockVertex[ff][2]:
+                            Index[ii][jj][kk][pp] = ff + 1
+        for jj in range(model.Nfaces):
+            for kk in range(len(FaceCorners[jj])):
+                for pp in range(4):
+                    if Index[ii][jj][kk][pp] == -1:
+                        Num_points = Num_points + 1
+                        Index[ii][jj][kk][pp] = Num_points
+        for jj in range(model.Nfaces):
+            for kk in range(1, len(FaceCorners[jj])):
+                for tt in range(len(FaceCorners[jj])):
+                    if tt != kk:
+                        for pp in range(4):
+                            for ff in range(4):
+                                if FaceCorners[jj][kk][pp] == FaceCorners[jj][tt][ff]:
+                                    Index[ii][jj][kk][pp] = Index[ii][jj][tt][ff]
+    return Index, Num_points
+
+
+def all_node_pairs(Nodes, N_subBlock):
+    # equalDOF pairs of the Rhino scripts: every node of a block compared with all the nodes of the
+    # block, then one master kept for each pair of coincident nodes
+    IDnodeOpensees = [[-1, -1, -1]] + [list(node) for node in Nodes]
+    MtsSlvNodes = [[] for row in range(len(IDnodeOpensees))]
+    lengh = [0]
+    for ii in range(len(N_subBlock)):
+        lengh.append(lengh[ii] + 8*N_subBlock[ii])
+    for ii in range(len(N_subBlock)):
+        for pp in range(lengh[ii] + 1, lengh[ii + 1] + 1):
+            for tt in range(lengh[ii] + 1, lengh[ii + 1] + 1):
+                if tt != pp and IDnodeOpensees[pp] == IDnodeOpensees[tt] and IDnodeOpensees[pp][2] != 0:
+                    MtsSlvNodes[pp].append(tt)
+    for ii in range(len(MtsSlvNodes)):
+        for jj in range(len(MtsSlvNodes[ii])):
+            for tt in range(len(MtsSlvNodes[MtsSlvNodes[ii][jj]])):
+                if MtsSlvNodes[MtsSlvNodes[ii][jj]][tt] == ii:
+                    MtsSlvNodes[MtsSlvNodes[ii][jj]][tt] = -1
+    return [[ii, tt] for ii in range(len(MtsSlvNodes)) for tt in MtsSlvNodes[ii] if tt != -1]
+
+
+def all_vertex_pairs(model, Nodes):
+    # zeroLength node pairs of the Rhino scripts: every block vertex compared with the vertices of all
+    # the other blocks, a row of node tags for each pair found, then the duplicates removed
+    IDnodeOpensees = [[-1, -1, -1]] + [list(node) for node in Nodes]
+    BlockVertex = [[list(vertex) for vertex in vertices] for vertices in model.BlockVertex]
+    ZeroLengthElem = []
+    for ii in range(model.N_blocks):
+        for jj in range(8):
+            for nn in range(model.N_blocks):
+                for pp in range(8):
+                    if nn != ii and BlockVertex[ii][jj] == BlockVertex[nn][pp]:
+                        ZeroLengthElem.append([kk for kk in range(1, len(IDnodeOpensees)) if IDnodeOpensees[kk] == BlockVertex[ii][jj]])
+    for ii in range(len(ZeroLengthElem)):
+        for jj in range(len(ZeroLengthElem[ii])):
+            for nn in range(len(ZeroLengthElem)):
+                for pp in range(len(ZeroLengthElem[nn])):
+                    if nn != ii and ZeroLengthElem[ii][jj] == ZeroLengthElem[nn][pp]:
+                        ZeroLengthElem[nn][pp] = -1
+    return [[row[0], row[jj]] for row in ZeroLengthElem for jj in range(1, len(row)) if row[jj] != -1]
+
+
+def contact_pairs(model):
+    return set([(ii, jj, model.ContBlockID[ii][jj][kk], model.ContSurfID[ii][jj][kk])
+                for ii in range(model.N_blocks) for jj in range(model.Nfaces) for kk in range(len(model.ContBlockID[ii][jj]))])
+
+
+def edge_only(model, pair):
+    # the two faces only touch along an edge (no overlap on one of their axes, on the integers of Box)
+    ii, pp, mm, tt = pair
+    Box1, Box2 = model.Box[ii], model.Box[mm]
+    return any([min(Box1[aa + 3], Box2[aa + 3]) - max(Box1[aa], Box2[aa]) == 0 for aa in range(3) if aa != NORMAL[pp]])
+
+
+##----- NUMPY PATHS -----##
+
+@pytest.mark.parametrize("sample", sorted(SAMPLES))
+def test_interface_rectangles(sample):
+    # interface rectangles on arrays == sections 3 and 4 on the lists
+    pytest.importorskip("numpy")
+    from finditeasy3d.rectangles import define_interfaces
+    from finditeasy3d.points import define_face_corners, define_contact_points
+    arrays = define_interfaces(copy.deepcopy(model_of(sample)))
+    loops = define_contact_points(define_face_corners(copy.deepcopy(model_of(sample))))
+    assert arrays.FaceCorners == loops.FaceCorners
+
+
+@pytest.mark.parametrize("sample", sorted(SAMPLES))
+def test_subblock_arrays(sample):
+    # sub-block grid and its nodes on arrays == subblock_grid
+    pytest.importorskip("numpy")
+    from finditeasy3d.grid import subblock_arrays
+    from finditeasy3d.opensees import subblock_grid
+    assert subblock_arrays(model_of(sample)) == subblock_grid(model_of(sample))
+
+
+@pytest.mark.parametrize("sample", sorted(SAMPLES))
+def test_shared_arrays(sample):
+    # shared grid points and brick connectivity on arrays == shared_grid
+    pytest.importorskip("numpy")
+    from finditeasy3d.grid import shared_arrays
+    from finditeasy3d.opensees import shared_grid
+    assert shared_arrays(model_of(sample)) == shared_grid(model_of(sample))
+
+
+##----- RHINO SCRIPTS -----##
+
+@pytest.mark.parametrize("script", ["FIND_IT_EASY_3D.py", "FIND_IT_EASY_3D_Opensees.py"])
+@pytest.mark.parametrize("generator", ["box_building", "english_bond"])
+def test_rhino_script(script, generator, tmp_path):
+    # the script writes the same files with FastExtraction 0 and 1, and run() writes them too
+    if not python2():
+        pytest.skip("no Python 2 interpreter for the Rhino scripts (set PYTHON2)")
+    subprocess.check_output([PYTHON2, "-c", SCRIPT_RUN, script, generator, "120", str(tmp_path)], cwd=ROOT)
+    names = ["LiAInputFile.txt", "3DECInputFile.txt"] + (["OpenSeesInputFile.txt"] if "Opensees" in script else [])
+    assert differing_files(str(tmp_path / "script0"), str(tmp_path / "script1"), names) == []
+    assert differing_files(str(tmp_path / "script1"), str(tmp_path / "engine"), names) == []
+
+
+##----- SECTIONS 1-5 -----##
+
+@pytest.mark.parametrize("sample", sorted(SAMPLES))
+@pytest.mark.parametrize("N_tiles", [None, 37])
+def test_tiles(sample, N_tiles):
+    # sections 2-5 on spatial tiles in a process pool == serial sections 2-5; with 37 tiles, narrower
+    # than the blocks, every tile boundary crosses blocks of the next tile
+    model = finditeasy3d.build_model(blocks_of(sample), "m", workers=2, N_tiles=N_tiles)
+    assert differing_attributes(model_of(sample), model) == []
+
+
+@pytest.mark.parametrize("sample", sorted(SAMPLES))
+def test_update_model(sample):
+    # update_model == build_model on the edited list of blocks, with and without removed blocks
+    blocks = [list(block[:6]) for block in blocks_of(sample)]
+    model = finditeasy3d.build_model(blocks, "m")
+    rng = random.Random(0)
+    for step in range(6):
+        N = len(blocks)
+        removed = rng.sample(range(N), 2) if step % 2 else []
+        modified = {}
+        for ii in rng.sample(range(N), 3):
+            if ii not in removed:
+                block = list(blocks[ii])
+                block[3 + step % 3] = block[3 + step % 3] + 0.01
+                modified[ii] = block
+        added = [list(blocks[rng.randrange(N)]) for kk in range(step % 3)]
+        finditeasy3d.update_model(model, removed, modified, added)
+        blocks = [modified.get(ii, blocks[ii]) for ii in range(N) if ii not in removed] + added
+        assert differing_attributes(model, finditeasy3d.build_model(blocks, "m")) == []
+
+
+@pytest.mark.parametrize("sample", sorted(SAMPLES))
+def test_contact_graph(sample, tmp_path):
+    # counts of the contact graph == counts of section 5, saved graph == graph
+    np = pytest.importorskip("numpy")
+    model = model_of(sample)
+    graph = finditeasy3d.ContactGraph.from_model(model)
+    assert graph.total_contact() == model.TotalContact
+    assert graph.max_interfaces() == model.Max
+    finditeasy3d.export(model, str(tmp_path), ["graph"])
+    saved = finditeasy3d.read_graph(str(tmp_path / "FindItEasyContactGraph.npz"))
+    assert int(saved['N_blocks']) == model.N_blocks
+    assert all([np.array_equal(saved[name], getattr(graph, name)) for name in ['indptr', 'indices', 'face', 'area']])
+
+
+@pytest.mark.parametrize("sample", sorted(SAMPLES))
+def test_columns(sample, tmp_path):
+    # model loaded from the .npy columns == model; the memory mapped columns give the same contacts
+    # and interfaces
+    np = pytest.importorskip("numpy")
+    model = model_of(sample)
+    path = str(tmp_path / "FindItEasyModel")
+    finditeasy3d.save_columns(model, path)
+    assert differing_attributes(model, finditeasy3d.load_model(path)) == []
+    columns = finditeasy3d.open_columns(path)
+    assert all([isinstance(columns[name], np.memmap) for name in columns.names() if columns[name].size])
+    assert [[list(columns.contacts(ii, jj)[0]) for jj in range(model.Nfaces)] for ii in range(model.N_blocks)] == model.ContBlockID
+    assert [[list(columns.contacts(ii, jj)[1]) for jj in range(model.Nfaces)] for ii in range(model.N_blocks)] == model.ContSurfID
+    assert columns.store().to_lists() == (model.FaceCorners, model.Index)
+
+
+@pytest.mark.parametrize("sample", sorted(SAMPLES))
+def test_sort_and_sweep(sample):
+    # contact pairs of the sort-and-sweep == loop over all the block pairs, in the same order
+    model = model_of(sample)
+    assert (model.ContBlockID, model.ContSurfID) == all_pairs(model)
+
+
+@pytest.mark.parametrize("sample", sorted(SAMPLES))
+def test_point_merge(sample):
+    # point indexes merged through the coordinate dictionaries == loops over all the corners
+    model = model_of(sample)
+    assert (model.Index, model.Num_points) == all_corner_pairs(model)
+
+
+@pytest.mark.parametrize("sample", sorted(SAMPLES))
+def test_quantized_contacts(sample):
+    # contacts on the integers of Box == float test of the scripts, but for the faces only touching
+    # along an edge (accepted by the float test)
+    model = model_of(sample)
+    pairs = contact_pairs(model)
+    reference = float_pairs(model)
+    assert pairs - reference == set()
+    assert [pair for pair in reference - pairs if not edge_only(model, pair)] == []
+
+
+@pytest.mark.parametrize("sample", sorted(SAMPLES))
+def test_off_grid(sample):
+    # corners moved by less than tol/2 give the contacts of their rounded corners (the centres and
+    # sizes are measured on the exact corners)
+    model = model_of(sample)
+    rng = random.Random(0)
+    blocks = [[value + rng.uniform(-0.4, 0.4)*model.tol for value in block[:6]] for block in blocks_of(sample)]
+    other = finditeasy3d.build_model(blocks, "m")
+    assert [name for name in ['Box', 'BlockVertex', 'ContBlockID', 'ContSurfID', 'FaceCorners', 'Index', 'Num_points']
+            if getattr(model, name) != getattr(other, name)] == []
+
+
+@pytest.mark.parametrize("sample", sorted(SAMPLES))
+def test_cache(sample, tmp_path):
+    # a rerun loads the three stages from the cache and gives the same model; the keys change with
+    # the units and YTolFactor
+    from finditeasy3d.cache import stage_keys
+    cache = finditeasy3d.StageCache(str(tmp_path))
+    first = finditeasy3d.Report()
+    finditeasy3d.build_model(blocks_of(sample), "m", cache=cache, report=first)
+    assert (cache.hits, cache.misses) == (0, 3)
+    assert not any([stage.cached for stage in first.stages])
+    rerun = finditeasy3d.Report()
+    model = finditeasy3d.build_model(blocks_of(sample), "m", cache=cache, report=rerun)
+    assert (cache.hits, cache.misses) == (3, 3)
+    assert [stage.name for stage in rerun.stages if stage.cached] == [stage.name for stage in rerun.stages if stage.name != "spatial index"]
+    assert differing_attributes(model_of(sample), model) == []
+
+    keys = stage_keys(finditeasy3d.Model("m"), blocks_of(sample))
+    units = stage_keys(finditeasy3d.Model("mm"), blocks_of(sample))
+    assert all([units[stage] != keys[stage] for stage in keys])
+    ytol = stage_keys(finditeasy3d.Model("m", YTolFactor=50), blocks_of(sample))
+    assert [stage for stage in keys if ytol[stage] != keys[stage]] == ['points']
+
+
+def test_cache_eviction(tmp_path):
+    # past max_bytes the least recently used files are deleted, the file just written is kept
+    cache = finditeasy3d.StageCache(str(tmp_path), max_bytes=10**9)
+    data = list(range(1000))
+    for kk, key in enumerate(["a", "b", "c"]):
+        cache.put(key, data)
+        os.utime(cache.filename(key), (1000 + kk, 1000 + kk))
+    assert cache.get("a") == data                   # a is now the most recently used
+    size = os.path.getsize(cache.filename("a"))
+    cache.max_bytes = 3*size
+    cache.put("d", data)
+    assert sorted([os.path.basename(entry[2]) for entry in cache.entries()]) == ["a.pkl", "c.pkl", "d.pkl"]
+    cache.max_bytes = size//2
+    cache.put("e", data)
+    assert [os.path.basename(entry[2]) for entry in cache.entries()] == ["e.pkl"]
+
+
+##----- EXPORTERS -----##
+
+@pytest.mark.parametrize("sample", sorted(SAMPLES))
+def test_exporter_order(sample, tmp_path):
+    # the files of an exporter do not depend on the exporters run before it
+    model = model_of(sample)
+    exporters = ["opensees_macro", "opensees", "liablock_compact", "3dec"]
+    first = str(tmp_path / "first")
+    last = str(tmp_path / "last")
+    finditeasy3d.export(model, first, exporters)
+    finditeasy3d.export(model, last, exporters[::-1])
+    names = sorted(set([finditeasy3d.EXPORTERS[name][1] for name in exporters]))
+    assert differing_files(first, last, names) == []
+
+
+@pytest.mark.parametrize("sample", sorted(SAMPLES))
+def test_equal_dof(sample):
+    # equalDOF pairs grouped by coordinate == loop over all the node pairs of each block
+    from finditeasy3d.opensees import subblock_grid, equal_dof
+    Nodes, N_subBlock, IndVertex = subblock_grid(model_of(sample))
+    assert equal_dof(Nodes, N_subBlock) == all_node_pairs(Nodes, N_subBlock)
+
+
+@pytest.mark.parametrize("sample", sorted(SAMPLES))
+@pytest.mark.parametrize("shared", [False, True])
+def test_zero_length(sample, shared):
+    # zeroLength elements of the coordinate buckets == loop over all the vertex pairs, on the first
+    # 100 blocks (the loop is quadratic in the number of pairs found)
+    model = finditeasy3d.build_model(blocks_of(sample)[:100], "m")
+    data = finditeasy3d.opensees_model(model, shared)
+    assert data.ZeroLength == all_vertex_pairs(model, data.Nodes)
+
+
+@pytest.mark.parametrize("sample", sorted(SAMPLES))
+@pytest.mark.parametrize("shared", [False, True])
+def test_opensees_npz(sample, shared, tmp_path):
+    # the model read back from the .npz == opensees_model (empty lists saved as 0 x 2 arrays), and its
+    # replay makes the same calls as the in-process one
+    np = pytest.importorskip("numpy")
+    from finditeasy3d.opensees_npz import write_opensees_npz, read_opensees, load_opensees
+    filename = str(tmp_path / "OpenSeesModel.npz")
+    data = write_opensees_npz(model_of(sample), filename, shared=shared)
+    saved = read_opensees(filename)
+    assert (saved.N_blocks, saved.shared) == (data.N_blocks, data.shared)
+    assert [name for name in ['Nodes', 'Bricks', 'Fixed', 'EqualDOF', 'ZeroLength', 'IndVertex']
+            if not np.array_equal(getattr(saved, name), np.reshape(getattr(data, name), getattr(saved, name).shape))] == []
+    replay = load_opensees(filename, finditeasy3d.Recorder())
+    assert replay.calls == finditeasy3d.build_opensees(data, finditeasy3d.Recorder()).calls
+
+
+@pytest.mark.parametrize("sample,max_blocks,exporters,shared", [
+    ("igor", 10**9, ["liablock_compact", "3dec", "opensees"], False),
+    ("igor", 97, ["liablock", "3dec", "opensees"], True),
+    ("igor", 13, ["liablock_compact", "3dec", "opensees"], False),
+    ("ex_buildings", 10**9, ["liablock_compact", "3dec", "opensees"], True),
+    ("ex_buildings", 97, ["liablock_compact", "3dec", "opensees"], False),
+    ("ex_buildings", 13, ["liablock_compact", "3dec", "opensees"], True)])
+def test_stream(sample, max_blocks, exporters, shared, tmp_path):
+    # stream() writes the files of run() on the blocks in stream order, byte for byte
+    blocks = blocks_of(sample)
+    order = finditeasy3d.stream_order(blocks, "m", max_blocks)
+    options = {'opensees': {'shared': shared}}
+    serial = str(tmp_path / "serial")
+    streamed = str(tmp_path / "streamed")
+    finditeasy3d.run([blocks[ii] for ii in order], "m", serial, exporters, verbose=False, options=options)
+    finditeasy3d.stream(blocks, "m", streamed, exporters, max_blocks, verbose=False, options=options)
+    assert differing_files(serial, streamed, [finditeasy3d.EXPORTERS[name][1] for name in exporters]) == []
+    f = open(os.path.join(streamed, "StreamOrder.csv"))
+    assert [int(line.split(",")[1]) for line in f.read().split()[1:]] == order
+    f.close()
+
+
+@pytest.mark.parametrize("sample", sorted(SAMPLES))
+@pytest.mark.parametrize("pool", ["process", "thread"])
+def test_concurrent_export(sample, pool, tmp_path):
+    # the exporters on a pool write the files of the exporters one after the other
+    model = model_of(sample)
+    exporters = ["liablock_compact", "3dec", "opensees", "opensees_macro"]
+    if hasattr(finditeasy3d, "ContactGraph"):
+        exporters = exporters + ["opensees_npz", "graph"]
+    options = {'opensees_macro': {'max_size': 2.}}
+    serial = str(tmp_path / "serial")
+    concurrent = str(tmp_path / "concurrent")
+    finditeasy3d.export(model, serial, exporters, options=options)
+    finditeasy3d.export(model, concurrent, exporters, jobs=None, pool=pool, options=options)
+    assert differing_files(serial, concurrent, [finditeasy3d.EXPORTERS[name][1] for name in exporters]) == []
+
+
+def test_thread_exports_at_once(tmp_path):
+    # two exports on thread pools at the same time write the files of their own model
+    exporters = ["liablock_compact", "3dec", "opensees", "opensees_macro"]
+    names = [finditeasy3d.EXPORTERS[name][1] for name in exporters]
+    errors = []
+
+    def export(sample):
+        try:
+            finditeasy3d.export(model_of(sample), str(tmp_path / sample), exporters, jobs=2, pool="thread")
+        except Exception as error:
+            errors.append(error)
+
+    threads = [threading.Thread(target=export, args=(sample,)) for sample in sorted(SAMPLES)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    for sample in sorted(SAMPLES):
+        finditeasy3d.export(model_of(sample), str(tmp_path / (sample + "_serial")), exporters)
+        assert differing_files(str(tmp_path / sample), str(tmp_path / (sample + "_serial")), names) == []
+
+
+@pytest.mark.parametrize("pool", ["process", "thread"])
+def test_concurrent_cpu(pool, tmp_path):
+    # the CPU time of the exporters is counted once in the total of the report
+    report = finditeasy3d.Report()
+    finditeasy3d.export(model_of("igor"), str(tmp_path), ["liablock_compact", "3dec", "opensees"], report, jobs=None, pool=pool)
+    waiting = [stage.cpu for stage in report.stages if not stage.concurrent]
+    workers = [stage.cpu for stage in report.stages if stage.concurrent]
+    expected = sum(waiting) if pool == "thread" else sum(waiting) + sum(workers)
+    assert abs(report.total()['cpu_s'] - expected) < 1e-9
+
+
+def test_batch(tmp_path):
+    # every model of a batch in its own directory (numbered when two files have the same name), with
+    # the files of export() on its model and its row in the summary
+    from finditeasy3d.batch import main
+    copy_of_igor = tmp_path / "copy" / os.path.basename(SAMPLES['igor'])
+    copy_of_igor.parent.mkdir()
+    copy_of_igor.write_bytes(open(SAMPLES['igor'], "rb").read())
+    out = tmp_path / "out"
+    assert main([SAMPLES['igor'], SAMPLES['ex_buildings'], str(copy_of_igor), "--units", "m", "--out", str(out), "--jobs", "2"]) == 0
+    exporters = ["liablock", "3dec", "opensees"]
+    names = [finditeasy3d.EXPORTERS[name][1] for name in exporters]
+    for sample, name in [('igor', "IgorBuilding"), ('ex_buildings', "Ex_Buildings"), ('igor', "IgorBuilding_2")]:
+        finditeasy3d.export(model_of(sample), str(tmp_path / sample), exporters)
+        assert differing_files(str(tmp_path / sample), str(out / name), names) == []
+    lines = (out / "summary.csv").read_text().splitlines()
+    assert [line.split(",")[-1] for line in lines] == ["status", '"ok"', '"ok"', '"ok"']
+    assert [line.split(",")[1] for line in lines[1:]] == [str(model_of(sample).N_blocks) for sample in ['igor', 'ex_buildings', 'igor']]